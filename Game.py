@@ -1,5 +1,10 @@
-import pygame, sys, os, time
+import pygame, sys, os
+from collections import deque
+from enregistrement import formater_etape
 from main import charger_fichier
+from lecteur import LecteurEtapes, Controles, Animation
+from disposition import charger_disposition, mettre_a_l_echelle
+from reprise import Points
 
 pygame.init()
 WIDTH, HEIGHT = 1200, 700
@@ -15,6 +20,9 @@ background.fill((50, 50, 50))
 
 # Dossier contenant les fichiers
 FOLDER = "four"
+# points de reprise écrits pendant la lecture, pour rejouer à partir d'une étape
+DOSSIER_POINTS = os.path.join(FOLDER, ".points")
+PERIODE_POINTS = 50
 files = [f for f in os.listdir(FOLDER) if f.endswith(".txt")]
 
 # Boutons pour sélectionner les fichiers
@@ -38,99 +46,201 @@ def draw_buttons(selected=None):
         txt_rect = txt.get_rect(center=rect.center)
         screen.blit(txt, txt_rect)
 
-def interpolate(p1, p2, t):
-    return (p1[0] + (p2[0]-p1[0])*t, p1[1] + (p2[1]-p1[1])*t)
-
-def draw_simulation(fourmiliere, pos, fourmis_pos, logs, step_idx):
-    # Partie gauche pour animation
-    pygame.draw.rect(screen, (0, 0, 0), (0,0,WIDTH//2, HEIGHT))
-    
-    # Dessiner tunnels
-    for s1, voisins in fourmiliere.tunnels.items():
-        for s2 in voisins:
-            pygame.draw.line(screen, (101,67,33), pos[s1], pos[s2], 25)
+# Zones de l'écran : animation à gauche, logs à droite
+ZONE_ANIMATION = pygame.Rect(0, 0, WIDTH//2, HEIGHT)
+ZONE_LOGS = pygame.Rect(WIDTH//2, 0, WIDTH//2, HEIGHT)
+# au-delà de ce nombre de zones modifiées, une mise à jour globale est plus rapide
+MAX_DIRTY_RECTS = 300
+# étapes affichées dans le panneau des logs
+NB_LOGS = 20
+
+# Cache des lignes de log déjà rendues (les mêmes lignes restent affichées NB_LOGS étapes)
+_glyphes = {}
+
+def render_ligne(line):
+    txt = _glyphes.get(line)
+    if txt is None:
+        if len(_glyphes) > 5000:
+            _glyphes.clear()
+        txt = _glyphes[line] = font.render(line, True, (255,255,255))
+    return txt
+
+def draw_fond(fourmiliere, pos):
+    """
+    Dessine une fois la partie statique (tunnels, salles, noms) sur une Surface.
+    """
+    fond = pygame.Surface(ZONE_ANIMATION.size)
+    fond.fill((0, 0, 0))
+    # Dessiner tunnels (chaque tunnel une seule fois)
+    graphe = fourmiliere.graphe()
+    noms = graphe.noms
+    aretes = graphe.tunnels
+    for k in range(0, len(aretes), 2):
+        pygame.draw.line(fond, (101,67,33), pos[noms[aretes[k]]], pos[noms[aretes[k + 1]]], 25)
     # Dessiner salles
     for nom, salle in fourmiliere.salles.items():
-        pygame.draw.circle(screen, (205,133,63), pos[nom], 30)
-        pygame.draw.circle(screen, (139,69,19), pos[nom], 30, 3)
+        pygame.draw.circle(fond, (205,133,63), pos[nom], 30)
+        pygame.draw.circle(fond, (139,69,19), pos[nom], 30, 3)
         img = font.render(nom, True, (255,255,255))
         rect = img.get_rect(center=pos[nom])
-        screen.blit(img, rect)
-    # Dessiner fourmis
-    for f_id, (x,y) in fourmis_pos.items():
-        rect = fourmi_img.get_rect(center=(int(x),int(y)))
-        screen.blit(fourmi_img, rect)
-    
-    # Partie droite pour log
-    pygame.draw.rect(screen, (30,30,30), (WIDTH//2,0,WIDTH//2, HEIGHT))
+        fond.blit(img, rect)
+    return fond
+
+def draw_logs(logs):
+    """
+    Rend le panneau des NB_LOGS dernières étapes (lignes hors écran ignorées).
+    """
+    panneau = pygame.Surface(ZONE_LOGS.size)
+    panneau.fill((30,30,30))
     y = 20
-    for l in logs[max(0,step_idx-20):step_idx]:  # afficher les 20 dernières étapes
+    for l in logs:
         for line in l.splitlines():
-            txt = font.render(line, True, (255,255,255))
-            screen.blit(txt, (WIDTH//2 + 20, y))
+            if y >= HEIGHT:
+                return panneau
+            panneau.blit(render_ligne(line), (20, y))
             y += 20
+    return panneau
+
+class CacheRendu:
+    """
+    Surfaces réutilisées d'une frame à l'autre pour une simulation : la fourmilière
+    statique, le panneau de logs (refait seulement quand une étape s'ajoute) et les
+    zones occupées par les fourmis à la frame précédente.
+    """
+    def __init__(self, fourmiliere, pos):
+        self.fond = draw_fond(fourmiliere, pos)
+        self.panneau = None
+        self.cle_logs = None
+        self.rects_fourmis = []
+        self.complet = True  # prochaine frame : tout redessiner
 
-    pygame.display.flip()
+def draw_simulation(fourmiliere, pos, fourmis_pos, logs, cache=None):
+    if cache is None:
+        cache = CacheRendu(fourmiliere, pos)
+    dirty = []
+
+    # Partie gauche : fond statique en cache, seules les zones des fourmis sont rafraîchies
+    screen.set_clip(ZONE_ANIMATION)
+    if cache.complet:
+        screen.blit(cache.fond, ZONE_ANIMATION)
+        dirty.append(ZONE_ANIMATION)
+    else:
+        for r in cache.rects_fourmis:
+            screen.blit(cache.fond, r, r)
+        dirty.extend(cache.rects_fourmis)
+    # Dessiner fourmis : une seule fois par position (les fourmis d'une même salle
+    # se superposent) et en un seul appel groupé
+    w, h = fourmi_img.get_size()
+    positions = {(int(x) - w//2, int(y) - h//2) for x, y in fourmis_pos.values()}
+    rects = screen.blits([(fourmi_img, p) for p in positions])
+    screen.set_clip(None)
+    cache.rects_fourmis = [r.clip(ZONE_ANIMATION) for r in rects]
+    dirty.extend(cache.rects_fourmis)
+
+    # Partie droite pour log : re-rendue seulement quand une étape s'ajoute
+    # clé : texte de la dernière étape, qui commence par son numéro ("+++ E<n> +++").
+    # Ni la longueur (constante une fois la deque pleine) ni l'id (réutilisé quand
+    # l'ancienne chaîne est libérée) ne suffisent à reconnaître un ajout.
+    cle = (len(logs), logs[-1] if logs else None)
+    if cache.complet or cle != cache.cle_logs:
+        if cle != cache.cle_logs or cache.panneau is None:
+            cache.panneau = draw_logs(logs)
+            cache.cle_logs = cle
+        screen.blit(cache.panneau, ZONE_LOGS)
+        dirty.append(ZONE_LOGS)
+    cache.complet = False
+
+    if len(dirty) > MAX_DIRTY_RECTS:
+        pygame.display.update([ZONE_ANIMATION, ZONE_LOGS])
+    else:
+        pygame.display.update(dirty)
+
+def positions_ecran(path, fourmiliere):
+    """
+    Positions écran des salles : layout calculé une fois par contenu de fichier,
+    puis relu sur disque (voir disposition.py).
+    """
+    disposition = charger_disposition(path, fourmiliere)
+    return mettre_a_l_echelle(disposition, 300, (WIDTH//4, HEIGHT//2))
 
 def run_simulation(file_path):
-    fourmiliere = charger_fichier(os.path.join(FOLDER, file_path))
-    logs = fourmiliere.simuler()
+    path = os.path.join(FOLDER, file_path)
+    fourmiliere = charger_fichier(path)
+    logs = deque(maxlen=NB_LOGS)
+    pos = positions_ecran(path, fourmiliere)
 
-    # layout automatique avec networkx
-    import networkx as nx
-    G = fourmiliere.construire_graphe()
-    layout = nx.spring_layout(G, scale=300, center=(WIDTH//4, HEIGHT//2))
-    pos = {salle: (int(x), int(y)) for salle, (x,y) in layout.items()}
+    cache = CacheRendu(fourmiliere, pos)
+    points = Points(DOSSIER_POINTS, PERIODE_POINTS)
+    controles = Controles()
 
-    fourmis_pos = {f.id: pos["Sv"] for f in fourmiliere.fourmis}
+    def demarrer(depuis):
+        """
+        Lecture à partir de l'étape `depuis` : repart du dernier point de reprise
+        qui la précède (ou de Sv), les étapes intermédiaires ne sont pas animées.
+        """
+        fourmiliere.reinitialiser()
+        point = points.dernier(fourmiliere, depuis - 1) if depuis > 1 else None
+        if point is None:
+            fourmis_pos = {f.id: pos["Sv"] for f in fourmiliere.fourmis}
+        else:
+            noms = fourmiliere.graphe().noms
+            fourmis_pos = {k + 1: pos[noms[salle]] for k, salle in enumerate(point.position)}
+        # les étapes sont calculées dans un thread de fond pendant l'animation
+        lecteur = LecteurEtapes(fourmiliere.iter_etapes(reprise=point, points=points))
+        animation = Animation(lecteur, controles, pos, fourmis_pos,
+                              numero=point.etape if point else 0, cible=depuis - 1)
+        return lecteur, animation, fourmis_pos
 
-    step_idx = 0
-    running = True
-    while running:
+    lecteur, animation, fourmis_pos = demarrer(1)
+    titre = None
+
+    while True:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
+                lecteur.arreter()
                 pygame.quit()
                 sys.exit()
+            elif event.type == pygame.KEYDOWN:
+                controles.touche(event.key)
 
-        if step_idx < len(logs):
-            lignes = logs[step_idx].splitlines()[1:]
-            mouvements = []
-            for l in lignes:
-                fid, dep, arr = [x.strip() for x in l.split("-")]
-                fid = int(fid[1:])
-                mouvements.append((fid, dep, arr))
-            
-            for t in [i/30 for i in range(31)]:
-                for fid, dep, arr in mouvements:
-                    start = pos[dep]
-                    end = pos[arr]
-                    fourmis_pos[fid] = interpolate(start, end, t)
-                draw_simulation(fourmiliere, pos, fourmis_pos, logs, step_idx)
-                clock.tick(30)
-            step_idx += 1
-        else:
-            # Fin de la simulation
-            draw_simulation(fourmiliere, pos, fourmis_pos, logs, step_idx)
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-            time.sleep(0.1)
+        if controles.aller_a is not None:
+            # le moteur "objets" modifie la fourmilière : attendre l'ancien calcul
+            lecteur.arreter(attendre=True)
+            lecteur, animation, fourmis_pos = demarrer(controles.aller_a)
+            controles.aller_a = None
+            logs.clear()
+            cache.complet = True
+
+        finies = animation.image_suivante()
+        # seules les NB_LOGS dernières étapes sont affichées
+        logs.extend(formater_etape(etape) for etape in finies[-NB_LOGS:])
+        draw_simulation(fourmiliere, pos, fourmis_pos, logs, cache)
+
+        etat = controles.etat(animation.numero, animation.terminee)
+        if etat != titre:
+            titre = etat
+            pygame.display.set_caption(f"Simulation graphique - Fourmilière - {etat}")
+        clock.tick(30)
 
 # ===== Main loop
-selected_file = None
-while True:
-    draw_buttons(selected_file)
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            pygame.quit()
-            sys.exit()
-        elif event.type == pygame.MOUSEBUTTONDOWN:
-            mx, my = pygame.mouse.get_pos()
-            for rect, f in buttons:
-                if rect.collidepoint(mx, my):
-                    selected_file = f
-        elif event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_RETURN and selected_file:
-                run_simulation(selected_file)
-    clock.tick(30)
+def main():
+    selected_file = None
+    while True:
+        draw_buttons(selected_file)
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                mx, my = pygame.mouse.get_pos()
+                for rect, f in buttons:
+                    if rect.collidepoint(mx, my):
+                        selected_file = f
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_RETURN and selected_file:
+                    run_simulation(selected_file)
+        clock.tick(30)
+
+# importé (par export.py), le module ne fournit que les fonctions de dessin
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+# bench.py
+"""
+Banc de performance sur des fourmilières synthétiques (generateurs.py).
+
+Pour chaque cas, dans un processus neuf : génération du fichier, puis mesure
+séparée du parsing, du précalcul des chemins (adjacence + distances à Sd) et de
+simuler. Une ligne JSON par cas et par moteur est ajoutée au fichier de résultats,
+avec l'étiquette de version, pour comparer deux versions :
+
+    python bench.py --taille moyenne --etiquette avant
+    python bench.py --taille moyenne --etiquette apres
+    python bench.py --comparer avant apres
+"""
+from multiprocessing import Pool
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import generateurs
+from fourmi import Fourmiliere
+from parseur import parser_fichier
+
+try:
+    import resource
+except ImportError:  # Windows : pas de mesure de mémoire
+    resource = None
+
+# (nom, générateur, paramètres, moteurs pour lesquels le cas a un sens)
+TOUS_MOTEURS = ("objets", "compact", "flot", "numpy")
+CAS = {
+    "petite": [
+        ("chaine_20", generateurs.chaine, dict(longueur=20, nb_fourmis=100, capacites=(1, 2)), TOUS_MOTEURS),
+        ("grille_10x10", generateurs.grille, dict(largeur=10, hauteur=10, nb_fourmis=100, capacites=(1, 2, 3)), TOUS_MOTEURS),
+        ("aleatoire_200", generateurs.aleatoire, dict(nb_salles=200, nb_fourmis=200, capacites=(1, 2, 5)), TOUS_MOTEURS),
+        ("goulots_4x10", generateurs.goulots, dict(nb_chemins=4, longueur=10, nb_fourmis=200, capacites=(2, 4)), TOUS_MOTEURS),
+    ],
+    "moyenne": [
+        ("chaine_200", generateurs.chaine, dict(longueur=200, nb_fourmis=10_000, capacites=(5, 10)), TOUS_MOTEURS),
+        ("grille_40x40", generateurs.grille, dict(largeur=40, hauteur=40, nb_fourmis=5_000, capacites=(1, 2, 3)), TOUS_MOTEURS),
+        ("aleatoire_5000", generateurs.aleatoire, dict(nb_salles=5_000, nb_fourmis=10_000, capacites=(1, 2, 5)), TOUS_MOTEURS),
+        ("goulots_20x30", generateurs.goulots, dict(nb_chemins=20, longueur=30, nb_fourmis=20_000, capacites=(4, 8), capacite_goulot=2), TOUS_MOTEURS),
+    ],
+    "grande": [
+        ("chaine_1000", generateurs.chaine, dict(longueur=1_000, nb_fourmis=100_000, capacites=(50, 100)), ("compact", "flot", "numpy")),
+        ("grille_200x200", generateurs.grille, dict(largeur=200, hauteur=200, nb_fourmis=100_000, capacites=(1, 2, 3)), ("compact", "flot", "numpy")),
+        ("aleatoire_100000", generateurs.aleatoire, dict(nb_salles=100_000, nb_fourmis=100_000, capacites=(1, 2, 5)), ("compact", "flot", "numpy")),
+        ("goulots_100x50_1M", generateurs.goulots, dict(nb_chemins=100, longueur=50, nb_fourmis=1_000_000, capacites=(20, 50), capacite_goulot=10), ("compact", "flot", "numpy")),
+    ],
+}
+
+
+def version():
+    """
+    Identifiant de la version courante (commit git), ou "inconnue".
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "inconnue"
+
+
+def memoire_max_ko():
+    """
+    Pic de mémoire résidente du processus courant, en Ko (None si non mesurable).
+    """
+    if resource is None:
+        return None
+    pic = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # octets sous macOS, Ko ailleurs
+    return pic // 1024 if sys.platform == "darwin" else pic
+
+
+def mesurer(tache):
+    """
+    Exécute un cas pour un moteur (dans un processus dédié) et retourne ses mesures.
+    """
+    nom, generateur, parametres, moteur, dossier = tache
+    path = generateurs.ecrire(os.path.join(dossier, f"{nom}.txt"), generateur(**parametres))
+    resultat = {"cas": nom, "moteur": moteur, "erreur": None}
+
+    debut = time.perf_counter()
+    graphe = parser_fichier(path)
+    resultat["parse_s"] = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    fourmiliere = Fourmiliere.depuis_graphe(graphe)
+    fourmiliere.graphe().adjacence()
+    fourmiliere.construire_index()
+    resultat["precalcul_s"] = time.perf_counter() - debut
+
+    resultat.update(salles=graphe.nb_salles, tunnels=graphe.nb_tunnels, fourmis=graphe.nb_fourmis)
+    debut = time.perf_counter()
+    try:
+        resultat["etapes"] = len(fourmiliere.simuler(moteur))
+    except (RuntimeError, ImportError) as e:  # ImportError : NumPy absent (moteur "numpy")
+        resultat["etapes"] = None
+        resultat["erreur"] = str(e)
+    resultat["simulation_s"] = time.perf_counter() - debut
+    if resultat["etapes"]:
+        resultat["etapes_par_s"] = resultat["etapes"] / resultat["simulation_s"]
+    resultat["memoire_max_ko"] = memoire_max_ko()
+    return resultat
+
+
+def lancer(taille, moteurs, sortie, etiquette):
+    """
+    Lance tous les cas d'une taille, un processus neuf par mesure (pic mémoire propre).
+    """
+    with tempfile.TemporaryDirectory() as dossier:
+        taches = [
+            (nom, generateur, parametres, moteur, dossier)
+            for nom, generateur, parametres, permis in CAS[taille]
+            for moteur in moteurs if moteur in permis
+        ]
+        with Pool(processes=1, maxtasksperchild=1) as pool, open(sortie, "a") as out:
+            for resultat in pool.imap(mesurer, taches):
+                resultat = {"version": etiquette, "date": time.strftime("%Y-%m-%d %H:%M:%S"), **resultat}
+                out.write(json.dumps(resultat) + "\n")
+                out.flush()
+                print(f"{resultat['cas']:<20} {resultat['moteur']:<8} "
+                      f"parse {resultat['parse_s']:.3f}s  précalcul {resultat['precalcul_s']:.3f}s  "
+                      f"simulation {resultat['simulation_s']:.3f}s  {resultat['etapes']} étapes  "
+                      f"{resultat['memoire_max_ko']} Ko" + (f"  ({resultat['erreur']})" if resultat["erreur"] else ""))
+
+
+def comparer(sortie, avant, apres):
+    """
+    Affiche, pour chaque cas mesuré sous les deux étiquettes, le rapport des temps apres / avant
+    (dernière mesure de chaque étiquette).
+    """
+    mesures = {}
+    with open(sortie) as f:
+        for ligne in f:
+            r = json.loads(ligne)
+            if r["version"] in (avant, apres):
+                mesures[(r["version"], r["cas"], r["moteur"])] = r
+    for (version_, cas, moteur), a in sorted(mesures.items()):
+        b = mesures.get((apres, cas, moteur))
+        if version_ != avant or b is None:
+            continue
+        rapports = "  ".join(
+            f"{phase} x{b[phase] / a[phase]:.2f}" if a[phase] else f"{phase} -"
+            for phase in ("parse_s", "precalcul_s", "simulation_s")
+        )
+        print(f"{cas:<20} {moteur:<8} {rapports}  mémoire {a['memoire_max_ko']} -> {b['memoire_max_ko']} Ko")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Banc de performance sur fourmilières synthétiques.")
+    parser.add_argument("--taille", choices=sorted(CAS), default="petite")
+    parser.add_argument("--moteur", nargs="+", choices=TOUS_MOTEURS, default=list(TOUS_MOTEURS))
+    parser.add_argument("--sortie", default="bench_resultats.jsonl", help="fichier de résultats (JSONL, ajout)")
+    parser.add_argument("--etiquette", default=None, help="étiquette de version (défaut : commit git)")
+    parser.add_argument("--comparer", nargs=2, metavar=("AVANT", "APRES"),
+                        help="compare deux étiquettes déjà mesurées au lieu de lancer le banc")
+    args = parser.parse_args()
+
+    if args.comparer:
+        comparer(args.sortie, *args.comparer)
+    else:
+        lancer(args.taille, args.moteur, args.sortie, args.etiquette or version())
@@ -0,0 +1,144 @@
+# blocages.py
+"""
+Analyse des blocages (deadlocks) des moteurs gloutons ("objets", "compact", "numpy").
+
+Une fourmi n'avance que d'une salle plus proche de Sd d'un tunnel : la fourmi
+qui attend attend toujours des salles plus proches de Sd que la sienne, le
+graphe d'attente (fourmi bloquée -> salle occupée -> fourmis qui l'occupent)
+est donc sans cycle et aucune rotation de fourmis ne peut débloquer quoi que ce
+soit. Par récurrence sur la distance, la fourmi la plus proche de Sd trouve
+toujours vides les salles suivantes : elle ne reste bloquée que si toutes sont
+de capacité nulle. Les seuls blocages définitifs viennent donc des salles de
+capacité nulle, et se voient sans simuler :
+
+- une salle est *viable* si un plus court chemin la relie à Sd sans passer par
+  une salle de capacité nulle ;
+- une fourmi qui entre dans une salle non viable (une *impasse*) n'atteindra
+  jamais Sd : la simulation finirait, peut-être des milliers d'étapes plus tard,
+  par "Deadlock détecté". Les moteurs considèrent les impasses comme pleines ;
+  comme aucune simulation qui aboutit n'y fait entrer de fourmi, les étapes des
+  simulations qui aboutissaient sont inchangées ;
+- si Sv n'est pas viable, aucune fourmi n'arrivera : Blocage est levée avant
+  la première étape, avec le plus petit ensemble de salles de capacité nulle
+  à ouvrir pour qu'un plus court chemin soit praticable.
+"""
+
+# blocage non prévu par impasses : aucune fourmi ne peut bouger pendant une étape
+MESSAGE_DEADLOCK = ("Deadlock détecté : aucune fourmi ne peut se déplacer cette étape. "
+                    "Vérifie la topologie / capacités.")
+
+
+class Blocage(RuntimeError):
+    """
+    Blocage certain : aucune fourmi ne peut atteindre Sd. `salles` : noms des
+    salles de capacité nulle à ouvrir (voir salles_a_ouvrir).
+    """
+    def __init__(self, message, salles=()):
+        super().__init__(message)
+        self.salles = list(salles)
+
+
+def salles_viables(fourmiliere):
+    """
+    Ensemble des indices (GrapheCompact) des salles reliées à Sd par un plus
+    court chemin dont aucune salle n'est de capacité nulle (Sd compris).
+    """
+    graphe = fourmiliere.graphe()
+    indices, capacites = graphe.indices, graphe.capacites
+    _, debuts, voisins = graphe.adjacence()
+    distances = {indices[nom]: d for nom, d in fourmiliere.construire_index().items()}
+    viables = {graphe.indices["Sd"]}
+    # par distance croissante : les salles suivantes sont déjà classées
+    for u in sorted(distances, key=distances.get):
+        d = distances[u]
+        if d == 0 or capacites[u] == 0:
+            continue
+        for k in range(debuts[u], debuts[u + 1]):
+            v = voisins[k]
+            if v in viables and distances.get(v) == d - 1:
+                viables.add(u)
+                break
+    return viables
+
+
+def salles_a_ouvrir(fourmiliere):
+    """
+    Plus petit ensemble de salles de capacité nulle à ouvrir pour qu'un plus
+    court chemin Sv -> Sd n'en contienne plus : celles du plus court chemin qui
+    en traverse le moins (programmation dynamique par distance à Sd croissante).
+    Liste de noms, dans l'ordre du chemin ; vide si Sv est viable.
+    """
+    graphe = fourmiliere.graphe()
+    noms, indices, capacites = graphe.noms, graphe.indices, graphe.capacites
+    _, debuts, voisins = graphe.adjacence()
+    distances = {indices[nom]: d for nom, d in fourmiliere.construire_index().items()}
+    sv = indices["Sv"]
+    if sv not in distances:
+        return []
+
+    # cout[u] : salles de capacité nulle sur le meilleur chemin u -> Sd (u comprise)
+    cout = {}
+    suivante = {}
+    for u in sorted(distances, key=distances.get):
+        d = distances[u]
+        fermee = 1 if capacites[u] == 0 else 0
+        if d == 0:
+            cout[u] = fermee
+            continue
+        meilleure = None
+        for k in range(debuts[u], debuts[u + 1]):
+            v = voisins[k]
+            if distances.get(v) == d - 1 and (meilleure is None or cout[v] < cout[meilleure]):
+                meilleure = v
+        cout[u] = fermee + cout[meilleure]
+        suivante[u] = meilleure
+
+    salles = []
+    u = sv
+    while u in suivante:
+        u = suivante[u]
+        if capacites[u] == 0:
+            salles.append(noms[u])
+    return salles
+
+
+def impasses(fourmiliere):
+    """
+    Indices des salles où une fourmi pourrait entrer sans jamais atteindre Sd
+    (reliées à Sd, de capacité non nulle, mais pas viables), que les
+    moteurs traitent comme pleines. Lève Blocage si Sv lui-même n'est pas viable
+    et qu'il y a des fourmis à faire passer.
+    """
+    viables = salles_viables(fourmiliere)
+    graphe = fourmiliere.graphe()
+    if graphe.indices["Sv"] not in viables and fourmiliere.nb_fourmis:
+        salles = salles_a_ouvrir(fourmiliere)
+        raise Blocage(
+            "Deadlock certain : tous les plus courts chemins Sv -> Sd passent par une salle "
+            f"de capacité nulle. Salles à ouvrir (le moins possible) : {', '.join(salles)}",
+            salles,
+        )
+    capacites = graphe.capacites
+    return [
+        graphe.indices[nom] for nom in fourmiliere.construire_index()
+        if graphe.indices[nom] not in viables and capacites[graphe.indices[nom]] != 0
+    ]
+
+
+def preparer(fourmiliere):
+    """
+    Préambule commun des moteurs gloutons : distances à Sd (construire_index) et
+    indices des impasses. Lève RuntimeError si Sv n'est pas relié à Sd, Blocage
+    si aucune fourmi ne peut l'atteindre.
+    """
+    distances = fourmiliere.construire_index()
+    if "Sv" not in distances:
+        raise RuntimeError("Aucun chemin Sv -> Sd trouvé!")
+    return distances, impasses(fourmiliere)
+
+
+def deadlock():
+    """
+    Erreur des moteurs gloutons quand aucune fourmi ne peut bouger pendant une étape.
+    """
+    return RuntimeError(MESSAGE_DEADLOCK)
@@ -0,0 +1,121 @@
+# disposition.py
+"""
+Positions des salles pour les interfaces graphiques (Game.py, visual.py).
+
+Les dispositions sont calculées en coordonnées normalisées (dans [-1, 1]) puis
+enregistrées sur disque, indexées par l'empreinte du contenu du fichier de la
+fourmilière : rouvrir une fourmilière (ou une copie identique) redonne la même
+image sans rien recalculer.
+"""
+import json
+import os
+
+from parseur import empreinte
+
+# méthodes disponibles ; "auto" choisit selon la taille
+METHODES = ("auto", "ressorts", "couches")
+# au-delà, spring_layout prend plusieurs secondes : disposition en couches
+SEUIL_COUCHES = 300
+DOSSIER = ".dispositions"
+
+
+def disposition_ressorts(fourmiliere, graine=0):
+    """
+    nx.spring_layout avec une graine fixe (même image à chaque calcul).
+    Seules les salles reliées par un tunnel sont placées.
+    """
+    import networkx as nx
+    layout = nx.spring_layout(fourmiliere.construire_graphe(), seed=graine)
+    return {salle: (float(x), float(y)) for salle, (x, y) in layout.items()}
+
+
+def disposition_couches(fourmiliere):
+    """
+    Disposition en couches par distance à Sv (parcours en largeur sur l'adjacence
+    compacte) : Sv à gauche, une colonne par distance, les salles inaccessibles
+    dans une dernière colonne. Dans chaque colonne, les salles sont rangées selon
+    la position moyenne de leurs voisins de la colonne précédente, ce qui limite
+    les croisements de tunnels. Linéaire en nombre de tunnels (hors tri).
+    """
+    graphe = fourmiliere.graphe()
+    _, debuts, voisins = graphe.adjacence()
+    distances = graphe.distances(graphe.indices["Sv"])
+    nb_couches = max(distances.values()) + 1
+    couches = [[] for _ in range(nb_couches)]
+    inaccessibles = []
+    for i in range(graphe.nb_salles):
+        d = distances.get(i)
+        if d is None:
+            inaccessibles.append(i)
+        else:
+            couches[d].append(i)
+    if inaccessibles:
+        couches.append(inaccessibles)
+
+    ordonnee = {}
+    for d, couche in enumerate(couches):
+        if d:
+            def cle(i):
+                ys = [ordonnee[v] for v in voisins[debuts[i]:debuts[i + 1]] if v in ordonnee]
+                return sum(ys) / len(ys) if ys else 0.0
+            couche.sort(key=cle)
+        n = len(couche)
+        for k, i in enumerate(couche):
+            ordonnee[i] = 0.0 if n == 1 else -1 + 2 * k / (n - 1)
+
+    noms = graphe.noms
+    derniere = max(len(couches) - 1, 1)
+    return {
+        noms[i]: (-1 + 2 * d / derniere, ordonnee[i])
+        for d, couche in enumerate(couches) for i in couche
+    }
+
+
+def chemin_disposition(path, methode, graine):
+    """
+    Fichier de la disposition de `path` : dans DOSSIER, à côté de la fourmilière,
+    nommé d'après l'empreinte de son contenu.
+    """
+    cle = empreinte(path).hex()[:32]
+    return os.path.join(os.path.dirname(path), DOSSIER, f"{cle}_{methode}_{graine}.json")
+
+
+def charger_disposition(path, fourmiliere, methode="auto", graine=0):
+    """
+    Disposition normalisée {salle: (x, y)} de la fourmilière lue dans `path`,
+    relue sur disque si elle a déjà été calculée, sinon calculée puis enregistrée.
+    """
+    if methode not in METHODES:
+        raise ValueError(f"Disposition inconnue : {methode}")
+    if methode == "auto":
+        methode = "couches" if len(fourmiliere.salles) > SEUIL_COUCHES else "ressorts"
+
+    fichier = chemin_disposition(path, methode, graine)
+    try:
+        with open(fichier) as f:
+            return {salle: tuple(xy) for salle, xy in json.load(f).items()}
+    except (FileNotFoundError, ValueError):
+        pass
+
+    if methode == "couches":
+        disposition = disposition_couches(fourmiliere)
+    else:
+        disposition = disposition_ressorts(fourmiliere, graine)
+    try:
+        os.makedirs(os.path.dirname(fichier), exist_ok=True)
+        tmp = fichier + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(disposition, f)
+        os.replace(tmp, fichier)
+    except OSError:
+        # dossier en lecture seule : la disposition est simplement recalculée la prochaine fois
+        pass
+    return disposition
+
+
+def mettre_a_l_echelle(disposition, echelle, centre):
+    """
+    Positions écran (entiers) : coordonnées normalisées * echelle + centre.
+    """
+    cx, cy = centre
+    return {salle: (int(cx + x * echelle), int(cy + y * echelle)) for salle, (x, y) in disposition.items()}
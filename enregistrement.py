@@ -0,0 +1,60 @@
+# enregistrement.py
+"""
+Enregistrements d'étapes produits par les moteurs de simulation, et leur mise en
+forme texte (faite seulement à la demande).
+"""
+from array import array
+
+
+class Etape:
+    """
+    Mouvements d'une étape, en colonnes d'entiers : la fourmi fourmis[k] passe de la
+    salle departs[k] à la salle arrivees[k]. Les salles sont des indices dans `noms`
+    (GrapheCompact.noms, partagé par toutes les étapes d'une simulation) : aucun nom
+    n'est manipulé ni découpé tant qu'on ne le demande pas.
+    """
+    __slots__ = ("numero", "noms", "fourmis", "departs", "arrivees")
+
+    def __init__(self, numero, noms, fourmis=None, departs=None, arrivees=None):
+        self.numero = numero
+        self.noms = noms
+        self.fourmis = fourmis if fourmis is not None else array("i")
+        self.departs = departs if departs is not None else array("i")
+        self.arrivees = arrivees if arrivees is not None else array("i")
+
+    def ajouter(self, fourmi, depart, arrivee):
+        self.fourmis.append(fourmi)
+        self.departs.append(depart)
+        self.arrivees.append(arrivee)
+
+    def __len__(self):
+        return len(self.fourmis)
+
+    def mouvements(self):
+        """
+        Itère sur les mouvements avec les noms des salles : (id fourmi, départ, arrivée).
+        """
+        noms = self.noms
+        for fid, dep, arr in zip(self.fourmis, self.departs, self.arrivees):
+            yield fid, noms[dep], noms[arr]
+
+    def __repr__(self):
+        return f"Etape({self.numero}, {len(self)} mouvements)"
+
+
+def formater_etape(etape):
+    """
+    Met en forme une étape au format texte des logs ("+++ E1 +++" puis "f1 - Sv - S1").
+    """
+    log = [f"+++ E{etape.numero} +++"]
+    for fid, dep, arr in etape.mouvements():
+        log.append(f"f{fid} - {dep} - {arr}")
+    return "\n".join(log)
+
+
+def formater_etapes(etapes):
+    """
+    Générateur : le texte de chaque étape, mis en forme au fur et à mesure.
+    """
+    for etape in etapes:
+        yield formater_etape(etape)
@@ -0,0 +1,191 @@
+# export.py
+"""
+Export sans fenêtre de l'animation de Game.py (pilote SDL "dummy") : les images
+sont rendues aussi vite que le permet le processeur, avec les fonctions de
+dessin de Game.py et la disposition enregistrée des salles, puis écrites en
+séquence d'images ou assemblées en fichier animé.
+
+    python export.py four/fourmiliere_cinq.txt --dossier images_cinq
+    python export.py four/fourmiliere_cinq.txt --video cinq.mp4 --workers 4
+
+Avec plusieurs workers, chacun rend une plage d'étapes : une première passe
+(moteur compact, sans dessin) écrit des points de reprise, et chaque worker
+repart du dernier point qui précède sa plage, assez tôt pour remplir le
+panneau des logs. Les images sont numérotées par étape : le résultat ne dépend
+pas du nombre de workers.
+
+Le fichier animé est assemblé par ffmpeg (.mp4, .webm, ...) ou, pour un .gif,
+par Pillow ; l'un ou l'autre doit être installé.
+"""
+import os
+
+# avant le premier import de pygame (Game.py ouvre son écran à l'import)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import multiprocessing
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import pygame
+
+import Game
+from enregistrement import formater_etape
+from lecteur import interpoler
+from main import charger_fichier
+from reprise import Points
+
+# image k : k-ième image de l'animation (0 : toutes les fourmis dans Sv)
+MOTIF = "image_{:06d}.png"
+# écart entre deux points de reprise de la première passe
+PERIODE_POINTS = 50
+
+
+def rendre(path, dossier, images_par_etape=4, debut=1, fin=None, moteur="compact", dossier_points=None):
+    """
+    Rend les images des étapes debut..fin (incluses ; jusqu'à la dernière si
+    fin vaut None) dans `dossier`. Avec `dossier_points` (points de reprise de
+    la même fourmilière), la simulation repart du dernier point qui précède
+    debut d'au moins Game.NB_LOGS étapes au lieu de repartir de E1.
+    Retourne le nombre d'images écrites.
+    """
+    fourmiliere = charger_fichier(path)
+    pos = Game.positions_ecran(path, fourmiliere)
+    noms = fourmiliere.graphe().noms
+    coords = [pos.get(nom) for nom in noms]
+
+    point = None
+    if dossier_points is not None and debut > 1:
+        point = Points(dossier_points).dernier(fourmiliere, max(debut - 1 - Game.NB_LOGS, 0))
+    if point is None:
+        fourmis_pos = {fid: pos["Sv"] for fid in range(1, fourmiliere.nb_fourmis + 1)}
+    else:
+        fourmis_pos = {k + 1: coords[salle] for k, salle in enumerate(point.position)}
+    logs = deque(maxlen=Game.NB_LOGS)
+    cache = Game.CacheRendu(fourmiliere, pos)
+    os.makedirs(dossier, exist_ok=True)
+
+    def ecrire(numero):
+        Game.draw_simulation(fourmiliere, pos, fourmis_pos, logs, cache)
+        pygame.image.save(Game.screen, os.path.join(dossier, MOTIF.format(numero)))
+
+    nb_images = 0
+    if debut <= 1:
+        ecrire(0)
+        nb_images += 1
+    for etape in fourmiliere.iter_etapes(moteur, reprise=point):
+        if fin is not None and etape.numero > fin:
+            break
+        dessinee = etape.numero >= debut
+        if dessinee:
+            premiere = (etape.numero - 1) * images_par_etape
+            # même interpolation que l'animation de Game.py
+            for k in range(1, images_par_etape):
+                interpoler(etape, coords, fourmis_pos, k / images_par_etape)
+                ecrire(premiere + k)
+                nb_images += 1
+        interpoler(etape, coords, fourmis_pos, 1.0)
+        logs.append(formater_etape(etape))
+        if dessinee:
+            ecrire(etape.numero * images_par_etape)
+            nb_images += 1
+    return nb_images
+
+
+def _rendre(tache):
+    return rendre(*tache)
+
+
+def plages(nb_etapes, nb):
+    """
+    Découpe 1..nb_etapes en au plus `nb` plages contiguës (debut, fin) de tailles voisines.
+    """
+    nb = max(1, min(nb, nb_etapes))
+    bornes = [1 + nb_etapes * k // nb for k in range(nb + 1)]
+    return [(bornes[k], bornes[k + 1] - 1) for k in range(nb)]
+
+
+def exporter(path, dossier, images_par_etape=4, workers=1, moteur="compact"):
+    """
+    Rend toute l'animation dans `dossier`, sur `workers` processus.
+    Retourne le nombre d'images écrites.
+    """
+    if workers <= 1:
+        return rendre(path, dossier, images_par_etape, moteur=moteur)
+
+    with tempfile.TemporaryDirectory() as dossier_points:
+        # première passe : nombre d'étapes et points de reprise, sans dessin
+        fourmiliere = charger_fichier(path)
+        nb_etapes = 0
+        for etape in fourmiliere.iter_etapes("compact", points=Points(dossier_points, PERIODE_POINTS)):
+            nb_etapes = etape.numero
+        taches = [
+            (path, dossier, images_par_etape, debut, fin, moteur, dossier_points)
+            for debut, fin in plages(nb_etapes, workers)
+        ]
+        # processus neufs : chacun ouvre son propre écran SDL
+        contexte = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=contexte) as pool:
+            return sum(pool.map(_rendre, taches))
+
+
+def assembler(dossier, sortie, images_par_seconde=30):
+    """
+    Assemble les images de `dossier` en fichier animé : GIF avec Pillow, tout
+    autre format avec ffmpeg (selon l'extension de `sortie`).
+    """
+    if sortie.lower().endswith(".gif"):
+        try:
+            from PIL import Image
+        except ImportError:
+            raise RuntimeError("Pillow est nécessaire pour écrire un GIF (pip install pillow)") from None
+        fichiers = sorted(f for f in os.listdir(dossier) if f.startswith("image_"))
+        images = [Image.open(os.path.join(dossier, f)) for f in fichiers]
+        images[0].save(sortie, save_all=True, append_images=images[1:], loop=0,
+                       duration=round(1000 / images_par_seconde))
+        return sortie
+
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise RuntimeError("ffmpeg est nécessaire pour écrire une vidéo (ou exporter en .gif / en images)")
+    subprocess.run(
+        [ffmpeg, "-y", "-loglevel", "error", "-framerate", str(images_par_seconde),
+         "-i", os.path.join(dossier, MOTIF.replace("{:06d}", "%06d")), "-pix_fmt", "yuv420p", sortie],
+        check=True,
+    )
+    return sortie
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export sans fenêtre de l'animation d'une fourmilière.")
+    parser.add_argument("fichier", help="fichier de fourmilière (.txt)")
+    parser.add_argument("--dossier", help="dossier des images (PNG numérotées)")
+    parser.add_argument("--video", metavar="FICHIER", help="fichier animé (.mp4 via ffmpeg, .gif via Pillow)")
+    parser.add_argument("--images-par-etape", type=int, default=4,
+                        help="images par étape (interpolation des déplacements, défaut : 4)")
+    parser.add_argument("--ips", type=int, default=30, help="images par seconde du fichier animé")
+    parser.add_argument("--workers", type=int, default=1, help="processus de rendu (défaut : 1)")
+    parser.add_argument("--moteur", choices=("objets", "compact", "numpy"), default="compact")
+    args = parser.parse_args()
+    if not args.dossier and not args.video:
+        parser.error("indiquer --dossier et/ou --video")
+    if args.images_par_etape < 1:
+        parser.error("--images-par-etape doit être positif")
+
+    dossier = args.dossier or tempfile.mkdtemp(prefix="export_")
+    try:
+        nb = exporter(args.fichier, dossier, args.images_par_etape, args.workers, args.moteur)
+        print(f"{nb} images dans {dossier}", file=sys.stderr)
+        if args.video:
+            assembler(dossier, args.video, args.ips)
+            print(f"animation : {args.video}", file=sys.stderr)
+    except RuntimeError as e:
+        print(f"Erreur : {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if not args.dossier:
+            shutil.rmtree(dossier, ignore_errors=True)
@@ -1,16 +1,21 @@
 # ants.py
+from array import array
 from collections import deque, defaultdict
-import networkx as nx
+import heapq
 import itertools
+from time import perf_counter
+from graphe import GrapheCompact
+from enregistrement import Etape
 
 class Fourmi:
     """
     Représente une fourmi individuelle.
     """
-    def __init__(self, id_, emplacement="Sv"):
+    def __init__(self, id_, emplacement="Sv", historique=False):
         self.id = id_                  
         self.emplacement = emplacement 
-        self.historique = []           
+        # déplacements (départ, arrivée) gardés seulement sur demande (voir traces.py)
+        self.historique = [] if historique else None
         self.chemin = None
         self.index = None
 
@@ -18,7 +23,8 @@ class Fourmi:
         """
         Déplace la fourmi vers une nouvelle salle.
         """
-        self.historique.append((self.emplacement, nouvelle_salle))
+        if self.historique is not None:
+            self.historique.append((self.emplacement, nouvelle_salle))
         self.emplacement = nouvelle_salle
 
     def __repr__(self):
@@ -74,28 +80,268 @@ class Fourmiliere:
     def __init__(self, nb_fourmis=0):
         self.nb_fourmis = nb_fourmis
         self.salles = {}
-        self.tunnels = defaultdict(list)
+        self._tunnels = defaultdict(list)
+
+        # adjacence compacte et index des plus courts chemins vers Sd,
+        # recalculés seulement si la fourmilière change
+        self._graphe = None
+        self._distances = None
+        self._prochains = {}
+        self._prochains_noms = {}
 
         self.salles["Sv"] = Salle("Sv", capacite=float("inf"))
         self.salles["Sd"] = Salle("Sd", capacite=float("inf"))
 
-        self.fourmis = [Fourmi(i + 1, "Sv") for i in range(nb_fourmis)]
-        for f in self.fourmis:
-            self.salles["Sv"].ajouter_fourmi(f)
+        # les objets Fourmi ne sont créés qu'au premier accès (le moteur compact s'en passe)
+        self._fourmis = None
+        # nombre d'étapes de la dernière resimulation (voir resimuler)
+        self.nb_etapes = None
+        # si vrai, chaque Fourmi (moteur "objets") garde la liste de ses déplacements
+        self.historique = False
+
+    @classmethod
+    def depuis_graphe(cls, graphe):
+        """
+        Construit la fourmilière à partir d'un GrapheCompact (voir parseur.py),
+        sans repasser par ajouter_salle / ajouter_tunnel pour chaque ligne.
+        Le graphe sert directement d'adjacence ; le dictionnaire des tunnels n'est
+        construit qu'au premier accès à `tunnels`.
+        """
+        fourmiliere = cls(graphe.nb_fourmis)
+        noms = graphe.noms
+        for i in range(2, graphe.nb_salles):
+            fourmiliere.salles[noms[i]] = Salle(noms[i], graphe.capacite(i))
+        fourmiliere._tunnels = None
+        fourmiliere._graphe = graphe
+        return fourmiliere
+
+    @property
+    def tunnels(self):
+        """
+        Dictionnaire salle -> voisins (chaque tunnel apparaît aux deux extrémités).
+        """
+        if self._tunnels is None:
+            tunnels = defaultdict(list)
+            noms = self._graphe.noms
+            extremites = self._graphe.tunnels
+            for k in range(0, len(extremites), 2):
+                s1, s2 = noms[extremites[k]], noms[extremites[k + 1]]
+                tunnels[s1].append(s2)
+                tunnels[s2].append(s1)
+            self._tunnels = tunnels
+        return self._tunnels
+
+    def graphe(self):
+        """
+        Adjacence compacte (GrapheCompact) de la fourmilière, construite une fois
+        et conservée jusqu'à la prochaine modification.
+        """
+        if self._graphe is None:
+            noms = list(self.salles)
+            noms += [nom for nom in self._tunnels if nom not in self.salles]
+            capacites = [
+                GrapheCompact.INFINIE if s.capacite == float("inf") else s.capacite
+                for s in self.salles.values()
+            ]
+            capacites += [0] * (len(noms) - len(capacites))
+            self._graphe = GrapheCompact.depuis_listes(self.nb_fourmis, noms, capacites, self._tunnels)
+        return self._graphe
+
+    @property
+    def fourmis(self):
+        """
+        Liste des fourmis, créées dans Sv au premier accès.
+        """
+        if self._fourmis is None:
+            self._fourmis = [Fourmi(i + 1, "Sv", self.historique) for i in range(self.nb_fourmis)]
+            for f in self._fourmis:
+                self.salles["Sv"].ajouter_fourmi(f)
+        return self._fourmis
 
     def ajouter_salle(self, nom, capacite=1):
         """
         Ajoute une salle dans la fourmilière.
         """
         if nom not in self.salles:
+            self._invalider_index()
             self.salles[nom] = Salle(nom, capacite)
 
     def ajouter_tunnel(self, s1, s2):
         """
         Ajoute une connexion bidirectionnelle entre deux salles.
+        Si l'index des distances est déjà construit, il est mis à jour sur place
+        plutôt que recalculé (voir _maj_index_tunnel).
+        """
+        if self._distances is None:
+            self._invalider_index()
+            self.tunnels[s1].append(s2)
+            self.tunnels[s2].append(s1)
+        else:
+            self._maj_index_tunnel(s1, s2, ajout=True)
+
+    def retirer_tunnel(self, s1, s2):
+        """
+        Supprime la connexion entre deux salles (toutes ses occurrences).
+        Lève ValueError si les deux salles ne sont pas reliées.
+        """
+        if s1 == s2 or s2 not in self.tunnels.get(s1, ()):
+            raise ValueError(f"Aucun tunnel entre {s1} et {s2}")
+        if self._distances is None:
+            self._invalider_index()
+            self._retirer_des_listes(s1, s2)
+        else:
+            self._maj_index_tunnel(s1, s2, ajout=False)
+
+    def _retirer_des_listes(self, s1, s2):
+        tunnels = self.tunnels
+        tunnels[s1] = [v for v in tunnels[s1] if v != s2]
+        tunnels[s2] = [v for v in tunnels[s2] if v != s1]
+
+    def changer_capacite(self, nom, capacite):
+        """
+        Change la capacité d'une salle (hors Sv / Sd). Les distances et les
+        prochains sauts ne dépendent que des tunnels : rien n'est recalculé.
+        """
+        if nom in ("Sv", "Sd"):
+            raise ValueError(f"La capacité de {nom} est infinie")
+        if nom not in self.salles:
+            raise ValueError(f"Salle inconnue : {nom}")
+        self.salles[nom].capacite = capacite
+        if self._graphe is not None:
+            capacites = self._graphe.capacites
+            if isinstance(capacites, memoryview):
+                # vue en lecture seule sur le cache binaire : copie modifiable
+                capacites = self._graphe.capacites = array("q", capacites)
+            capacites[self._graphe.indices[nom]] = (
+                GrapheCompact.INFINIE if capacite == float("inf") else capacite
+            )
+
+    def _maj_index_tunnel(self, s1, s2, ajout):
+        """
+        Ajoute ou retire le tunnel s1 - s2 en gardant l'index construit :
+        l'adjacence compacte est reconstruite, les distances à Sd ne sont
+        corrigées que là où elles changent, et seules les tables de prochains sauts
+        qui peuvent dépendre de ce tunnel sont oubliées.
+        La table d'une salle à distance d de Sd ne lit que l'adjacence des salles
+        à moins de d tunnels d'elle (voir sauts) : elle reste valable si s1 et s2
+        sont toutes deux au moins à cette distance.
         """
-        self.tunnels[s1].append(s2)
-        self.tunnels[s2].append(s1)
+        if ajout:
+            self.tunnels[s1].append(s2)
+            self.tunnels[s2].append(s1)
+            self._graphe = None
+            graphe = self.graphe()
+        else:
+            # parcours sur l'ancien graphe, qui contient encore le tunnel
+            graphe = self.graphe()
+        indices = graphe.indices
+
+        # salles à table en cache, avec la distance à Sd avant modification
+        avant = dict(self._distances)
+        en_cache = {graphe.noms[i] for i in self._prochains} | set(self._prochains_noms)
+        limite = max((avant.get(nom) or 0 for nom in en_cache), default=0)
+        proches = []
+        if en_cache and limite:
+            for extremite in (s1, s2):
+                _, niveaux = graphe.predecesseurs(indices[extremite], limite)
+                proches.append(niveaux)
+
+        if ajout:
+            modifiees = self._distances_ajout(graphe, s1, s2)
+        else:
+            self._retirer_des_listes(s1, s2)
+            self._graphe = None
+            modifiees = self._distances_retrait(self.graphe(), s1, s2)
+
+        for nom in en_cache:
+            d = max(avant.get(nom) or 0, self._distances.get(nom) or 0)
+            i = indices[nom]
+            if nom in modifiees or any(niveaux.get(i, d) < d for niveaux in proches):
+                self._prochains.pop(i, None)
+                self._prochains_noms.pop(nom, None)
+
+    def _distances_ajout(self, graphe, s1, s2):
+        """
+        Corrige les distances à Sd après ajout du tunnel s1 - s2 : seules les
+        salles rapprochées de Sd par ce tunnel sont parcourues.
+        Retourne l'ensemble des salles dont la distance a changé.
+        """
+        distances = self._distances
+        noms, indices = graphe.noms, graphe.indices
+        modifiees = set()
+        for a, b in ((s1, s2), (s2, s1)):
+            da, db = distances.get(a), distances.get(b)
+            if da is None or (db is not None and db <= da + 1):
+                continue
+            distances[b] = da + 1
+            modifiees.add(b)
+            file = deque([b])
+            while file:
+                u = file.popleft()
+                d = distances[u] + 1
+                for w in graphe.voisins(indices[u]):
+                    w = noms[w]
+                    dw = distances.get(w)
+                    if dw is None or dw > d:
+                        distances[w] = d
+                        modifiees.add(w)
+                        file.append(w)
+        return modifiees
+
+    def _distances_retrait(self, graphe, s1, s2):
+        """
+        Corrige les distances à Sd après retrait du tunnel s1 - s2 (`graphe` ne le
+        contient plus) : on cherche, niveau par niveau, les salles qui n'ont plus
+        aucun voisin plus proche de Sd, puis on recalcule leurs distances depuis
+        les salles intactes qui les bordent.
+        Retourne l'ensemble des salles dont la distance a changé.
+        """
+        distances = self._distances
+        noms, indices = graphe.noms, graphe.indices
+        d1, d2 = distances.get(s1), distances.get(s2)
+        if d1 is None or d1 == d2:
+            return set()
+        loin = s1 if d1 > d2 else s2
+
+        def voisins(nom):
+            return [noms[w] for w in graphe.voisins(indices[nom])]
+
+        touchees = set()
+
+        def a_un_parent(nom):
+            d = distances[nom] - 1
+            return any(distances.get(v) == d and v not in touchees for v in voisins(nom))
+
+        niveau = [] if a_un_parent(loin) else [loin]
+        touchees.update(niveau)
+        while niveau:
+            suivant = []
+            for u in niveau:
+                d = distances[u] + 1
+                for w in voisins(u):
+                    if w not in touchees and distances.get(w) == d and not a_un_parent(w):
+                        touchees.add(w)
+                        suivant.append(w)
+            niveau = suivant
+        if not touchees:
+            return set()
+
+        avant = {nom: distances.pop(nom) for nom in touchees}
+        # plus courts chemins depuis la bordure intacte (poids 1 : tas de petite taille)
+        tas = []
+        for nom in touchees:
+            d = min((distances[v] + 1 for v in voisins(nom) if v in distances), default=None)
+            if d is not None:
+                heapq.heappush(tas, (d, nom))
+        while tas:
+            d, u = heapq.heappop(tas)
+            if u in distances:
+                continue
+            distances[u] = d
+            for w in voisins(u):
+                if w in touchees and w not in distances:
+                    heapq.heappush(tas, (d + 1, w))
+        return {nom for nom in touchees if distances.get(nom) != avant[nom]}
 
     def voisins(self, salle_nom):
         """
@@ -106,47 +352,319 @@ class Fourmiliere:
     def toutes_au_dortoir(self):
         """
         Vérifie si toutes les fourmis sont arrivées dans Sd.
+        La file du dortoir tient le compte des arrivées : pas de parcours des fourmis.
         """
-        return all(f.emplacement == "Sd" for f in self.fourmis)
+        return len(self.salles["Sd"].file) == len(self.fourmis)
 
     def construire_graphe(self):
         """
         Construit un graphe NetworkX à partir des tunnels.
+        Simple vue pour les layouts : NetworkX n'est importé qu'ici, la simulation
+        travaille sur l'adjacence compacte (voir graphe()).
         """
+        import networkx as nx
+        graphe = self.graphe()
+        noms = graphe.noms
         G = nx.Graph()
-        for s1, voisins in self.tunnels.items():
-            for s2 in voisins:
-                G.add_edge(s1, s2)
+        # ajout dans l'ordre de l'adjacence : même graphe (et même ordre) qu'avant
+        ordre, debuts, voisins = graphe.adjacence()
+        for v in ordre:
+            for k in range(debuts[v], debuts[v + 1]):
+                G.add_edge(noms[v], noms[voisins[k]])
         return G
 
+    def _invalider_index(self):
+        """
+        Oublie l'adjacence compacte, l'index des distances et des prochains sauts
+        (fourmilière modifiée). Les tunnels sont d'abord matérialisés s'ils ne
+        vivaient que dans le graphe compact.
+        """
+        self.tunnels
+        self._graphe = None
+        self._distances = None
+        self._prochains = {}
+        self._prochains_noms = {}
+
+    def construire_index(self):
+        """
+        Construit une seule fois l'index des distances à Sd par parcours en largeur
+        inverse depuis le dortoir. Retourne {nom de salle: distance}.
+        """
+        if self._distances is not None:
+            return self._distances
+        graphe = self.graphe()
+        noms = graphe.noms
+        self._distances = {noms[i]: d for i, d in graphe.distances(graphe.indices["Sd"]).items()}
+        self._prochains = {}
+        self._prochains_noms = {}
+        return self._distances
+
+    def sauts(self, salle):
+        """
+        Table des prochains sauts de la salle d'indice `salle` (indices du graphe
+        compact) : liste de (voisin, chemin) où chemin est un tuple d'indices formant
+        un plus court chemin salle -> Sd passant par ce voisin.
+        L'ordre et les chemins sont ceux qu'énumérerait nx.all_shortest_paths
+        (premier chemin rencontré pour chaque voisin), la table est calculée une
+        fois par salle puis mise en cache.
+        """
+        table = self._prochains.get(salle)
+        if table is not None:
+            return table
+
+        graphe = self.graphe()
+        sd = graphe.indices["Sd"]
+        d = self.construire_index().get(graphe.noms[salle])
+        if not d:
+            # salle déconnectée de Sd (ou Sd lui-même) : aucun saut possible
+            table = []
+        elif d == 1:
+            table = [(sd, (salle, sd))]
+        else:
+            # mêmes listes de prédécesseurs que nx.all_shortest_paths depuis `salle`
+            pred, niveaux = graphe.predecesseurs(salle, d)
+            # voisins de `salle` (niveau 1) atteignables en remontant depuis chaque noeud
+            voisins = {}
+            for v, niv in niveaux.items():
+                if niv == 1:
+                    voisins[v] = frozenset((v,))
+                elif niv > 1:
+                    voisins[v] = frozenset().union(*(voisins[p] for p in pred[v]))
+
+            # parcours en profondeur depuis Sd dans l'ordre de nx, en élaguant les
+            # branches dont tous les premiers sauts ont déjà leur chemin
+            table = []
+            couverts = set()
+            pile = [iter(pred[sd])]
+            chemin = [sd]
+            while pile:
+                p = next((p for p in pile[-1] if voisins[p] - couverts), None)
+                if p is None:
+                    pile.pop()
+                    chemin.pop()
+                elif niveaux[p] == 1:
+                    couverts.add(p)
+                    table.append((p, (salle, p) + tuple(reversed(chemin))))
+                else:
+                    pile.append(iter(pred[p]))
+                    chemin.append(p)
+
+        self._prochains[salle] = table
+        return table
 
-    def simuler(self):
+    def prochains_sauts(self, salle):
+        """
+        Même table que sauts(), par noms de salles : liste de (voisin, chemin).
+        """
+        table = self._prochains_noms.get(salle)
+        if table is None:
+            graphe = self.graphe()
+            noms = graphe.noms
+            i = graphe.indices.get(salle)
+            table = [] if i is None else [
+                (noms[v], [noms[s] for s in chemin]) for v, chemin in self.sauts(i)
+            ]
+            self._prochains_noms[salle] = table
+        return table
+
+    def simuler(self, moteur="objets", stats=None):
         """
         Simule le déplacement de toutes les fourmis vers Sd en dispatchant sur plusieurs chemins.
-        Retourne la liste des logs d'étapes.
+        Retourne la liste des étapes (enregistrement.Etape) ; le texte des logs
+        s'obtient avec formater_etape / formater_etapes.
+        Voir iter_etapes pour la stratégie, le choix du moteur et `stats`.
+        """
+        return list(self.iter_etapes(moteur, stats))
+
+    def estimer(self):
+        """
+        Encadre sans simuler le nombre d'étapes des moteurs gloutons ("objets",
+        "compact", "numpy") : minorant par la plus petite coupe de salles des plus
+        courts chemins, majorant par leur plus petite capacité (voir
+        ordonnanceur_flot.borne_etapes). Le majorant ignore les chemins parallèles :
+        il est très large quand le goulot n'est pas une seule salle.
+        Retourne (minorant, majorant), float("inf") pour une borne infinie.
+        """
+        from ordonnanceur_flot import INFINI, borne_etapes, coupe_minimale
+        longueur, coupe, capacite_min = coupe_minimale(self)
+        if longueur is None:
+            raise RuntimeError("Aucun chemin Sv -> Sd trouvé!")
+        bornes = (borne_etapes(longueur, self.nb_fourmis, coupe),
+                  borne_etapes(longueur, self.nb_fourmis, capacite_min))
+        return tuple(float("inf") if b >= INFINI else b for b in bornes)
+
+    def vue(self):
+        """
+        Nouvelle fourmilière, toutes les fourmis dans Sv, sur la même adjacence et
+        le même index des chemins (partagés : ni l'une ni l'autre ne doit plus être
+        modifiée). Plusieurs simulations "objets" d'une même fourmilière peuvent
+        ainsi tourner en même temps sans recalculer l'index.
+        """
+        vue = Fourmiliere.depuis_graphe(self.graphe())
+        vue._distances = self.construire_index()
+        vue._prochains = self._prochains
+        vue._prochains_noms = self._prochains_noms
+        return vue
+
+    def reinitialiser(self):
+        """
+        Remet toutes les fourmis dans Sv pour une nouvelle simulation ; l'adjacence
+        et l'index des chemins sont conservés.
+        """
+        for salle in self.salles.values():
+            salle.file.clear()
+        self._fourmis = None
+
+    def resimuler(self, moteur="objets"):
+        """
+        Relance la simulation depuis Sv après des modifications (changer_capacite,
+        ajouter_tunnel, retirer_tunnel), en réutilisant l'index mis à jour.
+        Retourne (nombre d'étapes, différence avec la resimulation précédente),
+        la différence valant None la première fois.
+        """
+        self.reinitialiser()
+        nb_etapes = sum(1 for _ in self.iter_etapes(moteur))
+        difference = None if self.nb_etapes is None else nb_etapes - self.nb_etapes
+        self.nb_etapes = nb_etapes
+        return nb_etapes, difference
+
+    def iter_etapes(self, moteur="objets", stats=None, reprise=None, points=None, trace=None):
+        """
+        Générateur : simule le déplacement des fourmis vers Sd et produit, au fur et à
+        mesure, un enregistrement enregistrement.Etape par étape (ids des fourmis,
+        indices des salles de départ et d'arrivée dans self.graphe().noms).
         Cette version tente de recalculer un chemin alternatif (parmi les plus courts)
         pour une fourmi si sa prochaine salle prévue est indisponible.
+        moteur="compact" délègue à MoteurCompact (tableaux d'entiers, mêmes étapes),
+        adapté aux très grandes colonies.
+        moteur="numpy" délègue à moteur_numpy.MoteurNumpy (mêmes étapes, chaque étape
+        calculée par tableaux NumPy ; NumPy requis), au-delà de 10^5 fourmis.
+        moteur="flot" utilise OrdonnanceurFlot : autre stratégie, qui calcule par flot
+        le nombre minimal d'étapes permis par les capacités et le plan associé.
+        stats : objet instrumentation.Statistiques optionnel, qui reçoit les durées
+        des phases et les compteurs de chaque étape (aucune mesure sinon).
+        reprise : reprise.PointDeReprise optionnel ; la simulation repart de l'état
+        qu'il décrit et la première étape produite est la suivante (reprise.etape + 1).
+        points : reprise.Points optionnel, qui reçoit un point de reprise toutes les
+        points.periode étapes. Les points valent pour les trois moteurs gloutons
+        ("objets", "compact", "numpy") : ils simulent exactement les mêmes étapes.
+        Ces trois moteurs n'envoient jamais une fourmi dans une salle sans issue
+        vers Sd, et lèvent blocages.Blocage avant la première étape si aucune
+        fourmi ne peut arriver (voir blocages.py).
+        trace : traces.EcritureTrace optionnelle, qui reçoit les mouvements de
+        chaque étape (écrits sur disque par lots, voir traces.py).
         """
-        # construit le graphe NetworkX une seule fois (il ne change pas pendant la sim)
-        G = self.construire_graphe()
-        # vérif basique
-        if not nx.has_path(G, "Sv", "Sd"):
-            raise RuntimeError("Aucun chemin Sv -> Sd trouvé!")
+        if moteur == "flot":
+            if reprise is not None or points is not None:
+                raise ValueError("Points de reprise : moteurs objets, compact et numpy seulement")
+            from ordonnanceur_flot import OrdonnanceurFlot
+            moteur_ = None
+            etapes = OrdonnanceurFlot(self).iter_etapes(stats)
+        elif moteur == "compact":
+            from moteur_compact import MoteurCompact
+            moteur_ = MoteurCompact(self)
+            etapes = moteur_.iter_etapes(stats, reprise)
+        elif moteur == "numpy":
+            from moteur_numpy import MoteurNumpy
+            moteur_ = MoteurNumpy(self)
+            etapes = moteur_.iter_etapes(stats, reprise)
+        elif moteur == "objets":
+            moteur_ = self
+            etapes = self._iter_etapes_objets(stats, reprise)
+        else:
+            raise ValueError(f"Moteur inconnu : {moteur}")
+
+        if points is None and trace is None:
+            yield from etapes
+            return
+        for etape in etapes:
+            # l'état est celui de la fin de l'étape tant qu'elle n'a pas été consommée
+            if points is not None and etape.numero % points.periode == 0:
+                points.enregistrer(moteur_.point_de_reprise(etape.numero))
+            if trace is not None:
+                trace.ajouter(etape)
+            yield etape
+        if trace is not None:
+            trace.vider()
+
+    def point_de_reprise(self, etape):
+        """
+        État courant des fourmis du moteur "objets" (fin de l'étape `etape`),
+        en reprise.PointDeReprise.
+        """
+        from reprise import PointDeReprise, empreinte
+        indices = self.graphe().indices
+        ids_chemins = {}
+        position, chemin, index = array("i"), array("i"), array("i")
+        for f in self.fourmis:
+            cle = tuple(indices[s] for s in f.chemin) if f.chemin is not None else ()
+            position.append(indices[f.emplacement])
+            chemin.append(ids_chemins.setdefault(cle, len(ids_chemins)))
+            index.append(f.index or 0)
+        return PointDeReprise(etape, empreinte(self), position, chemin, index, list(ids_chemins))
+
+    def restaurer(self, reprise):
+        """
+        Place les fourmis (et remplit les files des salles) selon un reprise.PointDeReprise.
+        """
+        reprise.verifier(self)
+        noms = self.graphe().noms
+        chemins = [[noms[s] for s in p] for p in reprise.chemins]
+        for salle in self.salles.values():
+            salle.file.clear()
+        self._fourmis = []
+        for k, (salle, id_chemin, index) in enumerate(zip(reprise.position, reprise.chemin, reprise.index)):
+            f = Fourmi(k + 1, noms[salle], self.historique)
+            f.chemin = list(chemins[id_chemin])
+            f.index = index
+            self.salles[f.emplacement].file.append(f)
+            self._fourmis.append(f)
+
+    def _iter_etapes_objets(self, stats=None, reprise=None):
+        """
+        Moteur "objets" de iter_etapes : objets Fourmi et files des salles.
+        """
+        # distances à Sd calculées une fois : les re-routages deviennent des lectures de table
+        # (adjacence compacte construite une seule fois, elle ne change pas pendant la sim)
+        graphe = self.graphe()
+        # salles sans issue vers Sd, traitées comme pleines (Blocage si Sv en est une)
+        from blocages import deadlock, preparer
+        _, salles_impasses = preparer(self)
+        salles_impasses = [graphe.noms[i] for i in salles_impasses]
 
-        logs = []
         etape = 1
 
         # Dispatcher les fourmis sur les chemins disponibles (round-robin) — optionnel ici
-        tous_chemins = list(nx.all_shortest_paths(G, source="Sv", target="Sd"))
+        noms = graphe.noms
+        indices = graphe.indices
+        # le tourniquet n'utilise que les nb_fourmis premiers chemins : inutile
+        # d'énumérer les autres (leur nombre explose sur une grille)
+        tous_chemins = [
+            [noms[s] for s in p]
+            for p in itertools.islice(graphe.plus_courts_chemins(graphe.indices["Sv"], graphe.indices["Sd"]),
+                                      max(self.nb_fourmis, 1))
+        ]
         if not tous_chemins:
             raise RuntimeError("Aucun chemin Sv -> Sd trouvé!")
-        cycle_chemins = itertools.cycle(tous_chemins)
-        for f in self.fourmis:
-            f.chemin = list(next(cycle_chemins))
-            f.index = 0  # position dans le chemin
+        if reprise is not None:
+            self.restaurer(reprise)
+            etape = reprise.etape + 1
+        else:
+            cycle_chemins = itertools.cycle(tous_chemins)
+            for f in self.fourmis:
+                f.chemin = list(next(cycle_chemins))
+                f.index = 0  # position dans le chemin
+
+        # fourmis encore en route : seules elles coûtent du travail à chaque étape
+        actives = [f for f in self.fourmis if f.emplacement != "Sd"]
 
         # Boucle de simulation
-        while not self.toutes_au_dortoir():
+        while actives:
+            if stats is not None:
+                t_candidats = perf_counter()
+                duree_reroutage = 0.0
+            reroutages = reroutages_reussis = 0
+
             # Calculer occupation actuelle et places disponibles
             occ = {nom: len(s.file) for nom, s in self.salles.items()}
             available = {}
@@ -155,28 +673,30 @@ class Fourmiliere:
                     available[nom] = float("inf")
                 else:
                     available[nom] = s.capacite - occ[nom]
+            for nom in salles_impasses:
+                available[nom] = 0
 
             # Construire liste de candidats (ant, prochaine salle, distance restante)
             candidats = []
-            for f in self.fourmis:
-                if f.emplacement == "Sd":
-                    continue
+            for f in actives:
                 # sécurité : si chemin mal initialisé ou si on est déjà au bout
                 if f.chemin is None or f.index is None or f.index + 1 >= len(f.chemin):
-                    # tenter de (re)calculer un plus court chemin depuis la position courante
-                    try:
-                        # récupérer un chemin le plus court
-                        p = next(nx.all_shortest_paths(G, source=f.emplacement, target="Sd"))
-                        f.chemin = list(p)
-                        f.index = 0
-                    except (nx.NetworkXNoPath, StopIteration):
+                    # reprendre le premier plus court chemin depuis la position courante
+                    sauts = self.prochains_sauts(f.emplacement)
+                    if not sauts:
                         continue
+                    f.chemin = sauts[0][1]
+                    f.index = 0
                 prochaine = f.chemin[f.index + 1]
                 remaining = (len(f.chemin) - 1) - f.index  # nb d'étapes restantes pour Sd
                 candidats.append((remaining, f.id, f, prochaine))
 
+            if stats is not None:
+                t_tri = perf_counter()
             # Prioriser les fourmis les plus proches du dortoir (remaining ASC)
             candidats.sort(key=lambda x: (x[0], x[1]))
+            if stats is not None:
+                t_planification = perf_counter()
 
             # Planifier les mouvements en respectant les capacités via réservation
             mouvements_planifies = []
@@ -192,43 +712,41 @@ class Fourmiliere:
                         available[prochaine] -= 1
                     continue
 
-                # sinon : essayer de trouver un autre chemin le plus court depuis la position courante
+                # sinon : essayer un autre plus court chemin depuis la position courante
                 # dont le premier saut est disponible (évite d'attendre s'il y a une alternative)
-                trouve_alt = False
-                try:
-                    for path in nx.all_shortest_paths(G, source=f.emplacement, target="Sd"):
-                        if len(path) < 2:
-                            continue
-                        alt_next = path[1]
-                        if available.get(alt_next, 0) > 0:
-                            # on adopte ce chemin alternatif pour cette fourmi
-                            f.chemin = list(path)
-                            f.index = 0
-                            mouvements_planifies.append((f, f.emplacement, alt_next))
-                            # mise à jour des disponibilités comme plus haut
-                            if available[f.emplacement] != float("inf"):
-                                available[f.emplacement] += 1
-                            if available[alt_next] != float("inf"):
-                                available[alt_next] -= 1
-                            trouve_alt = True
-                            break
-                except nx.NetworkXNoPath:
-                    pass
+                reroutages += 1
+                if stats is not None:
+                    t_reroutage = perf_counter()
+                for alt_next, path in self.prochains_sauts(f.emplacement):
+                    if available.get(alt_next, 0) > 0:
+                        reroutages_reussis += 1
+                        # on adopte ce chemin alternatif pour cette fourmi
+                        f.chemin = path
+                        f.index = 0
+                        mouvements_planifies.append((f, f.emplacement, alt_next))
+                        # mise à jour des disponibilités comme plus haut
+                        if available[f.emplacement] != float("inf"):
+                            available[f.emplacement] += 1
+                        if available[alt_next] != float("inf"):
+                            available[alt_next] -= 1
+                        break
+                if stats is not None:
+                    duree_reroutage += perf_counter() - t_reroutage
 
                 # si pas d'alternative trouvée, on ne planifie pas cette fourmi ce tour-ci
 
             # Exécution des mouvements planifiés (simultanés)
             if not mouvements_planifies:
                 # Aucun mouvement possible mais pas encore toutes au dortoir => deadlock
-                raise RuntimeError(
-                    "Deadlock détecté : aucune fourmi ne peut se déplacer cette étape. "
-                    "Vérifie la topologie / capacités."
-                )
+                raise deadlock()
 
+            if stats is not None:
+                t_application = perf_counter()
             # retirer d'abord (pour simuler simultané)
             for f, depart, arrivee in mouvements_planifies:
                 self.salles[depart].retirer_fourmi(f)
             # puis ajouter / mettre à jour les fourmis
+            arrivees = 0
             for f, depart, arrivee in mouvements_planifies:
                 ok = self.salles[arrivee].ajouter_fourmi(f)
                 if not ok:
@@ -242,15 +760,36 @@ class Fourmiliere:
                 except ValueError:
                     # cas improbable : on est arrivé dans une salle qui n'est pas dans le chemin => reset
                     f.index = 0
+                if arrivee == "Sd":
+                    arrivees += 1
+
+            # retirer de la liste des actives celles qui viennent d'atteindre Sd
+            if arrivees:
+                actives = [f for f in actives if f.emplacement != "Sd"]
+
+            if stats is not None:
+                fin = perf_counter()
+                stats.enregistrer_etape(
+                    etape,
+                    [("candidats", t_candidats, t_tri), ("tri", t_tri, t_planification),
+                     ("planification", t_planification, t_application),
+                     ("reroutage", t_planification, t_planification + duree_reroutage),
+                     ("application", t_application, fin)],
+                    reroutages, reroutages_reussis,
+                    bloquees=len(candidats) - len(mouvements_planifies),
+                    occupation={
+                        nom: len(s.file) for nom, s in self.salles.items()
+                        if s.file and s.capacite != float("inf")
+                    } if stats.occupation else None,
+                )
 
-            # log de l'étape
-            log = [f"+++ E{etape} +++"]
-            for f, dep, arr in mouvements_planifies:
-                log.append(f"f{f.id} - {dep} - {arr}")
-            logs.append("\n".join(log))
+            yield Etape(
+                etape, noms,
+                array("i", [f.id for f, _, _ in mouvements_planifies]),
+                array("i", [indices[dep] for _, dep, _ in mouvements_planifies]),
+                array("i", [indices[arr] for _, _, arr in mouvements_planifies]),
+            )
             etape += 1
 
-        return logs
-
     def __repr__(self):
-        return f"Fourmiliere({len(self.salles)} salles, {len(self.fourmis)} fourmis)"
+        return f"Fourmiliere({len(self.salles)} salles, {self.nb_fourmis} fourmis)"
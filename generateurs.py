@@ -0,0 +1,97 @@
+# generateurs.py
+"""
+Générateurs de fourmilières synthétiques, au format texte lu par charger_fichier.
+Chaque générateur produit les lignes du fichier une à une (aucune liste en mémoire),
+la capacité de chaque salle est tirée dans `capacites` avec la graine `graine`.
+"""
+import random
+
+
+def _salle(nom, capacite):
+    return nom if capacite == 1 else f"{nom} {{ {capacite} }}"
+
+
+def chaine(longueur, nb_fourmis, capacites=(1,), graine=0):
+    """
+    Sv - S1 - S2 - ... - Sn - Sd.
+    """
+    rnd = random.Random(graine)
+    yield f"f={nb_fourmis}"
+    for i in range(1, longueur + 1):
+        yield _salle(f"S{i}", rnd.choice(capacites))
+    precedente = "Sv"
+    for i in range(1, longueur + 1):
+        yield f"{precedente} - S{i}"
+        precedente = f"S{i}"
+    yield f"{precedente} - Sd"
+
+
+def grille(largeur, hauteur, nb_fourmis, capacites=(1,), graine=0):
+    """
+    Grille largeur x hauteur, Sv relié au coin haut gauche, Sd au coin bas droit.
+    """
+    rnd = random.Random(graine)
+    nom = lambda x, y: f"S{y * largeur + x + 1}"
+    yield f"f={nb_fourmis}"
+    for y in range(hauteur):
+        for x in range(largeur):
+            yield _salle(nom(x, y), rnd.choice(capacites))
+    yield f"Sv - {nom(0, 0)}"
+    for y in range(hauteur):
+        for x in range(largeur):
+            if x + 1 < largeur:
+                yield f"{nom(x, y)} - {nom(x + 1, y)}"
+            if y + 1 < hauteur:
+                yield f"{nom(x, y)} - {nom(x, y + 1)}"
+    yield f"{nom(largeur - 1, hauteur - 1)} - Sd"
+
+
+def aleatoire(nb_salles, nb_fourmis, tunnels_par_salle=2, capacites=(1,), graine=0):
+    """
+    Graphe aléatoire peu dense : un arbre couvrant (toutes les salles sont reliées)
+    plus des tunnels supplémentaires tirés au hasard, environ `tunnels_par_salle`
+    tunnels par salle au total. Sv est relié à S1, Sd à la dernière salle.
+    """
+    rnd = random.Random(graine)
+    yield f"f={nb_fourmis}"
+    for i in range(1, nb_salles + 1):
+        yield _salle(f"S{i}", rnd.choice(capacites))
+    yield "Sv - S1"
+    for i in range(2, nb_salles + 1):
+        yield f"S{rnd.randint(1, i - 1)} - S{i}"
+    for _ in range(max(0, (tunnels_par_salle - 1) * nb_salles)):
+        a, b = rnd.randint(1, nb_salles), rnd.randint(1, nb_salles)
+        if a != b:
+            yield f"S{a} - S{b}"
+    yield f"S{nb_salles} - Sd"
+
+
+def goulots(nb_chemins, longueur, nb_fourmis, capacites=(1,), capacite_goulot=1, graine=0):
+    """
+    `nb_chemins` chemins parallèles de `longueur` salles entre Sv et Sd ; la salle
+    du milieu de chaque chemin est un goulot de capacité `capacite_goulot`.
+    """
+    rnd = random.Random(graine)
+    yield f"f={nb_fourmis}"
+    milieu = (longueur + 1) // 2
+    for c in range(nb_chemins):
+        for i in range(1, longueur + 1):
+            cap = capacite_goulot if i == milieu else rnd.choice(capacites)
+            yield _salle(f"C{c}_{i}", cap)
+    for c in range(nb_chemins):
+        precedente = "Sv"
+        for i in range(1, longueur + 1):
+            yield f"{precedente} - C{c}_{i}"
+            precedente = f"C{c}_{i}"
+        yield f"{precedente} - Sd"
+
+
+def ecrire(path, lignes):
+    """
+    Écrit les lignes d'un générateur dans un fichier de fourmilière.
+    """
+    with open(path, "w") as f:
+        for ligne in lignes:
+            f.write(ligne)
+            f.write("\n")
+    return path
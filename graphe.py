@@ -0,0 +1,226 @@
+# graphe.py
+from array import array
+
+
+def construire_csr(nb_salles, ordre, listes):
+    """
+    Construit l'adjacence CSR (debuts, voisins) d'un graphe non orienté.
+    `ordre` : indices des salles dans l'ordre de première apparition dans les tunnels,
+    `listes[v]` : voisins de v dans l'ordre des tunnels (doublons compris).
+    Les voisins de chaque salle sont rangés dans l'ordre où NetworkX les aurait
+    (nx.Graph construit depuis les tunnels) : d'abord les voisins apparus avant
+    elle, dans l'ordre d'apparition, puis les siens dans l'ordre des tunnels.
+    Chaque tunnel n'apparaît qu'une fois par extrémité.
+    """
+    rang = [-1] * nb_salles
+    for r, v in enumerate(ordre):
+        rang[v] = r
+    debuts = array("i", [0])
+    voisins = array("i")
+    for v in range(nb_salles):
+        liste = listes[v]
+        if liste:
+            rv = rang[v]
+            voisins.extend(sorted({x for x in liste if rang[x] < rv}, key=rang.__getitem__))
+            voisins.extend(dict.fromkeys(x for x in liste if rang[x] >= rv))
+        debuts.append(len(voisins))
+    return debuts, voisins
+
+
+class GrapheCompact:
+    """
+    Représentation compacte d'une fourmilière : salles internées en indices,
+    capacités et tunnels dans des tableaux d'entiers.
+    Sv et Sd ont toujours les indices 0 et 1 ; une capacité -1 est infinie.
+    Les tunnels sont gardés dans l'ordre du fichier, à plat : (a0, b0, a1, b1, ...).
+    L'adjacence CSR est calculée au premier besoin puis conservée.
+    """
+    SV = 0
+    SD = 1
+    INFINIE = -1
+
+    def __init__(self, nb_fourmis=0, noms=None, capacites=None, tunnels=None):
+        self.nb_fourmis = nb_fourmis
+        self.noms = noms if noms is not None else ["Sv", "Sd"]
+        self.indices = {nom: i for i, nom in enumerate(self.noms)}
+        self.capacites = capacites if capacites is not None else array("q", [self.INFINIE, self.INFINIE])
+        self.tunnels = tunnels if tunnels is not None else array("i")
+        # (ordre d'apparition, debuts, voisins), voir construire_csr
+        self._csr = None
+
+    @classmethod
+    def depuis_listes(cls, nb_fourmis, noms, capacites, tunnels):
+        """
+        Construit le graphe depuis un dictionnaire salle -> voisins (doublons compris),
+        tel que Fourmiliere.tunnels. Les clés donnent l'ordre d'apparition ;
+        chaque tunnel n'est gardé qu'une fois dans `tunnels`.
+        """
+        graphe = cls(nb_fourmis, noms, capacites)
+        indices = graphe.indices
+        ordre = [indices[nom] for nom in tunnels]
+        listes = [()] * len(noms)
+        for nom, voisins in tunnels.items():
+            listes[indices[nom]] = [indices[v] for v in voisins]
+        debuts, voisins = construire_csr(len(noms), ordre, listes)
+        graphe._csr = (ordre, debuts, voisins)
+        graphe.tunnels = array("i", graphe._aretes())
+        return graphe
+
+    def copie(self):
+        """
+        Copie dont les capacités peuvent être modifiées sans toucher à l'original ;
+        tunnels et adjacence CSR, jamais modifiés sur place, sont partagés.
+        """
+        copie = GrapheCompact(self.nb_fourmis, list(self.noms), array("q", self.capacites), self.tunnels)
+        copie._csr = self._csr
+        return copie
+
+    @property
+    def nb_salles(self):
+        return len(self.noms)
+
+    @property
+    def nb_tunnels(self):
+        return len(self.tunnels) // 2
+
+    def interner(self, nom):
+        """
+        Retourne l'indice de la salle `nom`, en la créant (capacité 1) si besoin.
+        """
+        i = self.indices.get(nom)
+        if i is None:
+            i = len(self.noms)
+            self.noms.append(nom)
+            self.indices[nom] = i
+            self.capacites.append(1)
+        return i
+
+    def capacite(self, i):
+        """
+        Capacité de la salle d'indice i (float("inf") pour Sv / Sd).
+        """
+        cap = self.capacites[i]
+        return float("inf") if cap == self.INFINIE else cap
+
+    def adjacence(self):
+        """
+        Retourne (ordre d'apparition, debuts, voisins) : les voisins de la salle v
+        sont voisins[debuts[v]:debuts[v + 1]].
+        """
+        if self._csr is None:
+            ordre = []
+            vus = set()
+            listes = [[] for _ in range(self.nb_salles)]
+            t = self.tunnels
+            for k in range(0, len(t), 2):
+                a, b = t[k], t[k + 1]
+                for s in (a, b):
+                    if s not in vus:
+                        vus.add(s)
+                        ordre.append(s)
+                listes[a].append(b)
+                listes[b].append(a)
+            debuts, voisins = construire_csr(self.nb_salles, ordre, listes)
+            self._csr = (ordre, debuts, voisins)
+        return self._csr
+
+    def voisins(self, v):
+        """
+        Voisins de la salle d'indice v, dans l'ordre de l'adjacence.
+        """
+        _, debuts, voisins = self.adjacence()
+        return voisins[debuts[v]:debuts[v + 1]]
+
+    def _aretes(self):
+        """
+        Chaque tunnel une fois, (a, b) à plat, dans l'ordre de l'adjacence.
+        """
+        ordre, debuts, voisins = self.adjacence()
+        rang = {v: r for r, v in enumerate(ordre)}
+        for v in ordre:
+            for k in range(debuts[v], debuts[v + 1]):
+                w = voisins[k]
+                if rang[w] >= rang[v]:
+                    yield v
+                    yield w
+
+    def distances(self, cible):
+        """
+        Parcours en largeur depuis `cible` : {indice: distance en tunnels}.
+        """
+        _, debuts, voisins = self.adjacence()
+        distances = {cible: 0}
+        niveau = [cible]
+        while niveau:
+            suivant = []
+            for s in niveau:
+                d = distances[s] + 1
+                for k in range(debuts[s], debuts[s + 1]):
+                    v = voisins[k]
+                    if v not in distances:
+                        distances[v] = d
+                        suivant.append(v)
+            niveau = suivant
+        return distances
+
+    def predecesseurs(self, source, limite=None):
+        """
+        Parcours en largeur depuis `source` jusqu'au niveau `limite`.
+        Retourne (pred, niveaux) comme nx.predecessor(..., return_seen=True) :
+        mêmes listes de prédécesseurs, dans le même ordre.
+        """
+        _, debuts, voisins = self.adjacence()
+        niveau = 0
+        suivant = [source]
+        niveaux = {source: 0}
+        pred = {source: []}
+        while suivant:
+            niveau += 1
+            courant = suivant
+            suivant = []
+            for v in courant:
+                for k in range(debuts[v], debuts[v + 1]):
+                    w = voisins[k]
+                    if w not in niveaux:
+                        pred[w] = [v]
+                        niveaux[w] = niveau
+                        suivant.append(w)
+                    elif niveaux[w] == niveau:
+                        pred[w].append(v)
+            if limite and limite <= niveau:
+                break
+        return pred, niveaux
+
+    def plus_courts_chemins(self, source, cible):
+        """
+        Générateur de tous les plus courts chemins source -> cible (listes d'indices),
+        dans l'ordre de nx.all_shortest_paths. Ne produit rien si cible est inaccessible.
+        """
+        pred, niveaux = self.predecesseurs(source, self.distances(cible).get(source))
+        if cible not in pred:
+            return
+        # même parcours en profondeur que networkx, remontant de la cible vers la source
+        vus = {cible}
+        pile = [[cible, 0]]
+        haut = 0
+        while haut >= 0:
+            noeud, i = pile[haut]
+            if noeud == source:
+                yield [p for p, _ in reversed(pile[:haut + 1])]
+            if len(pred[noeud]) > i:
+                pile[haut][1] = i + 1
+                suivant = pred[noeud][i]
+                if suivant in vus:
+                    continue
+                vus.add(suivant)
+                haut += 1
+                if haut == len(pile):
+                    pile.append([suivant, 0])
+                else:
+                    pile[haut][:] = [suivant, 0]
+            else:
+                vus.discard(noeud)
+                haut -= 1
+
+    def __repr__(self):
+        return f"GrapheCompact({self.nb_salles} salles, {self.nb_tunnels} tunnels, {self.nb_fourmis} fourmis)"
@@ -0,0 +1,114 @@
+# instrumentation.py
+import json
+from time import perf_counter
+
+
+class Statistiques:
+    """
+    Mesures optionnelles d'une simulation, à passer à Fourmiliere.simuler / iter_etapes.
+    Pour chaque étape : durée de chaque phase (construction des candidats, tri,
+    planification, application des mouvements), tentatives de reroutage (prochaine
+    salle indisponible) et réussites, fourmis bloquées et, si `occupation` est vrai,
+    occupation des salles (hors Sv / Sd) en fin d'étape.
+    Sans objet Statistiques, les moteurs ne font aucune de ces mesures.
+    """
+    def __init__(self, occupation=True):
+        self.occupation = occupation
+        self.origine = perf_counter()
+        self.etapes = []
+        # phases hors boucle d'étapes (ex. calcul du flot), (nom, début, fin)
+        self.phases_globales = []
+
+    def phase_globale(self, nom, debut, fin):
+        """
+        Enregistre une phase qui n'appartient à aucune étape.
+        """
+        self.phases_globales.append((nom, debut - self.origine, fin - self.origine))
+
+    def enregistrer_etape(self, etape, phases, reroutages=0, reroutages_reussis=0,
+                          bloquees=0, occupation=None):
+        """
+        Enregistre une étape ; `phases` est une liste de (nom, début, fin) en
+        secondes perf_counter.
+        """
+        self.etapes.append({
+            "etape": etape,
+            "phases": {nom: fin - debut for nom, debut, fin in phases},
+            "debuts": {nom: debut - self.origine for nom, debut, _ in phases},
+            "reroutages": reroutages,
+            "reroutages_reussis": reroutages_reussis,
+            "bloquees": bloquees,
+            "occupation": occupation,
+        })
+
+    def totaux(self):
+        """
+        Durée totale par phase (s) et compteurs cumulés sur toutes les étapes.
+        """
+        durees = {}
+        for nom, debut, fin in self.phases_globales:
+            durees[nom] = durees.get(nom, 0.0) + fin - debut
+        for e in self.etapes:
+            for nom, duree in e["phases"].items():
+                durees[nom] = durees.get(nom, 0.0) + duree
+        return {
+            "etapes": len(self.etapes),
+            "durees": durees,
+            "reroutages": sum(e["reroutages"] for e in self.etapes),
+            "reroutages_reussis": sum(e["reroutages_reussis"] for e in self.etapes),
+            "bloquees": sum(e["bloquees"] for e in self.etapes),
+        }
+
+    def vers_json(self):
+        """
+        Toutes les mesures sous forme de dictionnaire sérialisable.
+        """
+        return {
+            "totaux": self.totaux(),
+            "phases_globales": [
+                {"nom": nom, "debut": debut, "duree": fin - debut}
+                for nom, debut, fin in self.phases_globales
+            ],
+            "etapes": [
+                {k: v for k, v in e.items() if k != "debuts"} for e in self.etapes
+            ],
+        }
+
+    def ecrire_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.vers_json(), f, indent=1)
+
+    def vers_trace_chrome(self):
+        """
+        Mesures au format Trace Event (chrome://tracing, Perfetto) : une tranche
+        par phase, et des compteurs pour les reroutages et les fourmis bloquées.
+        """
+        us = 1e6
+        evenements = [
+            {"name": nom, "ph": "X", "ts": debut * us, "dur": (fin - debut) * us, "pid": 1, "tid": 1}
+            for nom, debut, fin in self.phases_globales
+        ]
+        for e in self.etapes:
+            debut_etape = min(e["debuts"].values(), default=0.0)
+            # étendue réelle de l'étape : certaines phases (reroutage) sont
+            # incluses dans d'autres, leurs durées ne s'additionnent pas
+            fin_etape = max((e["debuts"][nom] + duree for nom, duree in e["phases"].items()),
+                            default=debut_etape)
+            evenements.append({
+                "name": f"E{e['etape']}", "ph": "X", "ts": debut_etape * us,
+                "dur": (fin_etape - debut_etape) * us, "pid": 1, "tid": 1,
+            })
+            for nom, duree in e["phases"].items():
+                evenements.append({
+                    "name": nom, "ph": "X", "ts": e["debuts"][nom] * us,
+                    "dur": duree * us, "pid": 1, "tid": 1,
+                })
+            evenements.append({
+                "name": "fourmis", "ph": "C", "ts": debut_etape * us, "pid": 1,
+                "args": {"bloquees": e["bloquees"], "reroutages": e["reroutages"]},
+            })
+        return {"traceEvents": evenements, "displayTimeUnit": "ms"}
+
+    def ecrire_trace_chrome(self, path):
+        with open(path, "w") as f:
+            json.dump(self.vers_trace_chrome(), f)
@@ -0,0 +1,235 @@
+# lecteur.py
+"""
+Lecture d'une simulation par les interfaces pygame (Game.py, visual.py) : les
+étapes sont calculées dans un thread de fond et consommées au rythme de l'affichage,
+avec pause, changement de vitesse et saut à la fin.
+"""
+from time import perf_counter
+import queue
+import threading
+
+import pygame
+
+# marque de fin dans la file
+FIN = None
+
+# nombre d'images par étape animée, du plus lent au plus rapide
+VITESSES = (60, 30, 15, 8, 4, 2, 1)
+
+# touches des chiffres (rangée du haut et pavé numérique)
+CHIFFRES = {getattr(pygame, f"K_{k}"): str(k) for k in range(10)}
+CHIFFRES.update({getattr(pygame, f"K_KP{k}"): str(k) for k in range(10)})
+
+
+class LecteurEtapes:
+    """
+    Consomme un itérable d'étapes (enregistrement.Etape), typiquement
+    Fourmiliere.iter_etapes(), dans un thread de fond et le dépose dans une file
+    bornée : la fenêtre ne se fige jamais pendant le calcul, et le calcul se met
+    en attente quand `taille` étapes sont prêtes et pas encore affichées.
+    Tout ce que l'itérable initialise paresseusement (Fourmiliere.fourmis,
+    Fourmiliere.graphe()) doit l'avoir été avant de créer le lecteur.
+    """
+    def __init__(self, etapes, taille=64):
+        self.file = queue.Queue(maxsize=taille)
+        self.termine = False  # dernière étape consommée
+        self._arret = threading.Event()
+        self._thread = threading.Thread(target=self._produire, args=(etapes,), daemon=True)
+        self._thread.start()
+
+    def _produire(self, etapes):
+        try:
+            for etape in etapes:
+                if not self._deposer(etape):
+                    return
+        except Exception as e:
+            self._deposer(e)
+            return
+        self._deposer(FIN)
+
+    def _deposer(self, element):
+        # attente par tranches pour pouvoir être interrompu par arreter()
+        while not self._arret.is_set():
+            try:
+                self.file.put(element, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def suivante(self):
+        """
+        Prochaine étape si elle est déjà calculée, sinon None (sans attendre).
+        Après la dernière, self.termine est vrai ; une erreur du calcul est relancée ici.
+        """
+        if self.termine:
+            return None
+        try:
+            element = self.file.get_nowait()
+        except queue.Empty:
+            return None
+        if element is FIN:
+            self.termine = True
+            return None
+        if isinstance(element, Exception):
+            self.termine = True
+            raise element
+        return element
+
+    def arreter(self, attendre=False):
+        """
+        Abandonne le calcul (le thread s'arrête à la prochaine étape produite).
+        Avec attendre=True, rend la main une fois le thread terminé : l'itérable
+        ne touche plus à la fourmilière, qui peut être resimulée.
+        """
+        self._arret.set()
+        if attendre:
+            self._thread.join()
+
+
+class Controles:
+    """
+    État de lecture modifié au clavier :
+    Espace pause / reprise, flèche droite ou + plus vite, flèche gauche ou - plus lent,
+    Fin (ou F) pour aller directement à la fin sans animer,
+    un numéro d'étape puis Entrée pour rejouer à partir de cette étape.
+    """
+    def __init__(self, vitesse=1):
+        self.vitesse = vitesse  # indice dans VITESSES
+        self.pause = False
+        self.fin = False
+        self.saisie = ""  # numéro d'étape en cours de frappe
+        self.aller_a = None  # étape demandée, à lire (et remettre à None) par l'appelant
+
+    @property
+    def images_par_etape(self):
+        return VITESSES[self.vitesse]
+
+    def touche(self, key):
+        """
+        Applique une touche ; retourne vrai si elle correspond à un contrôle.
+        """
+        if key == pygame.K_SPACE:
+            self.pause = not self.pause
+        elif key in (pygame.K_RIGHT, pygame.K_PLUS, pygame.K_KP_PLUS):
+            self.vitesse = min(self.vitesse + 1, len(VITESSES) - 1)
+        elif key in (pygame.K_LEFT, pygame.K_MINUS, pygame.K_KP_MINUS):
+            self.vitesse = max(self.vitesse - 1, 0)
+        elif key in (pygame.K_END, pygame.K_f):
+            self.fin = True
+            self.pause = False
+        elif key in CHIFFRES:
+            self.saisie += CHIFFRES[key]
+        elif key == pygame.K_BACKSPACE:
+            self.saisie = self.saisie[:-1]
+        elif key in (pygame.K_RETURN, pygame.K_KP_ENTER) and self.saisie:
+            self.aller_a = max(int(self.saisie), 1)
+            self.saisie = ""
+            self.fin = False
+        else:
+            return False
+        return True
+
+    def etat(self, etape, termine):
+        """
+        Texte court pour le titre de la fenêtre.
+        """
+        if self.saisie:
+            mode = f"aller à l'étape {self.saisie}_"
+        elif termine:
+            mode = "terminée"
+        elif self.fin:
+            mode = "saut à la fin"
+        elif self.pause:
+            mode = "pause"
+        else:
+            mode = f"x{VITESSES[1] / self.images_par_etape:g}"
+        return f"étape {etape} - {mode}"
+
+
+def interpoler(etape, coords, fourmis_pos, t):
+    """
+    Place les fourmis de `etape` à la fraction t (0 à 1) de leur déplacement, dans
+    `fourmis_pos` (coords : positions des salles par indice) ; t = 1 : à l'arrivée.
+    """
+    if t >= 1.0:
+        for fid, arr in zip(etape.fourmis, etape.arrivees):
+            fourmis_pos[fid] = coords[arr]
+        return
+    for fid, dep, arr in zip(etape.fourmis, etape.departs, etape.arrivees):
+        (x1, y1), (x2, y2) = coords[dep], coords[arr]
+        fourmis_pos[fid] = (x1 + (x2 - x1) * t, y1 + (y2 - y1) * t)
+
+
+class Animation:
+    """
+    Avance l'animation d'une image : interpole les fourmis de l'étape courante
+    entre leurs salles de départ et d'arrivée (`pos` : salle -> (x, y)), en
+    mettant à jour `fourmis_pos` sur place. Les colonnes d'indices des étapes
+    sont lues directement (positions rangées par indice de salle). En saut à la fin, applique sans
+    animation autant d'étapes prêtes que possible pendant `budget` secondes ;
+    de même tant que l'étape `cible` n'est pas atteinte (rejouer depuis un point
+    de reprise : les quelques étapes avant celle demandée ne sont pas animées).
+    `numero` : dernière étape terminée au départ (celle du point de reprise).
+    """
+    def __init__(self, lecteur, controles, pos, fourmis_pos, budget=1/30, numero=0, cible=0):
+        self.lecteur = lecteur
+        self.controles = controles
+        self.pos = pos
+        self.fourmis_pos = fourmis_pos
+        self.budget = budget
+        self.courante = None  # Etape en cours d'animation
+        self.image = 0
+        self.numero = numero  # dernière étape terminée
+        self.cible = cible
+        self._noms = None
+        self._coords = None
+
+    @property
+    def terminee(self):
+        return self.courante is None and self.lecteur.termine
+
+    def image_suivante(self):
+        """
+        Retourne les étapes terminées pendant cette image (au plus quelques-unes,
+        sauf en saut à la fin), dans l'ordre.
+        """
+        finies = []
+        if self.controles.fin or self.numero < self.cible:
+            if self.courante is not None:
+                finies.append(self._terminer())
+            debut = perf_counter()
+            while perf_counter() - debut < self.budget and (self.controles.fin or self.numero < self.cible):
+                etape = self.lecteur.suivante()
+                if etape is None:
+                    break
+                self.courante = etape
+                finies.append(self._terminer())
+        elif not self.controles.pause:
+            if self.courante is None:
+                self.courante = self.lecteur.suivante()
+                self.image = 0
+            if self.courante is not None:
+                self.image += 1
+                t = min(1.0, self.image / self.controles.images_par_etape)
+                if t >= 1.0:
+                    finies.append(self._terminer())
+                else:
+                    interpoler(self.courante, self.coordonnees(self.courante), self.fourmis_pos, t)
+        return finies
+
+    def coordonnees(self, etape):
+        """
+        Positions des salles rangées par indice (celui des colonnes de `etape`).
+        """
+        if etape.noms is not self._noms:
+            self._noms = etape.noms
+            self._coords = [self.pos.get(nom) for nom in etape.noms]
+        return self._coords
+
+    def _terminer(self):
+        etape = self.courante
+        interpoler(etape, self.coordonnees(etape), self.fourmis_pos, 1.0)
+        self.courante = None
+        self.numero = etape.numero
+        return etape
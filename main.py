@@ -1,64 +1,211 @@
 from fourmi import Fourmiliere
+from enregistrement import formater_etape, formater_etapes
+from instrumentation import Statistiques
+from parseur import lire_fichier
+from reprise import Points
+from traces import EcritureTrace
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import argparse
+import csv
+import glob
+import json
+import os
 import sys
+import time
 
 
-def charger_fichier(path):
+def charger_fichier(path, cache=False):
     """
     Charge une fourmilière depuis un fichier texte.
+    Le fichier est lu en un seul passage (parseur.py) ; avec cache=True, un cache
+    binaire écrit à côté du .txt est réutilisé tant que la source n'a pas changé.
     """
-    nb_fourmis = 0
-    salles = []
-    tunnels = []
-
-    with open(path, "r") as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
+    return Fourmiliere.depuis_graphe(lire_fichier(path, cache=cache))
 
-            # nombre de fourmis
-            if line.startswith("f="):
-                nb_fourmis = int(line.split("=")[1].strip())
-                continue
 
-            # tunnel
-            if "-" in line:
-                s1, s2 = [x.strip() for x in line.split("-")]
-                tunnels.append((s1, s2))
-                continue
-
-            # salle
-            if "{" in line:
-                nom, cap = line.split("{")
-                nom = nom.strip()
-                cap = int(cap.strip(" }"))
-                salles.append((nom, cap))
-            else:
-                salles.append((line, 1))
+def simuler_fichier(path, moteur="objets", cache=False):
+    """
+    Charge et simule un fichier de fourmilière.
+    Retourne un résumé : nombre d'étapes, durée (s), logs, ou l'erreur rencontrée.
+    """
+    debut = time.perf_counter()
+    resultat = {"fichier": path, "etapes": None, "duree": None, "logs": None, "erreur": None}
+    try:
+        etapes = charger_fichier(path, cache).simuler(moteur)
+        resultat["etapes"] = len(etapes)
+        resultat["logs"] = list(formater_etapes(etapes))
+    except Exception as e:
+        # un fichier invalide ne doit pas interrompre tout le lot
+        resultat["erreur"] = f"{type(e).__name__}: {e}"
+    resultat["duree"] = round(time.perf_counter() - debut, 6)
+    return resultat
+
+
+def resume_estimation(path, estimer, debut=None):
+    """
+    Résumé d'une estimation pour `path` : `estimer` rend les bornes de
+    Fourmiliere.estimer ; `etapes` n'est rempli que si elles sont égales.
+    Partagé par estimer_fichier et serveur.py. `debut` : origine de la durée.
+    """
+    if debut is None:
+        debut = time.perf_counter()
+    resultat = {"fichier": path, "etapes": None, "borne_inf": None, "borne_sup": None,
+                "duree": None, "erreur": None}
+    try:
+        borne_inf, borne_sup = estimer()
+        # infini (aucune fourmi ne passe, ou majorant inconnu) : champ vide
+        resultat["borne_inf"] = None if borne_inf == float("inf") else borne_inf
+        resultat["borne_sup"] = None if borne_sup == float("inf") else borne_sup
+        if borne_inf == borne_sup:
+            resultat["etapes"] = borne_inf
+    except Exception as e:
+        resultat["erreur"] = f"{type(e).__name__}: {e}"
+    resultat["duree"] = round(time.perf_counter() - debut, 6)
+    return resultat
+
+
+def estimer_fichier(path, cache=False):
+    """
+    Charge un fichier et encadre son nombre d'étapes sans simuler (Fourmiliere.estimer).
+    """
+    return resume_estimation(path, lambda: charger_fichier(path, cache).estimer())
 
-    # construction de la fourmilière
-    fourmiliere = Fourmiliere(nb_fourmis)
-    for nom, cap in salles:
-        fourmiliere.ajouter_salle(nom, cap)
-    for s1, s2 in tunnels:
-        fourmiliere.ajouter_tunnel(s1, s2)
 
-    return fourmiliere
+def lister_fichiers(cible):
+    """
+    Liste (triée) des fichiers .txt d'un dossier, ou des fichiers d'un motif glob.
+    """
+    if os.path.isdir(cible):
+        return sorted(glob.glob(os.path.join(cible, "*.txt")))
+    return sorted(glob.glob(cible))
 
 
-if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python main.py <fichier_fourmiliere.txt>")
-        sys.exit(1)
+def simuler_lot(fichiers, sortie, workers=None, moteur="objets", cache=False, estimer=False):
+    """
+    Simule chaque fichier dans un pool de processus et écrit un résumé par fichier
+    dans `sortie` (JSONL, ou CSV si l'extension est .csv), dans l'ordre de `fichiers`.
+    Avec estimer=True, seules les bornes de Fourmiliere.estimer sont calculées.
+    Retourne le nombre de fichiers en erreur.
+    """
+    erreurs = 0
+    with open(sortie, "w", newline="", encoding="utf-8") as out, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+        en_csv = sortie.endswith(".csv")
+        if en_csv:
+            champs = ["fichier", "etapes", "borne_inf", "borne_sup", "duree", "erreur"] if estimer \
+                else ["fichier", "etapes", "duree", "erreur", "logs"]
+            writer = csv.DictWriter(out, fieldnames=champs)
+            writer.writeheader()
+        # map rend les résultats dans l'ordre des fichiers, quel que soit le worker
+        if estimer:
+            resultats = pool.map(estimer_fichier, fichiers, repeat(cache), chunksize=16)
+        else:
+            resultats = pool.map(simuler_fichier, fichiers, repeat(moteur), repeat(cache))
+        for resultat in resultats:
+            if resultat["erreur"] is not None:
+                erreurs += 1
+            if en_csv:
+                if not estimer:
+                    resultat["logs"] = "\n".join(resultat["logs"] or [])
+                writer.writerow(resultat)
+            else:
+                out.write(json.dumps(resultat, ensure_ascii=False) + "\n")
+            etapes = resultat["etapes"]
+            if estimer and etapes is None and resultat["erreur"] is None:
+                etapes = f"{resultat['borne_inf']}..{resultat['borne_sup'] or '?'}"
+            print(f"{resultat['fichier']}: {etapes} étapes, {resultat['duree']}s"
+                  + (f" ({resultat['erreur']})" if resultat["erreur"] else ""))
+    return erreurs
 
-    path = sys.argv[1]
-    fourmiliere = charger_fichier(path)
 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulation d'une fourmilière.")
+    parser.add_argument("fichier", nargs="?", help="fichier de fourmilière (.txt)")
+    groupe = parser.add_mutually_exclusive_group()
+    groupe.add_argument("--compact", dest="moteur", action="store_const", const="compact",
+                        help="moteur à tableaux compacts (mêmes logs)")
+    groupe.add_argument("--flot", dest="moteur", action="store_const", const="flot",
+                        help="ordonnanceur optimal par flot")
+    groupe.add_argument("--numpy", dest="moteur", action="store_const", const="numpy",
+                        help="noyau d'étape vectorisé, NumPy requis (mêmes logs)")
+    parser.add_argument("--lot", metavar="DOSSIER_OU_GLOB",
+                        help="simule tous les fichiers d'un dossier ou d'un motif glob")
+    parser.add_argument("--sortie", default="resultats.jsonl",
+                        help="résumé du lot (.jsonl ou .csv, défaut : resultats.jsonl)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="nombre de processus pour le lot (défaut : nombre de coeurs)")
+    parser.add_argument("--cache", action="store_true",
+                        help="réutilise / écrit un cache binaire à côté de chaque fichier")
+    parser.add_argument("--estimer", action="store_true",
+                        help="encadre le nombre d'étapes sans simuler (bornes inférieure et supérieure)")
+    parser.add_argument("--profil", metavar="FICHIER.json",
+                        help="mesure les phases de chaque étape et les écrit en JSON")
+    parser.add_argument("--trace-chrome", metavar="FICHIER.json",
+                        help="mesure les phases et les écrit au format Chrome trace")
+    parser.add_argument("--points", metavar="DOSSIER",
+                        help="écrit des points de reprise dans DOSSIER pendant la simulation")
+    parser.add_argument("--periode", type=int, default=1000,
+                        help="étapes entre deux points de reprise (défaut : 1000)")
+    parser.add_argument("--reprendre", action="store_true",
+                        help="reprend au dernier point de reprise de --points")
+    parser.add_argument("--depuis", type=int, metavar="N",
+                        help="affiche les étapes à partir de N, en repartant du point de reprise qui précède")
+    parser.add_argument("--trace", metavar="FICHIER",
+                        help="écrit les mouvements dans une trace binaire (voir traces.py) ; "
+                             "prolongée avec --reprendre")
+    parser.set_defaults(moteur="objets")
+    args = parser.parse_args()
+    if (args.fichier is None) == (args.lot is None):
+        parser.error("indiquer soit un fichier, soit --lot")
+    if (args.reprendre or args.depuis) and not args.points:
+        parser.error("--reprendre et --depuis demandent --points")
+    if args.trace and args.lot is not None:
+        parser.error("--trace : un seul fichier")
+    if args.points and (args.lot is not None or args.moteur == "flot"):
+        parser.error("points de reprise : un seul fichier, moteurs objets / compact / numpy")
+
+    if args.lot is not None:
+        fichiers = lister_fichiers(args.lot)
+        if not fichiers:
+            parser.error(f"aucun fichier pour {args.lot}")
+        sys.exit(1 if simuler_lot(fichiers, args.sortie, args.workers, args.moteur, args.cache,
+                                  args.estimer) else 0)
+
+    path = args.fichier
+    moteur = args.moteur
+    fourmiliere = charger_fichier(path, args.cache)
+
+    if args.estimer:
+        borne_inf, borne_sup = fourmiliere.estimer()
+        print(f"=== Estimation pour {path} ===")
+        print(f"étapes : {borne_inf}" if borne_inf == borne_sup else f"étapes : entre {borne_inf} et {borne_sup}")
+        sys.exit(0)
 
     print(f"=== Simulation pour {path} ===")
-    logs = fourmiliere.simuler()
-    for l in logs:
-        print(l)
+    stats = Statistiques() if args.profil or args.trace_chrome else None
+    points = Points(args.points, args.periode) if args.points else None
+    reprise = None
+    if args.depuis:
+        reprise = points.dernier(fourmiliere, args.depuis - 1)
+    elif args.reprendre:
+        reprise = points.dernier(fourmiliere)
+    if reprise is not None:
+        print(f"reprise à la fin de l'étape {reprise.etape}", file=sys.stderr)
+    trace = EcritureTrace(args.trace, fourmiliere, ajout=reprise is not None) if args.trace else None
+    # affichage au fil de l'eau : chaque étape est imprimée dès qu'elle est calculée
+    try:
+        for etape in fourmiliere.iter_etapes(moteur, stats, reprise, points, trace):
+            if args.depuis and etape.numero < args.depuis:
+                continue
+            print(formater_etape(etape))
+    finally:
+        if trace is not None:
+            trace.fermer()
+    if args.profil:
+        stats.ecrire_json(args.profil)
+    if args.trace_chrome:
+        stats.ecrire_trace_chrome(args.trace_chrome)
 
     """
     print("\nSalles :")
@@ -0,0 +1,222 @@
+# moteur_compact.py
+from array import array
+from time import perf_counter
+import itertools
+
+from blocages import deadlock, preparer
+from enregistrement import Etape
+
+# capacité "infinie" (Sv, Sd) représentée par un entier jamais atteint
+INFINI = 2 ** 62
+
+
+class MoteurCompact:
+    """
+    Moteur de simulation à tableaux d'entiers pour les très grandes colonies.
+    Salles, fourmis et chemins sont internés en indices : position, id de chemin
+    et index dans le chemin de chaque fourmi tiennent dans des tableaux compacts,
+    l'occupation d'une salle est un simple compteur.
+    Produit exactement les mêmes logs que Fourmiliere.simuler, sans créer
+    d'objets Fourmi ni toucher aux files des salles.
+    """
+    def __init__(self, fourmiliere):
+        self.fourmiliere = fourmiliere
+        self.graphe = fourmiliere.graphe()
+
+        # salles internées comme dans l'adjacence compacte ; celles qui
+        # n'apparaissent que dans les tunnels ont une capacité nulle, comme dans simuler
+        self.noms = self.graphe.noms
+        self.indices = self.graphe.indices
+        self.capacites = array("q", [0]) * len(self.noms)
+        for nom, salle in fourmiliere.salles.items():
+            cap = INFINI if salle.capacite == float("inf") else salle.capacite
+            self.capacites[self.indices[nom]] = cap
+        self.sv = self.indices["Sv"]
+        self.sd = self.indices["Sd"]
+
+        # chemins internés : id -> tuple d'indices de salles
+        self.chemins = []
+        self._ids_chemins = {}
+        # table des prochains sauts par salle : [(salle suivante, id de chemin)]
+        self._sauts = {}
+
+        n = fourmiliere.nb_fourmis
+        self.position = array("i", [self.sv]) * n
+        self.chemin = array("i", [0]) * n
+        self.index = array("i", [0]) * n
+        self.occupation = array("q", [0]) * len(self.noms)
+        self.occupation[self.sv] = n
+
+    def interner_chemin(self, chemin):
+        """
+        Retourne l'id du chemin (suite d'indices de salles), en l'ajoutant si besoin.
+        """
+        cle = tuple(chemin)
+        id_ = self._ids_chemins.get(cle)
+        if id_ is None:
+            id_ = len(self.chemins)
+            self.chemins.append(cle)
+            self._ids_chemins[cle] = id_
+        return id_
+
+    def sauts(self, salle):
+        """
+        Fourmiliere.sauts, avec les chemins remplacés par leurs ids.
+        """
+        table = self._sauts.get(salle)
+        if table is None:
+            table = [
+                (voisin, self.interner_chemin(chemin))
+                for voisin, chemin in self.fourmiliere.sauts(salle)
+            ]
+            self._sauts[salle] = table
+        return table
+
+    def restaurer(self, reprise):
+        """
+        Remplace l'état des fourmis par celui d'un reprise.PointDeReprise ; les
+        chemins sont internés dans l'ordre du point, leurs ids restent donc valables.
+        """
+        reprise.verifier(self.fourmiliere)
+        for p in reprise.chemins:
+            self.interner_chemin(p)
+        self.position = array("i", reprise.position)
+        self.chemin = array("i", reprise.chemin)
+        self.index = array("i", reprise.index)
+        self.occupation = reprise.occupation(len(self.noms))
+
+    def point_de_reprise(self, etape):
+        """
+        État courant des fourmis (celui de la fin de l'étape `etape`), en reprise.PointDeReprise.
+        """
+        from reprise import PointDeReprise, empreinte
+        return PointDeReprise(etape, empreinte(self.fourmiliere), array("i", self.position),
+                              array("i", self.chemin), array("i", self.index), list(self.chemins))
+
+    def iter_etapes(self, stats=None, reprise=None):
+        """
+        Même stratégie que Fourmiliere.iter_etapes, sur les tableaux compacts.
+        Produit un enregistrement.Etape à chaque étape, dont les colonnes sont
+        remplies directement depuis les tableaux (aucun nom de salle manipulé).
+        stats : instrumentation.Statistiques optionnel (le tri par paquets fait
+        partie de la phase "candidats").
+        reprise : reprise.PointDeReprise optionnel, la simulation repart de son état.
+        """
+        # salles sans issue vers Sd (voir blocages.py), traitées comme pleines
+        distances, salles_impasses = preparer(self.fourmiliere)
+
+        if reprise is not None:
+            self.restaurer(reprise)
+        else:
+            # seuls les nb_fourmis premiers chemins servent au tourniquet
+            premiers = itertools.islice(self.graphe.plus_courts_chemins(self.sv, self.sd),
+                                       max(self.fourmiliere.nb_fourmis, 1))
+            tous_chemins = [self.interner_chemin(p) for p in premiers]
+            if not tous_chemins:
+                raise RuntimeError("Aucun chemin Sv -> Sd trouvé!")
+            cycle_chemins = itertools.cycle(tous_chemins)
+            for i in range(len(self.chemin)):
+                self.chemin[i] = next(cycle_chemins)
+
+        position, chemin, index = self.position, self.chemin, self.index
+        chemins, capacites, occupation, noms = self.chemins, self.capacites, self.occupation, self.noms
+        sd = self.sd
+        # les fourmis restantes sont triées par distance à Sd via des paquets
+        nb_paquets = max(distances.values()) + 1
+
+        # indices des fourmis encore en route, par id croissant
+        actives = array("i", (f for f, salle in enumerate(position) if salle != sd))
+
+        etape = 1 if reprise is None else reprise.etape + 1
+        while actives:
+            if stats is not None:
+                t_candidats = perf_counter()
+                duree_reroutage = 0.0
+            reroutages = reroutages_reussis = 0
+            available = [c - o for c, o in zip(capacites, occupation)]
+            for salle in salles_impasses:
+                available[salle] = 0
+
+            # candidats groupés par distance restante, par id croissant dans chaque paquet
+            paquets = [[] for _ in range(nb_paquets)]
+            for f in actives:
+                salle = position[f]
+                p = chemins[chemin[f]]
+                if index[f] + 1 >= len(p):
+                    sauts = self.sauts(salle)
+                    if not sauts:
+                        continue
+                    chemin[f] = sauts[0][1]
+                    index[f] = 0
+                    p = chemins[chemin[f]]
+                paquets[len(p) - 1 - index[f]].append(f)
+
+            if stats is not None:
+                t_planification = perf_counter()
+            nb_candidats = 0
+            # colonnes de l'enregistrement : ids (à partir de 1), départs, arrivées
+            ids, departs, arrivees = array("i"), array("i"), array("i")
+            for paquet in paquets:
+                nb_candidats += len(paquet)
+                for f in paquet:
+                    depart = position[f]
+                    prochaine = chemins[chemin[f]][index[f] + 1]
+                    if available[prochaine] > 0:
+                        ids.append(f + 1)
+                        departs.append(depart)
+                        arrivees.append(prochaine)
+                        available[depart] += 1
+                        available[prochaine] -= 1
+                        continue
+                    reroutages += 1
+                    if stats is not None:
+                        t_reroutage = perf_counter()
+                    for alt_next, id_chemin in self.sauts(depart):
+                        if available[alt_next] > 0:
+                            reroutages_reussis += 1
+                            chemin[f] = id_chemin
+                            index[f] = 0
+                            ids.append(f + 1)
+                            departs.append(depart)
+                            arrivees.append(alt_next)
+                            available[depart] += 1
+                            available[alt_next] -= 1
+                            break
+                    if stats is not None:
+                        duree_reroutage += perf_counter() - t_reroutage
+
+            if not ids:
+                raise deadlock()
+
+            if stats is not None:
+                t_application = perf_counter()
+            nb_arrivees = 0
+            for fid, depart, arrivee in zip(ids, departs, arrivees):
+                if arrivee == sd:
+                    nb_arrivees += 1
+                occupation[depart] -= 1
+                occupation[arrivee] += 1
+                position[fid - 1] = arrivee
+                # arrivee est toujours le saut suivant du chemin (suivi ou adopté)
+                index[fid - 1] += 1
+            if nb_arrivees:
+                actives = array("i", (f for f in actives if position[f] != sd))
+
+            if stats is not None:
+                fin = perf_counter()
+                stats.enregistrer_etape(
+                    etape,
+                    [("candidats", t_candidats, t_planification),
+                     ("planification", t_planification, t_application),
+                     ("reroutage", t_planification, t_planification + duree_reroutage),
+                     ("application", t_application, fin)],
+                    reroutages, reroutages_reussis,
+                    bloquees=nb_candidats - len(ids),
+                    occupation={
+                        noms[i]: o for i, o in enumerate(occupation)
+                        if o and capacites[i] != INFINI
+                    } if stats.occupation else None,
+                )
+
+            yield Etape(etape, noms, ids, departs, arrivees)
+            etape += 1
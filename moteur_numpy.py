@@ -0,0 +1,308 @@
+# moteur_numpy.py
+"""
+Noyau d'étape vectorisé (NumPy) pour les colonies de plus de 10^5 fourmis.
+NumPy est une dépendance optionnelle : ce module n'est importé que pour
+moteur="numpy".
+"""
+from array import array
+from time import perf_counter
+import itertools
+
+import numpy as np
+
+from blocages import deadlock, preparer
+from enregistrement import Etape
+from moteur_compact import INFINI, MoteurCompact
+
+
+def _colonne(valeurs):
+    """
+    Tableau NumPy -> array("i") (colonne d'un enregistrement Etape).
+    """
+    colonne = array("i")
+    colonne.frombytes(np.ascontiguousarray(valeurs, dtype=np.intc).tobytes())
+    return colonne
+
+
+def _rangs(groupes):
+    """
+    Rang de chaque élément parmi ceux du même groupe, dans l'ordre du tableau.
+    """
+    ordre = np.argsort(groupes, kind="stable")
+    tries = groupes[ordre]
+    debuts = np.flatnonzero(np.concatenate(([True], tries[1:] != tries[:-1])))
+    tailles = np.diff(np.concatenate((debuts, [len(tries)])))
+    rangs = np.empty(len(groupes), dtype=np.int64)
+    rangs[ordre] = np.arange(len(groupes)) - np.repeat(debuts, tailles)
+    return rangs
+
+
+class MoteurNumpy(MoteurCompact):
+    """
+    Même stratégie et mêmes étapes que MoteurCompact, avec une étape calculée
+    par tableaux NumPy au lieu d'une boucle par fourmi.
+
+    Une fourmi ne se déplace que vers une salle plus proche de Sd d'un tunnel :
+    en traitant les fourmis par distance restante croissante (l'ordre de priorité
+    des autres moteurs), les fourmis d'une même distance ne visent que des salles
+    dont les départs de l'étape sont déjà connus. Chaque distance est donc traitée
+    d'un bloc, où la fourmi d'id i prend la première salle de sa liste (salle
+    prévue, puis sauts de re-routage) qui a encore une place après le passage des
+    fourmis d'id plus petit.
+
+    Cette règle séquentielle est résolue par tableaux : on note t[s] l'id de la
+    fourmi qui prend la dernière place de la salle s (l'infini si elle n'est pas
+    remplie). Chaque fourmi choisit sa première salle s telle que t[s] >= i, puis
+    t est recalculé à partir des choix (rang des fourmis par salle choisie), et
+    ainsi de suite jusqu'à ce que les choix ne changent plus. Le choix de la
+    fourmi i ne dépend que de ceux des fourmis précédentes, donc le point fixe
+    est unique et c'est le résultat séquentiel ; chaque tour rend justes au moins
+    les choix jusqu'à la première fourmi fausse, et en pratique quelques tours
+    suffisent (autant que de re-routages en cascade).
+    """
+    def __init__(self, fourmiliere):
+        super().__init__(fourmiliere)
+        nb_salles = len(self.noms)
+        # tables de re-routage par salle, remplies au premier besoin :
+        # nb_sauts[s] (-1 = pas encore calculée), salles / chemins des sauts possibles
+        self._nb_sauts = np.full(nb_salles, -1, dtype=np.int64)
+        self._sauts_salles = np.full((nb_salles, 1), -1, dtype=np.int64)
+        self._sauts_chemins = np.zeros((nb_salles, 1), dtype=np.int64)
+        # chemins internés mis à plat : salle k du chemin c = plats[debuts[c] + k]
+        self._plats = None
+        self._debuts = None
+        self._nb_plats = 0
+
+    def _chemins_a_plat(self):
+        """
+        Met à jour la forme à plat des chemins si de nouveaux ont été internés.
+        """
+        if self._nb_plats != len(self.chemins):
+            longueurs = np.fromiter((len(c) for c in self.chemins), dtype=np.int64, count=len(self.chemins))
+            self._debuts = np.concatenate(([0], np.cumsum(longueurs)[:-1]))
+            self._plats = np.fromiter(itertools.chain.from_iterable(self.chemins), dtype=np.int64,
+                                      count=int(longueurs.sum()))
+            self._nb_plats = len(self.chemins)
+        return self._plats, self._debuts
+
+    def _preparer_sauts(self, salles):
+        """
+        Calcule les tables de re-routage des salles qui n'en ont pas encore
+        (au premier refus dans la salle, comme MoteurCompact).
+        """
+        salles = np.unique(salles)
+        for s in salles[self._nb_sauts[salles] < 0].tolist():
+            table = self.sauts(s)
+            if len(table) > self._sauts_salles.shape[1]:
+                plus = len(table) - self._sauts_salles.shape[1]
+                self._sauts_salles = np.pad(self._sauts_salles, ((0, 0), (0, plus)), constant_values=-1)
+                self._sauts_chemins = np.pad(self._sauts_chemins, ((0, 0), (0, plus)))
+            for k, (voisin, id_chemin) in enumerate(table):
+                self._sauts_salles[s, k] = voisin
+                self._sauts_chemins[s, k] = id_chemin
+            self._nb_sauts[s] = len(table)
+
+    def _arcs(self, distance):
+        """
+        Arcs (u, v) du graphe des plus courts chemins vers Sd (v voisin de u, un
+        cran plus près de Sd : les sauts possibles de u), rangés par distance de u.
+        Retourne (sources, cibles, bornes) : les arcs partant des salles à distance d
+        sont aux positions bornes[d]:bornes[d + 1].
+        """
+        _, debuts, voisins = self.graphe.adjacence()
+        debuts = np.asarray(debuts, dtype=np.int64)
+        cibles = np.asarray(voisins, dtype=np.int64)
+        sources = np.repeat(np.arange(len(debuts) - 1), np.diff(debuts))
+        garder = (distance[sources] != INFINI) & (distance[cibles] == distance[sources] - 1)
+        sources, cibles = sources[garder], cibles[garder]
+        ordre = np.argsort(distance[sources], kind="stable")
+        sources, cibles = sources[ordre], cibles[ordre]
+        longueur = int(distance[distance != INFINI].max())
+        bornes = np.searchsorted(distance[sources], np.arange(longueur + 2))
+        return sources, cibles, bornes
+
+    def _traiter_distance(self, ids, departs, cibles, available, places, remplissage, mouvements,
+                          nouveaux_chemins):
+        """
+        Accorde les déplacements des fourmis d'une même distance restante (ids
+        croissants), sans modifier `available` (places au début de la distance).
+        `places[u]` : places libres de l'ensemble des sauts de la salle u.
+        `remplissage` : tableau de travail t (INFINI partout, remis dans cet état).
+        Ajoute à `mouvements` le bloc (ids, départs, arrivées) par id croissant, et
+        à `nouveaux_chemins` le bloc (ids, chemins) des fourmis re-routées.
+        Retourne (tentatives de re-routage, re-routages réussis).
+        """
+        # une fourmi refusée essaie tous les sauts de sa salle (la salle prévue en
+        # fait partie) : tant qu'un saut de la salle u a une place, chaque fourmi
+        # partant de u se déplace. Au-delà des places[u] premières, toutes sont
+        # refusées sans re-routage possible : elles sont écartées d'emblée, ce qui
+        # évite de traiter les files d'attente.
+        gardees = _rangs(departs) < places[departs]
+        refus = len(ids) - int(np.count_nonzero(gardees))
+        if refus:
+            ids, departs, cibles = ids[gardees], departs[gardees], cibles[gardees]
+        if not len(ids):
+            return refus, 0
+
+        def ouverte(salles, fourmis):
+            # la salle a encore une place quand la fourmi passe
+            return (available[salles] > 0) & (remplissage[salles] >= fourmis)
+
+        choix = None
+        remplies = np.zeros(0, dtype=np.int64)
+        while True:
+            nouveaux = cibles.copy()
+            ids_chemins = None
+            refusees = np.flatnonzero(~ouverte(cibles, ids))
+            if len(refusees):
+                dep = departs[refusees]
+                self._preparer_sauts(dep)
+                salles = self._sauts_salles[dep]
+                libres = (salles >= 0) & ouverte(np.maximum(salles, 0), ids[refusees][:, None])
+                k = libres.argmax(axis=1)
+                trouve = libres.any(axis=1)
+                nouveaux[refusees] = np.where(trouve, salles[np.arange(len(refusees)), k], -1)
+                ids_chemins = (refusees[trouve], self._sauts_chemins[dep[trouve], k[trouve]])
+            if choix is not None and np.array_equal(nouveaux, choix):
+                break
+            choix = nouveaux
+
+            # t[s] : id de la fourmi qui prend la dernière place de s avec ces choix
+            bouge = choix >= 0
+            salles, fourmis = choix[bouge], ids[bouge]
+            derniere = _rangs(salles) == available[salles] - 1
+            remplissage[remplies] = INFINI
+            remplies = salles[derniere]
+            remplissage[remplies] = fourmis[derniere]
+        remplissage[remplies] = INFINI
+
+        bouge = choix >= 0
+        mouvements.append((ids[bouge], departs[bouge], choix[bouge]))
+        reussis = 0
+        if ids_chemins is not None:
+            rerouteees, chemins = ids_chemins
+            reussis = len(rerouteees)
+            nouveaux_chemins.append((ids[rerouteees], chemins))
+        return refus + len(refusees), reussis
+
+    def point_de_reprise(self, etape):
+        """
+        Voir MoteurCompact.point_de_reprise (l'état est ici en tableaux NumPy).
+        """
+        from reprise import PointDeReprise, empreinte
+        return PointDeReprise(etape, empreinte(self.fourmiliere), _colonne(self.position),
+                              _colonne(self.chemin), _colonne(self.index), list(self.chemins))
+
+    def iter_etapes(self, stats=None, reprise=None):
+        """
+        Même interface que MoteurCompact.iter_etapes (mêmes étapes, dans le même ordre).
+        """
+        # salles sans issue vers Sd (voir blocages.py), traitées comme pleines
+        distances, salles_impasses = preparer(self.fourmiliere)
+        salles_impasses = np.array(salles_impasses, dtype=np.int64)
+        n = self.fourmiliere.nb_fourmis
+        nb_salles = len(self.noms)
+        if reprise is not None:
+            self.restaurer(reprise)
+            chemin = np.array(self.chemin, dtype=np.int64)
+            index = np.array(self.index, dtype=np.int64)
+            position = np.array(self.position, dtype=np.int64)
+        else:
+            # seuls les nb_fourmis premiers chemins servent au tourniquet
+            premiers = itertools.islice(self.graphe.plus_courts_chemins(self.sv, self.sd),
+                                       max(self.fourmiliere.nb_fourmis, 1))
+            tous_chemins = [self.interner_chemin(p) for p in premiers]
+            if not tous_chemins:
+                raise RuntimeError("Aucun chemin Sv -> Sd trouvé!")
+            # répartition en tourniquet sur les plus courts chemins
+            chemin = np.resize(np.array(tous_chemins, dtype=np.int64), n)
+            index = np.zeros(n, dtype=np.int64)
+            position = np.full(n, self.sv, dtype=np.int64)
+        # l'état vit dans les tableaux NumPy (lus par point_de_reprise)
+        self.position, self.chemin, self.index = position, chemin, index
+        capacites = np.array(self.capacites, dtype=np.int64)
+        occupation = np.array(self.occupation, dtype=np.int64)
+        distance = np.full(nb_salles, INFINI, dtype=np.int64)
+        for nom, d in distances.items():
+            distance[self.indices[nom]] = d
+        arcs_sources, arcs_cibles, arcs_bornes = self._arcs(distance)
+        remplissage = np.full(nb_salles, INFINI, dtype=np.int64)
+        noms, sd = self.noms, self.sd
+
+        actives = np.flatnonzero(position != sd)
+        etape = 1 if reprise is None else reprise.etape + 1
+        while len(actives):
+            if stats is not None:
+                t_candidats = perf_counter()
+            plats, debuts = self._chemins_a_plat()
+            available = capacites - occupation
+            available[salles_impasses] = 0
+
+            # candidats par distance restante croissante, ids croissants à distance égale
+            departs = position[actives]
+            restantes = distance[departs]
+            ordre = np.argsort(restantes, kind="stable")
+            candidats = actives[ordre]
+            departs = departs[ordre]
+            restantes = restantes[ordre]
+            cibles = plats[debuts[chemin[candidats]] + index[candidats] + 1]
+            bornes = np.concatenate(([0], np.flatnonzero(np.diff(restantes)) + 1, [len(candidats)]))
+
+            if stats is not None:
+                t_planification = perf_counter()
+            mouvements = []
+            nouveaux_chemins = []
+            reroutages = reroutages_reussis = 0
+            for a, b in zip(bornes[:-1].tolist(), bornes[1:].tolist()):
+                d = int(restantes[a])
+                debut = len(mouvements)
+                # places libres des sauts de chaque salle de départ à cette distance
+                sources = arcs_sources[arcs_bornes[d]:arcs_bornes[d + 1]]
+                vers = arcs_cibles[arcs_bornes[d]:arcs_bornes[d + 1]]
+                places = np.bincount(sources, weights=np.minimum(available[vers], n), minlength=nb_salles)
+                essais, reussis = self._traiter_distance(
+                    candidats[a:b], departs[a:b], cibles[a:b], available, places, remplissage,
+                    mouvements, nouveaux_chemins)
+                reroutages += essais
+                reroutages_reussis += reussis
+                for _, deps, arrs in mouvements[debut:]:
+                    np.subtract.at(available, arrs, 1)
+                    # les places libérées au départ ne servent qu'aux distances suivantes
+                    np.add.at(available, deps, 1)
+
+            ids = np.concatenate([m[0] for m in mouvements]) if mouvements else np.zeros(0, dtype=np.int64)
+            if not len(ids):
+                raise deadlock()
+
+            if stats is not None:
+                t_application = perf_counter()
+            deps = np.concatenate([m[1] for m in mouvements])
+            arrs = np.concatenate([m[2] for m in mouvements])
+            np.subtract.at(occupation, deps, 1)
+            np.add.at(occupation, arrs, 1)
+            position[ids] = arrs
+            index[ids] += 1
+            for rerouteees, chemins in nouveaux_chemins:
+                # l'arrivée est le premier saut du chemin adopté
+                chemin[rerouteees] = chemins
+                index[rerouteees] = 1
+            if (arrs == sd).any():
+                actives = actives[position[actives] != sd]
+
+            if stats is not None:
+                fin = perf_counter()
+                stats.enregistrer_etape(
+                    etape,
+                    [("candidats", t_candidats, t_planification),
+                     ("planification", t_planification, t_application),
+                     ("application", t_application, fin)],
+                    reroutages, reroutages_reussis,
+                    bloquees=len(candidats) - len(ids),
+                    occupation={
+                        noms[i]: int(occupation[i]) for i in np.flatnonzero(occupation).tolist()
+                        if capacites[i] != INFINI
+                    } if stats.occupation else None,
+                )
+
+            yield Etape(etape, noms, _colonne(ids + 1), _colonne(deps), _colonne(arrs))
+            etape += 1
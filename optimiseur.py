@@ -0,0 +1,222 @@
+# optimiseur.py
+"""
+Recherche des modifications d'une fourmilière qui minimisent le nombre d'étapes
+de simuler, pour un budget donné : unités de capacité supplémentaires et/ou
+nouveaux tunnels.
+
+    python optimiseur.py four/fourmiliere_cinq.txt --capacite 4 --tunnels 1
+
+Recherche en faisceau : à chaque tour, chaque configuration retenue est étendue
+d'une modification (+1 de capacité sur une salle, ou un tunnel). Une borne
+inférieure bon marché (plus courts chemins + goulot du graphe des plus courts
+chemins, voir borne_inferieure) écarte les candidats qui ne peuvent pas battre
+la meilleure configuration connue ; les survivants sont simulés en parallèle.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import sys
+
+from fourmi import Fourmiliere
+from ordonnanceur_flot import INFINI, borne_etapes, coupe_minimale
+from parseur import lire_fichier
+
+# graphe de la fourmilière d'origine, chargé une fois par processus
+_graphe = None
+
+
+def borne_inferieure(fourmiliere, capacite_restante=0):
+    """
+    Minorant de Fourmiliere.estimer, pour toute configuration obtenue en ajoutant
+    au plus `capacite_restante` unités de capacité (la coupe augmente d'autant
+    au plus). INFINI si Sd est inaccessible ou la coupe nulle.
+    """
+    longueur, coupe, _ = coupe_minimale(fourmiliere)
+    return borne_etapes(longueur, fourmiliere.nb_fourmis, coupe + capacite_restante)
+
+
+def appliquer(fourmiliere, modifications):
+    """
+    Applique une configuration : (("capacite", salle, ajout), ...) et (("tunnel", s1, s2), ...).
+    """
+    for nature, a, b in modifications:
+        if nature == "capacite":
+            fourmiliere.changer_capacite(a, fourmiliere.salles[a].capacite + b)
+        else:
+            fourmiliere.ajouter_tunnel(a, b)
+    return fourmiliere
+
+
+def _initialiser(path):
+    global _graphe
+    _graphe = lire_fichier(path)
+
+
+def _charger(modifications):
+    return appliquer(Fourmiliere.depuis_graphe(_graphe.copie()), modifications)
+
+
+def evaluer(tache):
+    """
+    Évalue une configuration dans un worker : borne inférieure, puis simulation
+    seulement si la borne laisse espérer mieux que `seuil` étapes.
+    Retourne (modifications, borne, étapes) ; étapes vaut None si la configuration
+    a été écartée par la borne, INFINI si la simulation échoue (blocage).
+    """
+    modifications, capacite_restante, seuil, moteur = tache
+    fourmiliere = _charger(modifications)
+    borne = borne_inferieure(fourmiliere, capacite_restante)
+    if borne >= seuil:
+        return modifications, borne, None
+    try:
+        etapes = sum(1 for _ in fourmiliere.iter_etapes(moteur))
+    except RuntimeError:
+        etapes = INFINI
+    return modifications, borne, etapes
+
+
+def candidats_tunnels(fourmiliere, max_candidats):
+    """
+    Tunnels qui créent un chemin Sv -> Sd au plus aussi court que les plus courts
+    actuels : les autres ne sont empruntés par aucune fourmi. Le tunnel direct
+    Sv - Sd est exclu. Les plus courts chemins créés d'abord, `max_candidats` au plus.
+    """
+    graphe = fourmiliere.graphe()
+    noms = graphe.noms
+    sv, sd = graphe.indices["Sv"], graphe.indices["Sd"]
+    depuis_sv = graphe.distances(sv)
+    vers_sd = graphe.distances(sd)
+    longueur = depuis_sv.get(sd, INFINI)
+    capacites = graphe.capacites
+    # les salles de capacité nulle (ou seulement citées dans un tunnel) ne servent à rien
+    salles = [i for i in range(graphe.nb_salles) if capacites[i] != 0]
+    candidats = []
+    for u in salles:
+        du = depuis_sv.get(u)
+        if du is None or du + 1 >= longueur:
+            continue
+        voisins = set(graphe.voisins(u))
+        for v in salles:
+            dv = vers_sd.get(v)
+            if dv is None or v == u or v in voisins or (u, v) == (sv, sd):
+                continue
+            nouvelle = du + 1 + dv
+            if nouvelle <= longueur:
+                # extrémités dans l'ordre des noms : (u, v) et (v, u) sont le même tunnel
+                candidats.append((nouvelle,) + tuple(sorted((noms[u], noms[v]))))
+    candidats.sort()
+    uniques = []
+    vus = set()
+    for _, u, v in candidats:
+        if (u, v) not in vus:
+            vus.add((u, v))
+            uniques.append((u, v))
+    return uniques[:max_candidats]
+
+
+def cle(modifications):
+    """
+    Forme canonique d'une configuration (l'ordre des modifications n'importe pas).
+    """
+    return tuple(sorted(modifications))
+
+
+def optimiser(path, capacite=0, tunnels=0, moteur="compact", workers=None, largeur=4,
+              max_candidats=200):
+    """
+    Cherche la configuration (au plus `capacite` unités ajoutées et `tunnels`
+    nouveaux tunnels) qui minimise le nombre d'étapes.
+    Retourne (étapes d'origine, meilleures étapes, meilleures modifications).
+    """
+    _initialiser(path)
+    origine = _charger(())
+    try:
+        etapes_origine = sum(1 for _ in origine.iter_etapes(moteur))
+    except RuntimeError:
+        etapes_origine = INFINI
+    meilleur = (etapes_origine, ())
+    faisceau = [()]
+    vus = {()}
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_initialiser, initargs=(path,)) as pool:
+        for tour in range(capacite + tunnels):
+            taches = []
+            for config in faisceau:
+                fourmiliere = _charger(config)
+                capacite_utilisee = sum(b for nature, _, b in config if nature == "capacite")
+                tunnels_utilises = sum(1 for nature, _, _ in config if nature == "tunnel")
+                enfants = []
+                if capacite_utilisee < capacite:
+                    graphe = fourmiliere.graphe()
+                    depuis_sv = graphe.distances(graphe.indices["Sv"])
+                    vers_sd = graphe.distances(graphe.indices["Sd"])
+                    longueur = depuis_sv.get(graphe.indices["Sd"])
+                    # seules les salles des plus courts chemins voient passer des fourmis
+                    enfants += [
+                        config + (("capacite", nom, 1),)
+                        for nom in fourmiliere.salles if nom not in ("Sv", "Sd")
+                        and longueur is not None
+                        and depuis_sv.get(graphe.indices[nom], INFINI) + vers_sd.get(graphe.indices[nom], INFINI) == longueur
+                    ]
+                if tunnels_utilises < tunnels:
+                    enfants += [
+                        config + (("tunnel", u, v),)
+                        for u, v in candidats_tunnels(fourmiliere, max_candidats)
+                    ]
+                for enfant in enfants:
+                    k = cle(enfant)
+                    if k in vus:
+                        continue
+                    vus.add(k)
+                    # les tunnels restants peuvent tout changer : pas de borne de complétion
+                    restante = capacite - capacite_utilisee - (enfant[-1][0] == "capacite")
+                    seuil = meilleur[0] if tunnels_utilises + (enfant[-1][0] == "tunnel") == tunnels else INFINI
+                    taches.append((k, restante, seuil, moteur))
+            if not taches:
+                break
+
+            resultats = []
+            ecartees = 0
+            for modifications, borne, etapes in pool.map(evaluer, taches, chunksize=8):
+                if etapes is None:
+                    ecartees += 1
+                    continue
+                resultats.append((etapes, borne, modifications))
+                if etapes < meilleur[0]:
+                    meilleur = (etapes, modifications)
+            print(f"tour {tour + 1} : {len(taches)} candidats, {ecartees} écartés par la borne, "
+                  f"meilleur {meilleur[0]} étapes", file=sys.stderr)
+            resultats.sort()
+            faisceau = [modifications for _, _, modifications in resultats[:largeur]]
+            if not faisceau:
+                break
+
+    return etapes_origine, meilleur[0], meilleur[1]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cherche les modifications qui minimisent le nombre d'étapes.")
+    parser.add_argument("fichier", help="fichier de fourmilière (.txt)")
+    parser.add_argument("--capacite", type=int, default=0, help="unités de capacité à ajouter au total")
+    parser.add_argument("--tunnels", type=int, default=0, help="nombre de tunnels à ajouter")
+    parser.add_argument("--moteur", choices=("objets", "compact"), default="compact")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="nombre de processus (défaut : nombre de coeurs)")
+    parser.add_argument("--largeur", type=int, default=4, help="configurations gardées à chaque tour")
+    parser.add_argument("--max-candidats", type=int, default=200,
+                        help="tunnels candidats examinés par configuration")
+    args = parser.parse_args()
+    if args.capacite < 0 or args.tunnels < 0 or not (args.capacite or args.tunnels):
+        parser.error("indiquer un budget --capacite et/ou --tunnels positif")
+
+    avant, apres, modifications = optimiser(args.fichier, args.capacite, args.tunnels, args.moteur,
+                                            args.workers, args.largeur, args.max_candidats)
+    print(f"=== Optimisation pour {args.fichier} ===")
+    print(f"étapes : {avant} -> {apres}")
+    ajouts = {}
+    for nature, a, b in modifications:
+        if nature == "capacite":
+            ajouts[a] = ajouts.get(a, 0) + b
+        else:
+            print(f"  tunnel : {a} - {b}")
+    for salle, ajout in ajouts.items():
+        print(f"  +{ajout} capacité : {salle}")
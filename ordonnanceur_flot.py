@@ -0,0 +1,361 @@
+# ordonnanceur_flot.py
+from array import array
+from collections import deque
+from time import perf_counter
+import heapq
+
+from enregistrement import Etape
+# même "infini" que le moteur compact : capacité des tunnels et de Sv / Sd
+from moteur_compact import INFINI
+
+
+class ReseauFlot:
+    """
+    Réseau résiduel (listes d'arcs) pour un flot de coût minimum calculé par
+    plus courts chemins successifs. L'arc i a pour arc inverse i ^ 1.
+    """
+    def __init__(self, nb_noeuds):
+        self.adj = [[] for _ in range(nb_noeuds)]
+        self.dest = []
+        self.cap = []
+        self.cout = []
+        self.cap_initiale = []
+
+    def ajouter_arc(self, u, v, cap, cout):
+        """
+        Ajoute l'arc u -> v (et son arc inverse de capacité nulle).
+        """
+        for a, b, c, k in ((u, v, cap, cout), (v, u, 0, -cout)):
+            self.adj[a].append(len(self.dest))
+            self.dest.append(b)
+            self.cap.append(c)
+            self.cout.append(k)
+            self.cap_initiale.append(c)
+
+    def plus_court_chemin(self, source, puits, potentiel):
+        """
+        Dijkstra sur les coûts réduits par `potentiel` (mis à jour sur place).
+        Retourne la liste des arcs du chemin source -> puits, ou None s'il n'y en a plus.
+        """
+        dist = {source: 0}
+        arc_pred = {}
+        tas = [(0, source)]
+        fini = set()
+        while tas:
+            d, u = heapq.heappop(tas)
+            if u in fini:
+                continue
+            fini.add(u)
+            for a in self.adj[u]:
+                if self.cap[a] <= 0:
+                    continue
+                v = self.dest[a]
+                nd = d + self.cout[a] + potentiel[u] - potentiel[v]
+                if nd < dist.get(v, INFINI):
+                    dist[v] = nd
+                    arc_pred[v] = a
+                    heapq.heappush(tas, (nd, v))
+        if puits not in dist:
+            return None
+        # les noeuds non atteints le restent : leur potentiel peut être conservé
+        for v, d in dist.items():
+            potentiel[v] += d
+
+        arcs = []
+        v = puits
+        while v != source:
+            a = arc_pred[v]
+            arcs.append(a)
+            v = self.dest[a ^ 1]
+        arcs.reverse()
+        return arcs
+
+    def augmenter(self, arcs, quantite):
+        """
+        Pousse `quantite` unités de flot le long des arcs.
+        """
+        for a in arcs:
+            self.cap[a] -= quantite
+            self.cap[a ^ 1] += quantite
+
+    def flot_maximal(self, source, puits):
+        """
+        Flot maximal source -> puits (Dinic : niveaux par parcours en largeur, puis
+        flots bloquants par parcours en profondeur itératif). Les coûts sont ignorés.
+        Retourne INFINI si un chemin n'est fait que d'arcs de capacité INFINI.
+        """
+        total = 0
+        while True:
+            niveaux = {source: 0}
+            file = deque([source])
+            while file:
+                u = file.popleft()
+                for a in self.adj[u]:
+                    v = self.dest[a]
+                    if self.cap[a] > 0 and v not in niveaux:
+                        niveaux[v] = niveaux[u] + 1
+                        file.append(v)
+            if puits not in niveaux:
+                return total
+
+            prochain = dict.fromkeys(niveaux, 0)  # premier arc encore utilisable
+            while True:
+                arcs = []
+                u = source
+                while u != puits:
+                    adj = self.adj[u]
+                    i = prochain[u]
+                    while i < len(adj) and not (
+                            self.cap[adj[i]] > 0 and niveaux.get(self.dest[adj[i]]) == niveaux[u] + 1):
+                        i += 1
+                    prochain[u] = i
+                    if i < len(adj):
+                        arcs.append(adj[i])
+                        u = self.dest[adj[i]]
+                        continue
+                    # impasse : u ne sert plus dans cette phase
+                    niveaux[u] = -2
+                    if not arcs:
+                        break
+                    u = self.dest[arcs.pop() ^ 1]
+                    prochain[u] += 1
+                if u != puits:
+                    break
+                quantite = min(self.cap[a] for a in arcs)
+                self.augmenter(arcs, quantite)
+                total += quantite
+                if total >= INFINI:
+                    return INFINI
+
+    def flot(self, a):
+        """
+        Flot porté par l'arc direct a.
+        """
+        return self.cap_initiale[a] - self.cap[a]
+
+
+def coupe_minimale(fourmiliere):
+    """
+    Goulot des plus courts chemins Sv -> Sd, les seuls que suivent les moteurs
+    "objets" et "compact" : capacité de la plus petite coupe de salles du graphe
+    des plus courts chemins, calculée comme flot maximal sur le réseau à salles
+    dédoublées restreint à ce graphe.
+    Retourne (longueur des plus courts chemins en tunnels, capacité de la coupe,
+    plus petite capacité d'une salle de ces chemins hors Sv / Sd), les capacités
+    valant INFINI pour un tunnel direct Sv - Sd ; (None, 0, 0) si Sd est inaccessible.
+    """
+    graphe = fourmiliere.graphe()
+    sv, sd = graphe.indices["Sv"], graphe.indices["Sd"]
+    depuis_sv = graphe.distances(sv)
+    vers_sd = graphe.distances(sd)
+    longueur = depuis_sv.get(sd)
+    if longueur is None:
+        return None, 0, 0
+
+    # salles situées sur au moins un plus court chemin
+    utiles = [i for i, d in depuis_sv.items() if d + vers_sd.get(i, INFINI) == longueur]
+    reseau = ReseauFlot(2 * graphe.nb_salles)
+    _, debuts, voisins = graphe.adjacence()
+    capacite_min = INFINI
+    for u in utiles:
+        cap = graphe.capacites[u]
+        cap = INFINI if cap == graphe.INFINIE else cap
+        if u != sv and u != sd:
+            capacite_min = min(capacite_min, cap)
+        reseau.ajouter_arc(2 * u, 2 * u + 1, cap, 0)
+        du = depuis_sv[u]
+        for k in range(debuts[u], debuts[u + 1]):
+            v = voisins[k]
+            if depuis_sv.get(v) == du + 1 and vers_sd.get(v) == longueur - du - 1:
+                reseau.ajouter_arc(2 * u + 1, 2 * v, INFINI, 0)
+    return longueur, reseau.flot_maximal(2 * sv + 1, 2 * sd), capacite_min
+
+
+def borne_etapes(longueur, nb_fourmis, capacite):
+    """
+    D + ceil(n / capacite) - 1 : étapes pour faire passer n fourmis par des
+    chemins de longueur D si au plus `capacite` fourmis passent le goulot par
+    étape. INFINI si Sd est inaccessible (longueur None) ou la capacité nulle.
+    """
+    if longueur is None:
+        return INFINI
+    if nb_fourmis == 0:
+        return 0
+    if capacite == 0:
+        return INFINI
+    if capacite >= INFINI:
+        return longueur
+    return longueur + -(-nb_fourmis // capacite) - 1
+
+
+class OrdonnanceurFlot:
+    """
+    Ordonnanceur optimal : calcule le nombre minimal d'étapes pour amener toutes
+    les fourmis de Sv à Sd en respectant Salle.capacite, puis le plan de
+    déplacements correspondant.
+
+    Chaque salle est dédoublée (entrée -> sortie, capacité de la salle, coût 1 :
+    une étape passée dans la salle), les tunnels relient sortie -> entrée sans
+    limite. Un flot statique x découpé en chemins p de longueur L(p) se répète
+    à chaque étape : en T étapes il achemine |x| * (T + 1) - somme x(p) * L(p)
+    fourmis, et le flot de coût minimum donne le meilleur x pour chaque valeur
+    de flot (flot "temporellement répété", optimal sans attente intermédiaire).
+    Les chemins augmentants sont ajoutés un à un sur le même réseau résiduel :
+    chaque augmentation met à jour l'horizon sans reconstruire de réseau étendu
+    dans le temps, et on s'arrête dès qu'un chemin plus long ne peut plus
+    raccourcir la simulation.
+    """
+    def __init__(self, fourmiliere):
+        self.fourmiliere = fourmiliere
+        self.graphe = fourmiliere.graphe()
+        self.noms = self.graphe.noms
+        self.indices = self.graphe.indices
+        self.horizon = None
+        self.chemins = []
+
+    def _construire_reseau(self):
+        """
+        Réseau statique à salles dédoublées : entrée 2i, sortie 2i + 1.
+        """
+        reseau = ReseauFlot(2 * len(self.noms))
+        for i, nom in enumerate(self.noms):
+            salle = self.fourmiliere.salles.get(nom)
+            if nom in ("Sv", "Sd"):
+                reseau.ajouter_arc(2 * i, 2 * i + 1, INFINI, 0)
+            elif salle is not None and salle.capacite > 0:
+                cap = INFINI if salle.capacite == float("inf") else salle.capacite
+                reseau.ajouter_arc(2 * i, 2 * i + 1, cap, 1)
+
+        sv, sd = self.indices["Sv"], self.indices["Sd"]
+        _, debuts, voisins = self.graphe.adjacence()
+        for u in range(len(self.noms)):
+            # inutile de ressortir de Sd ou de revenir dans Sv
+            if u == sd:
+                continue
+            for k in range(debuts[u], debuts[u + 1]):
+                v = voisins[k]
+                if v != sv:
+                    reseau.ajouter_arc(2 * u + 1, 2 * v, INFINI, 0)
+        return reseau
+
+    def calculer(self):
+        """
+        Calcule l'horizon minimal (nombre d'étapes) et les chemins du flot retenu.
+        Retourne l'horizon.
+        """
+        n = self.fourmiliere.nb_fourmis
+        self.chemins = []
+        if n == 0:
+            self.horizon = 0
+            return 0
+
+        reseau = self._construire_reseau()
+        source = 2 * self.indices["Sv"] + 1
+        puits = 2 * self.indices["Sd"]
+        potentiel = [0] * len(reseau.adj)
+
+        valeur = 0          # |x| : fourmis qui partent de Sv à chaque étape
+        somme_longueurs = 0  # somme x(p) * L(p)
+        horizon = None
+        while True:
+            arcs = reseau.plus_court_chemin(source, puits, potentiel)
+            if arcs is None:
+                break
+            # longueur en étapes : une par salle traversée, plus l'entrée dans Sd
+            longueur = potentiel[puits] - potentiel[source] + 1
+            # un chemin de longueur >= horizon n'apporte plus rien à horizon - 1
+            if horizon is not None and longueur >= horizon:
+                break
+            quantite = min(min(reseau.cap[a] for a in arcs), n)
+            reseau.augmenter(arcs, quantite)
+            valeur += quantite
+            somme_longueurs += quantite * longueur
+            # plus petit T tel que valeur * (T + 1) - somme_longueurs >= n
+            horizon = max(longueur - 1, -(-(n + somme_longueurs) // valeur) - 1)
+
+        if horizon is None:
+            raise RuntimeError("Aucun chemin Sv -> Sd trouvé!")
+
+        # décomposition du flot en chemins (le flot de coût minimum est acyclique)
+        while True:
+            u = source
+            salles = ["Sv"]
+            arcs = []
+            while u != puits:
+                a = next((a for a in reseau.adj[u] if a % 2 == 0 and reseau.flot(a) > 0), None)
+                if a is None:
+                    break
+                arcs.append(a)
+                u = reseau.dest[a]
+                if u % 2 == 0:
+                    salles.append(self.noms[u // 2])
+            if u != puits:
+                break
+            quantite = min(reseau.flot(a) for a in arcs)
+            for a in arcs:
+                reseau.cap[a] += quantite
+            self.chemins.append((salles, quantite))
+
+        self.horizon = horizon
+        return horizon
+
+    def iter_etapes(self, stats=None):
+        """
+        Produit un enregistrement.Etape par étape pour le plan
+        optimal : sur chaque chemin, un groupe de x(p) fourmis part de Sv à chaque
+        étape tant qu'il peut encore arriver avant l'horizon.
+        stats : instrumentation.Statistiques optionnel (calcul du flot, puis
+        génération de chaque étape).
+        """
+        if self.horizon is None:
+            debut = perf_counter()
+            self.calculer()
+            if stats is not None:
+                stats.phase_globale("calcul_flot", debut, perf_counter())
+        n = self.fourmiliere.nb_fourmis
+        horizon = self.horizon
+        indices = self.indices
+        chemins = [([indices[s] for s in salles], quantite) for salles, quantite in self.chemins]
+
+        # groupes de départ (étape de départ, chemin, premier id, nombre), par départ croissant
+        groupes = []
+        prochain_id = 1
+        for depart in range(1, horizon + 1):
+            for salles, quantite in chemins:
+                if prochain_id > n:
+                    break
+                if depart + len(salles) - 2 > horizon:
+                    continue
+                nombre = min(quantite, n - prochain_id + 1)
+                groupes.append((depart, salles, prochain_id, nombre))
+                prochain_id += nombre
+
+        en_route = []
+        suivant = 0
+        etape = 1
+        while suivant < len(groupes) or en_route:
+            if stats is not None:
+                debut = perf_counter()
+            while suivant < len(groupes) and groupes[suivant][0] == etape:
+                en_route.append(groupes[suivant])
+                suivant += 1
+
+            mouvements = []
+            for depart, salles, premier, nombre in en_route:
+                k = etape - depart
+                restant = len(salles) - 1 - k
+                for fid in range(premier, premier + nombre):
+                    mouvements.append((restant, fid, salles[k], salles[k + 1]))
+            # même ordre que les autres moteurs : les plus proches de Sd d'abord
+            mouvements.sort()
+            en_route = [g for g in en_route if etape - g[0] + 1 < len(g[1]) - 1]
+
+            if stats is not None:
+                stats.enregistrer_etape(etape, [("generation", debut, perf_counter())])
+            yield Etape(
+                etape, self.noms,
+                array("i", [m[1] for m in mouvements]),
+                array("i", [m[2] for m in mouvements]),
+                array("i", [m[3] for m in mouvements]),
+            )
+            etape += 1
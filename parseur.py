@@ -0,0 +1,156 @@
+# parseur.py
+from array import array
+import hashlib
+import mmap
+import os
+import struct
+
+from graphe import GrapheCompact
+
+# en-tête du cache : signature, mtime (ns) et taille de la source, empreinte
+# blake2b de la source, nombre de fourmis, de salles et de tunnels
+ENTETE = struct.Struct("<8sqq32sqqq")
+SIGNATURE = b"FOURMI01"
+
+
+def chemin_cache(path):
+    """
+    Fichier de cache binaire associé à une fourmilière texte.
+    """
+    return path + ".cache"
+
+
+def empreinte(path):
+    """
+    Empreinte blake2b (32 octets) du contenu d'un fichier.
+    """
+    h = hashlib.blake2b(digest_size=32)
+    with open(path, "rb") as f:
+        for bloc in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloc)
+    return h.digest()
+
+
+def parser_fichier(path):
+    """
+    Lit une fourmilière texte en un seul passage, directement dans un GrapheCompact.
+    Lève ValueError (avec le numéro de ligne) pour une ligne mal formée ou un tunnel
+    dont une extrémité n'est déclarée nulle part dans le fichier.
+    """
+    graphe = GrapheCompact()
+    indices = graphe.indices
+    declarees = {"Sv", "Sd"}
+    premiere_ligne = {}  # salle citée dans un tunnel -> première ligne où elle apparaît
+    tunnels = graphe.tunnels
+
+    with open(path, "r") as f:
+        for num, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+
+            # nombre de fourmis
+            if line.startswith("f="):
+                graphe.nb_fourmis = int(line.split("=")[1].strip())
+                continue
+
+            # tunnel ; des noms contenant "-" s'écrivent "a-b - c" (séparateur " - ")
+            # et une telle salle se déclare avec sa capacité : "a-b { 1 }"
+            if "-" in line and "{" not in line:
+                separateur = " - " if " - " in line else "-"
+                s1, _, s2 = line.partition(separateur)
+                if separateur in s2:
+                    raise ValueError(f"{path}:{num}: tunnel mal formé : {line!r}")
+                s1 = s1.strip()
+                s2 = s2.strip()
+                for nom in (s1, s2):
+                    if nom not in indices:
+                        premiere_ligne.setdefault(nom, num)
+                        graphe.interner(nom)
+                tunnels.append(indices[s1])
+                tunnels.append(indices[s2])
+                continue
+
+            # salle (une salle déjà déclarée garde sa première capacité)
+            if "{" in line:
+                nom, cap = line.split("{")
+                nom = nom.strip()
+                cap = int(cap.strip(" }"))
+            else:
+                nom, cap = line, 1
+            if nom not in declarees:
+                declarees.add(nom)
+                graphe.capacites[graphe.interner(nom)] = cap
+
+    inconnues = [nom for nom in premiere_ligne if nom not in declarees]
+    if inconnues:
+        nom = min(inconnues, key=premiere_ligne.get)
+        raise ValueError(f"{path}:{premiere_ligne[nom]}: tunnel vers une salle non déclarée : {nom!r}")
+    return graphe
+
+
+def ecrire_cache(graphe, path):
+    """
+    Écrit le cache binaire de `graphe` à côté de la source `path` :
+    en-tête, capacités (int64), tunnels (int32), puis noms des salles en UTF-8.
+    """
+    st = os.stat(path)
+    entete = ENTETE.pack(SIGNATURE, st.st_mtime_ns, st.st_size, empreinte(path),
+                         graphe.nb_fourmis, graphe.nb_salles, graphe.nb_tunnels)
+    tmp = chemin_cache(path) + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(entete)
+        f.write(array("q", graphe.capacites).tobytes())
+        f.write(array("i", graphe.tunnels).tobytes())
+        f.write("\n".join(graphe.noms).encode("utf-8"))
+    # remplacement atomique : un lecteur ne voit jamais de cache à moitié écrit
+    os.replace(tmp, chemin_cache(path))
+
+
+def lire_cache(path):
+    """
+    Charge le cache de `path` par projection mémoire, s'il existe et correspond
+    encore à la source (même mtime et même empreinte). Retourne None sinon.
+    Capacités et tunnels restent des vues sur le fichier projeté.
+    """
+    try:
+        f = open(chemin_cache(path), "rb")
+    except FileNotFoundError:
+        return None
+    with f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # fichier vide
+            return None
+    if len(mm) < ENTETE.size:
+        return None
+    signature, mtime, taille, trace, nb_fourmis, nb_salles, nb_tunnels = ENTETE.unpack_from(mm)
+    st = os.stat(path)
+    if signature != SIGNATURE or mtime != st.st_mtime_ns or taille != st.st_size or trace != empreinte(path):
+        return None
+
+    vue = memoryview(mm)
+    debut = ENTETE.size
+    capacites = vue[debut:debut + 8 * nb_salles].cast("q")
+    debut += 8 * nb_salles
+    tunnels = vue[debut:debut + 8 * nb_tunnels].cast("i")
+    debut += 8 * nb_tunnels
+    noms = bytes(vue[debut:]).decode("utf-8").split("\n")
+    return GrapheCompact(nb_fourmis, noms, capacites, tunnels)
+
+
+def lire_fichier(path, cache=False):
+    """
+    Retourne le GrapheCompact d'un fichier de fourmilière.
+    Avec cache=True, réutilise le cache binaire voisin s'il est à jour,
+    sinon parse la source et (ré)écrit le cache.
+    """
+    if cache:
+        graphe = lire_cache(path)
+        if graphe is not None:
+            return graphe
+    graphe = parser_fichier(path)
+    if cache:
+        ecrire_cache(graphe, path)
+    return graphe
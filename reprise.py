@@ -0,0 +1,200 @@
+# reprise.py
+"""
+Points de reprise d'une simulation (moteurs "objets", "compact" et "numpy") :
+l'état complet après une étape, enregistré dans un format binaire compact pour
+reprendre une longue simulation interrompue, ou rejouer à partir d'une étape
+sans tout recalculer depuis E1.
+
+L'état tient en trois colonnes par fourmi (salle, chemin suivi, index dans ce
+chemin) et la table des chemins suivis ; l'occupation des salles s'en déduit.
+Les files des salles n'ont pas d'ordre significatif : seule leur taille compte.
+
+Format (petit-boutiste) : un en-tête fixe, puis les colonnes compressées par zlib.
+"""
+from array import array
+import hashlib
+import os
+import re
+import struct
+import sys
+import zlib
+
+MAGIE = b"FOURMIPR"
+VERSION = 1
+# magie, version, étape, fourmis, chemins, salles des chemins (à plat), empreinte
+ENTETE = struct.Struct("<8sHxxQQQQ32s")
+EXTENSION = ".pdr"
+
+
+def empreinte(fourmiliere):
+    """
+    Empreinte blake2b (32 octets) de la structure de la fourmilière : salles,
+    capacités, tunnels et nombre de fourmis. Un point de reprise ne s'applique
+    qu'à une fourmilière de même empreinte.
+    """
+    graphe = fourmiliere.graphe()
+    h = hashlib.blake2b(digest_size=32)
+    h.update(struct.pack("<Q", fourmiliere.nb_fourmis))
+    h.update("\n".join(graphe.noms).encode())
+    h.update(array("q", graphe.capacites).tobytes())
+    h.update(array("i", graphe.tunnels).tobytes())
+    return h.digest()
+
+
+class PointDeReprise:
+    """
+    État d'une simulation à la fin de l'étape `etape` (0 : avant la première).
+    La fourmi d'id k + 1 est dans la salle position[k] (indice de
+    GrapheCompact.noms), suit le chemin chemins[chemin[k]] (tuple d'indices de
+    salles) et s'y trouve à l'index index[k].
+    """
+    __slots__ = ("etape", "empreinte", "position", "chemin", "index", "chemins")
+
+    def __init__(self, etape, empreinte, position, chemin, index, chemins):
+        self.etape = etape
+        self.empreinte = empreinte
+        self.position = position
+        self.chemin = chemin
+        self.index = index
+        self.chemins = chemins
+
+    def occupation(self, nb_salles):
+        """
+        Nombre de fourmis par salle (Sv et Sd compris).
+        """
+        occupation = array("q", [0]) * nb_salles
+        for salle in self.position:
+            occupation[salle] += 1
+        return occupation
+
+    def verifier(self, fourmiliere):
+        """
+        Lève ValueError si le point n'a pas été pris sur cette fourmilière.
+        """
+        if self.empreinte != empreinte(fourmiliere):
+            raise ValueError("Point de reprise d'une autre fourmilière (salles, tunnels ou fourmis différents)")
+
+    def __repr__(self):
+        return f"PointDeReprise(E{self.etape}, {len(self.position)} fourmis)"
+
+
+def _petit_boutiste(colonne):
+    if sys.byteorder == "big":
+        colonne = array(colonne.typecode, colonne)
+        colonne.byteswap()
+    return colonne.tobytes()
+
+
+def ecrire_point(path, point):
+    """
+    Écrit un point de reprise (écriture atomique : fichier temporaire puis renommage).
+    """
+    longueurs = array("i", (len(c) for c in point.chemins))
+    plats = array("i")
+    for c in point.chemins:
+        plats.extend(c)
+    donnees = b"".join(_petit_boutiste(colonne) for colonne in (
+        array("i", point.position), array("i", point.chemin), array("i", point.index), longueurs, plats,
+    ))
+    entete = ENTETE.pack(MAGIE, VERSION, point.etape, len(point.position), len(point.chemins),
+                         len(plats), point.empreinte)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(entete)
+        f.write(zlib.compress(donnees, 1))
+    os.replace(tmp, path)
+    return path
+
+
+def lire_point(path):
+    """
+    Relit un point de reprise écrit par ecrire_point. Lève ValueError si le
+    fichier n'en est pas un (ou d'une autre version du format).
+    """
+    with open(path, "rb") as f:
+        brut = f.read()
+    if len(brut) < ENTETE.size:
+        raise ValueError(f"Point de reprise tronqué : {path}")
+    magie, version, etape, n, nb_chemins, nb_plats, empreinte_ = ENTETE.unpack_from(brut)
+    if magie != MAGIE or version != VERSION:
+        raise ValueError(f"Pas un point de reprise (version {VERSION}) : {path}")
+    try:
+        donnees = zlib.decompress(brut[ENTETE.size:])
+    except zlib.error as e:
+        raise ValueError(f"Point de reprise illisible : {path}") from e
+
+    colonnes = []
+    debut = 0
+    for taille in (n, n, n, nb_chemins, nb_plats):
+        colonne = array("i")
+        colonne.frombytes(donnees[debut:debut + taille * colonne.itemsize])
+        if sys.byteorder == "big":
+            colonne.byteswap()
+        debut += taille * colonne.itemsize
+        colonnes.append(colonne)
+    position, chemin, index, longueurs, plats = colonnes
+    if len(plats) != nb_plats:
+        raise ValueError(f"Point de reprise tronqué : {path}")
+    chemins = []
+    debut = 0
+    for longueur in longueurs:
+        chemins.append(tuple(plats[debut:debut + longueur]))
+        debut += longueur
+    return PointDeReprise(etape, empreinte_, position, chemin, index, chemins)
+
+
+class Points:
+    """
+    Points de reprise rangés dans un dossier, un fichier par étape :
+    <empreinte>_E<étape>.pdr. Avec `periode`, Fourmiliere.iter_etapes en écrit
+    un toutes les `periode` étapes.
+    """
+    MOTIF = re.compile(r"^([0-9a-f]{16})_E(\d+)" + re.escape(EXTENSION) + "$")
+
+    def __init__(self, dossier, periode=1000):
+        if periode < 1:
+            raise ValueError("La période des points de reprise doit être positive")
+        self.dossier = dossier
+        self.periode = periode
+
+    def chemin(self, empreinte_, etape):
+        return os.path.join(self.dossier, f"{empreinte_.hex()[:16]}_E{etape:09d}{EXTENSION}")
+
+    def enregistrer(self, point):
+        """
+        Écrit le point (sauf s'il existe déjà : la simulation est déterministe).
+        """
+        path = self.chemin(point.empreinte, point.etape)
+        if not os.path.exists(path):
+            os.makedirs(self.dossier, exist_ok=True)
+            ecrire_point(path, point)
+        return path
+
+    def disponibles(self, fourmiliere):
+        """
+        Liste triée des (étape, fichier) des points de reprise de cette fourmilière.
+        """
+        prefixe = empreinte(fourmiliere).hex()[:16]
+        try:
+            fichiers = os.listdir(self.dossier)
+        except FileNotFoundError:
+            return []
+        points = []
+        for nom in fichiers:
+            m = self.MOTIF.match(nom)
+            if m and m.group(1) == prefixe:
+                points.append((int(m.group(2)), os.path.join(self.dossier, nom)))
+        points.sort()
+        return points
+
+    def dernier(self, fourmiliere, avant=None):
+        """
+        Dernier point de reprise de cette fourmilière pris au plus tard à l'étape
+        `avant` (le plus récent si None), ou None s'il n'y en a pas.
+        """
+        for etape, path in reversed(self.disponibles(fourmiliere)):
+            if avant is None or etape <= avant:
+                point = lire_point(path)
+                point.verifier(fourmiliere)
+                return point
+        return None
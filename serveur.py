@@ -0,0 +1,301 @@
+# serveur.py
+"""
+Serveur local de simulation : un seul processus garde les fourmilières déjà lues
+et l'index de leurs plus courts chemins, au lieu de relancer `python main.py`
+(démarrage de l'interpréteur, imports, lecture du fichier, index) à chaque requête.
+
+    python serveur.py --port 8765
+    curl 'http://127.0.0.1:8765/simuler?fichier=four/fourmiliere_cinq.txt&moteur=compact'
+
+    python serveur.py --socket /tmp/fourmis.sock
+    curl --unix-socket /tmp/fourmis.sock 'http://local/estimer?fichier=four/fourmiliere_cinq.txt'
+
+Routes (GET, réponses JSON) :
+- /simuler?fichier=F[&moteur=M][&format=texte] : une ligne JSON par étape
+  ({"etape": n, "mouvements": [[fourmi, départ, arrivée], ...]}), envoyée dès
+  qu'elle est calculée, puis une ligne {"fin": true, ...} ou {"erreur": ...} ;
+  avec format=texte, les logs de main.py ;
+- /estimer?fichier=F : bornes de Fourmiliere.estimer, comme main.py --estimer ;
+- /cache : contenu et compteurs du cache.
+
+Les fourmilières sont rangées dans un cache LRU par empreinte du contenu du
+fichier (parseur.empreinte, recalculée seulement si sa date ou sa taille
+change) : un fichier modifié est relu, deux copies identiques partagent leur
+entrée. Chaque entrée garde l'index des chemins, l'estimation et, pour les
+simulations pas trop longues, les étapes elles-mêmes : une requête répétée est
+rejouée sans simuler.
+
+Les requêtes sont servies chacune dans un thread. Les simulations longues se
+partagent le processeur (GIL) : pour calculer beaucoup de fichiers en
+parallèle, main.py --lot reste l'outil.
+"""
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+import argparse
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+
+from enregistrement import formater_etape
+from fourmi import Fourmiliere
+from main import resume_estimation
+from parseur import empreinte, lire_fichier
+
+MOTEURS = ("objets", "compact", "numpy", "flot")
+# les moteurs gloutons simulent exactement les mêmes étapes : une seule entrée pour eux
+GLOUTONS = ("objets", "compact", "numpy")
+# au-delà de ce nombre de mouvements, les étapes d'une simulation ne sont pas gardées
+MAX_MOUVEMENTS_CACHE = 1_000_000
+
+
+class Nid:
+    """
+    Entrée du cache : une fourmilière lue et indexée, son estimation et les
+    étapes déjà simulées (par famille de moteurs).
+    """
+    def __init__(self, cle, fourmiliere):
+        self.cle = cle
+        self.fourmiliere = fourmiliere
+        # index des distances à Sd et tables des prochains sauts, partagés par les requêtes
+        fourmiliere.construire_index()
+        self._estimation = None
+        self.etapes = {}
+
+    def pour(self, moteur):
+        """
+        Fourmilière à simuler avec `moteur`. Les moteurs compact, numpy et flot ne
+        modifient pas la fourmilière et la partagent ; le moteur "objets" déplace
+        ses fourmis et reçoit sa propre vue (Fourmiliere.vue).
+        """
+        return self.fourmiliere.vue() if moteur == "objets" else self.fourmiliere
+
+    def estimation(self):
+        if self._estimation is None:
+            self._estimation = self.fourmiliere.estimer()
+        return self._estimation
+
+
+class CacheFourmilieres:
+    """
+    Cache LRU des fourmilières (Nid), par empreinte du contenu du fichier.
+    Utilisable depuis plusieurs threads.
+    """
+    def __init__(self, taille=32):
+        if taille < 1:
+            raise ValueError("La taille du cache doit être positive")
+        self.taille = taille
+        self._nids = OrderedDict()
+        # chemin -> (mtime, taille, empreinte) : évite de relire un fichier inchangé
+        self._empreintes = {}
+        self._verrou = threading.Lock()
+        self.succes = self.echecs = 0
+
+    def empreinte(self, path):
+        st = os.stat(path)
+        connue = self._empreintes.get(path)
+        if connue is not None and connue[:2] == (st.st_mtime_ns, st.st_size):
+            return connue[2]
+        cle = empreinte(path)
+        self._empreintes[path] = (st.st_mtime_ns, st.st_size, cle)
+        return cle
+
+    def obtenir(self, path):
+        """
+        Nid du fichier `path`, lu et indexé au premier appel (hors verrou : les
+        autres requêtes ne l'attendent pas). Retourne (nid, trouvé dans le cache).
+        """
+        cle = self.empreinte(path)
+        with self._verrou:
+            nid = self._nids.get(cle)
+            if nid is not None:
+                self._nids.move_to_end(cle)
+                self.succes += 1
+                return nid, True
+            self.echecs += 1
+        nid = Nid(cle, Fourmiliere.depuis_graphe(lire_fichier(path)))
+        with self._verrou:
+            # une autre requête a pu lire le même fichier entre-temps
+            nid = self._nids.setdefault(cle, nid)
+            self._nids.move_to_end(cle)
+            while len(self._nids) > self.taille:
+                self._nids.popitem(last=False)
+        return nid, False
+
+    def etat(self):
+        with self._verrou:
+            return {
+                "taille": self.taille, "succes": self.succes, "echecs": self.echecs,
+                "fourmilieres": [
+                    {"empreinte": cle.hex()[:16], "fourmis": nid.fourmiliere.nb_fourmis,
+                     "salles": nid.fourmiliere.graphe().nb_salles, "etapes": sorted(nid.etapes)}
+                    for cle, nid in self._nids.items()
+                ],
+            }
+
+
+def _etapes(nid, moteur):
+    """
+    Générateur des étapes de `nid` avec `moteur` : rejouées si elles sont en
+    cache, sinon simulées, et gardées si la simulation n'est pas trop longue.
+    """
+    famille = "glouton" if moteur in GLOUTONS else moteur
+    etapes = nid.etapes.get(famille)
+    if etapes is not None:
+        yield from etapes
+        return
+    etapes = []
+    mouvements = 0
+    for etape in nid.pour(moteur).iter_etapes(moteur):
+        if etapes is not None:
+            mouvements += len(etape)
+            etapes.append(etape)
+            if mouvements > MAX_MOUVEMENTS_CACHE:
+                etapes = None
+        yield etape
+    if etapes is not None:
+        nid.etapes[famille] = etapes
+
+
+class Requetes(BaseHTTPRequestHandler):
+    """
+    Traitement d'une requête HTTP (un thread par requête). `self.server.cache`
+    est le CacheFourmilieres partagé.
+    """
+    server_version = "Fourmis/1"
+
+    def address_string(self):
+        # socket Unix : pas d'adresse cliente
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format, *args):
+        if not self.server.silencieux:
+            super().log_message(format, *args)
+
+    def _json(self, code, donnees):
+        corps = json.dumps(donnees, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(corps)))
+        self.end_headers()
+        self.wfile.write(corps)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if url.path == "/cache":
+            self._json(200, self.server.cache.etat())
+            return
+        if url.path not in ("/simuler", "/estimer"):
+            self._json(404, {"erreur": f"route inconnue : {url.path}"})
+            return
+        path = params.get("fichier")
+        moteur = params.get("moteur", "objets")
+        if not path:
+            self._json(400, {"erreur": "paramètre fichier manquant"})
+            return
+        if moteur not in MOTEURS:
+            self._json(400, {"erreur": f"moteur inconnu : {moteur}"})
+            return
+
+        debut = time.perf_counter()
+        try:
+            nid, en_cache = self.server.cache.obtenir(path)
+        except FileNotFoundError:
+            self._json(404, {"fichier": path, "erreur": "fichier introuvable"})
+            return
+        except Exception as e:
+            self._json(400, {"fichier": path, "erreur": f"{type(e).__name__}: {e}"})
+            return
+
+        if url.path == "/estimer":
+            self._estimer(path, nid, en_cache, debut)
+        else:
+            self._simuler(path, nid, moteur, params.get("format") == "texte", en_cache, debut)
+
+    def _estimer(self, path, nid, en_cache, debut):
+        resultat = resume_estimation(path, nid.estimation, debut)
+        resultat["cache"] = en_cache
+        self._json(200 if resultat["erreur"] is None else 422, resultat)
+
+    def _simuler(self, path, nid, moteur, en_texte, en_cache, debut):
+        # réponse en flux : ni longueur connue à l'avance, ni connexion réutilisée
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; charset=utf-8" if en_texte
+                         else "application/x-ndjson; charset=utf-8")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        nb_etapes = 0
+        try:
+            for etape in _etapes(nid, moteur):
+                nb_etapes = etape.numero
+                if en_texte:
+                    ligne = formater_etape(etape)
+                else:
+                    ligne = json.dumps({"etape": etape.numero, "mouvements": list(etape.mouvements())},
+                                       ensure_ascii=False)
+                self.wfile.write(ligne.encode("utf-8") + b"\n")
+            fin = {"fin": True, "fichier": path, "etapes": nb_etapes,
+                   "duree": round(time.perf_counter() - debut, 6), "cache": en_cache}
+        except (BrokenPipeError, ConnectionResetError):
+            # client parti : la simulation s'arrête avec le générateur
+            return
+        except Exception as e:
+            fin = {"fichier": path, "etapes": nb_etapes, "erreur": f"{type(e).__name__}: {e}"}
+        if not en_texte:
+            self.wfile.write(json.dumps(fin, ensure_ascii=False).encode("utf-8") + b"\n")
+        elif "erreur" in fin:
+            self.wfile.write(f"Erreur : {fin['erreur']}\n".encode("utf-8"))
+
+
+class ServeurHTTP(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, adresse, cache, silencieux=False):
+        super().__init__(adresse, Requetes)
+        self.cache = cache
+        self.silencieux = silencieux
+
+
+class ServeurUnix(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, chemin, cache, silencieux=False):
+        # socket restée d'un serveur précédent
+        if os.path.exists(chemin):
+            os.unlink(chemin)
+        super().__init__(chemin, Requetes)
+        self.cache = cache
+        self.silencieux = silencieux
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serveur local de simulation de fourmilières.")
+    parser.add_argument("--hote", default="127.0.0.1", help="adresse d'écoute (défaut : 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="port HTTP (défaut : 8765)")
+    parser.add_argument("--socket", metavar="CHEMIN", help="écoute sur une socket Unix plutôt qu'en TCP")
+    parser.add_argument("--taille-cache", type=int, default=32,
+                        help="fourmilières gardées en mémoire (défaut : 32)")
+    parser.add_argument("--silencieux", action="store_true", help="ne journalise pas les requêtes")
+    args = parser.parse_args()
+    if args.taille_cache < 1:
+        parser.error("--taille-cache doit être positive")
+
+    cache = CacheFourmilieres(args.taille_cache)
+    if args.socket:
+        serveur = ServeurUnix(args.socket, cache, args.silencieux)
+        print(f"écoute sur {args.socket}", file=sys.stderr)
+    else:
+        serveur = ServeurHTTP((args.hote, args.port), cache, args.silencieux)
+        print(f"écoute sur http://{args.hote}:{serveur.server_address[1]}", file=sys.stderr)
+    try:
+        serveur.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        serveur.server_close()
+        if args.socket and os.path.exists(args.socket):
+            os.unlink(args.socket)
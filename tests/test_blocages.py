@@ -0,0 +1,108 @@
+# test_blocages.py
+"""
+Salles de capacité nulle : Blocage levée avant la première étape quand elles
+coupent tous les plus courts chemins, et impasses évitées sans changer les
+étapes des simulations qui aboutissent.
+"""
+import importlib.util
+
+import pytest
+
+from blocages import Blocage, impasses, salles_a_ouvrir, salles_viables
+from enregistrement import formater_etapes
+from fourmi import Fourmiliere
+
+MOTEURS = ["objets", "compact",
+           pytest.param("numpy", marks=pytest.mark.skipif(importlib.util.find_spec("numpy") is None,
+                                                            reason="NumPy absent"))]
+
+
+def construire(nb_fourmis, salles, tunnels):
+    fourmiliere = Fourmiliere(nb_fourmis)
+    for nom, capacite in salles:
+        fourmiliere.ajouter_salle(nom, capacite)
+    for a, b in tunnels:
+        fourmiliere.ajouter_tunnel(a, b)
+    return fourmiliere
+
+
+def noms(fourmiliere, indices):
+    return {fourmiliere.graphe().noms[i] for i in indices}
+
+
+def coupee():
+    # deux plus courts chemins (3 tunnels), fermés l'un par A et X, l'autre par B ;
+    # le détour par C - D - E est plus long et n'est pas suivi par les gloutons
+    return construire(6, [("A", 0), ("X", 0), ("B", 0), ("Y", 2), ("C", 1), ("D", 1), ("E", 1)], [
+        ("Sv", "A"), ("A", "X"), ("X", "Sd"),
+        ("Sv", "B"), ("B", "Y"), ("Y", "Sd"),
+        ("Sv", "C"), ("C", "D"), ("D", "E"), ("E", "Sd"),
+    ])
+
+
+@pytest.mark.parametrize("moteur", MOTEURS)
+def test_blocage_avant_la_premiere_etape(moteur):
+    fourmiliere = coupee()
+    with pytest.raises(Blocage) as erreur:
+        next(fourmiliere.iter_etapes(moteur))
+    # le moins de salles possible : B suffit
+    assert erreur.value.salles == ["B"]
+    assert "B" in str(erreur.value)
+    assert isinstance(erreur.value, RuntimeError)
+
+
+def test_analyse_de_la_fourmiliere_coupee():
+    fourmiliere = coupee()
+    assert "Sv" not in noms(fourmiliere, salles_viables(fourmiliere))
+    assert salles_a_ouvrir(fourmiliere) == ["B"]
+    fourmiliere.changer_capacite("B", 1)
+    assert "Sv" in noms(fourmiliere, salles_viables(fourmiliere))
+    assert salles_a_ouvrir(fourmiliere) == []
+
+
+def test_sans_fourmi_pas_de_blocage():
+    fourmiliere = construire(0, [("A", 0)], [("Sv", "A"), ("A", "Sd")])
+    assert salles_a_ouvrir(fourmiliere) == ["A"]
+    assert list(fourmiliere.iter_etapes("compact")) == []
+
+
+def avec_impasse():
+    # Sv - P1 - P2 - Sd et Sv - Q1 - Q2 - Sd ; l'impasse : I (capacité 3), à la
+    # même distance de Sd que P1, ne mène à Sd que par Z de capacité nulle
+    return construire(25, [("P1", 1), ("P2", 1), ("Q1", 2), ("Q2", 1), ("I", 3), ("Z", 0)], [
+        ("Sv", "P1"), ("P1", "P2"), ("P2", "Sd"), ("Sv", "Q1"), ("Q1", "Q2"), ("Q2", "Sd"),
+        ("Sv", "I"), ("I", "Z"), ("Z", "Sd"), ("P1", "Z"),
+    ])
+
+
+@pytest.mark.parametrize("moteur", MOTEURS)
+def test_impasse_evitee(moteur):
+    fourmiliere = avec_impasse()
+    assert noms(fourmiliere, impasses(fourmiliere)) == {"I"}
+    # les chemins par I ou Z changent le tourniquet : on vérifie seulement que
+    # personne n'entre dans l'impasse et que toutes les fourmis arrivent
+    position = {}
+    for etape in fourmiliere.iter_etapes(moteur):
+        for fid, _, arrivee in etape.mouvements():
+            assert arrivee not in ("I", "Z")
+            position[fid] = arrivee
+    assert len(position) == fourmiliere.nb_fourmis
+    assert set(position.values()) == {"Sd"}
+
+
+def impasse_laterale(avec_cul_de_sac):
+    # cul-de-sac de capacité nulle branché sur le chemin, hors de tout plus court chemin
+    salles = [("S1", 2), ("S2", 1), ("S3", 2)]
+    tunnels = [("Sv", "S1"), ("S1", "S2"), ("S2", "S3"), ("S3", "Sd")]
+    if avec_cul_de_sac:
+        salles.append(("M", 0))
+        tunnels.append(("S2", "M"))
+    return construire(12, salles, tunnels)
+
+
+@pytest.mark.parametrize("moteur", MOTEURS)
+def test_cul_de_sac_ferme_hors_du_chemin(moteur):
+    fourmiliere = impasse_laterale(avec_cul_de_sac=True)
+    assert impasses(fourmiliere) == []
+    assert (list(formater_etapes(fourmiliere.iter_etapes(moteur)))
+            == list(formater_etapes(impasse_laterale(avec_cul_de_sac=False).iter_etapes(moteur))))
@@ -0,0 +1,76 @@
+# test_index.py
+"""
+Mise à jour incrémentale de l'index (Fourmiliere.ajouter_tunnel, retirer_tunnel,
+changer_capacite) : après chaque modification, distances à Sd et prochains sauts
+doivent être ceux d'un GrapheCompact reconstruit de zéro.
+"""
+import random
+
+import pytest
+
+from fourmi import Fourmiliere
+from graphe import GrapheCompact
+
+
+def fourmiliere_aleatoire(rng):
+    fourmiliere = Fourmiliere(rng.randint(1, 30))
+    nb = rng.randint(3, 15)
+    for i in range(nb):
+        fourmiliere.ajouter_salle(f"S{i}", rng.choice([0, 1, 1, 2, 3]))
+    noms = ["Sv", "Sd"] + [f"S{i}" for i in range(nb)]
+    for _ in range(rng.randint(nb, 3 * nb)):
+        a, b = rng.sample(noms, 2)
+        if b not in fourmiliere.tunnels.get(a, []):
+            fourmiliere.ajouter_tunnel(a, b)
+    return fourmiliere, noms
+
+
+def reconstruite(fourmiliere):
+    """
+    Fourmilière sur un GrapheCompact construit de zéro (aucun index hérité).
+    """
+    graphe = fourmiliere.graphe()
+    neuf = GrapheCompact.depuis_listes(fourmiliere.nb_fourmis, list(graphe.noms),
+                                       list(graphe.capacites), fourmiliere.tunnels)
+    return Fourmiliere.depuis_graphe(neuf)
+
+
+def verifier(fourmiliere):
+    neuve = reconstruite(fourmiliere)
+    graphe = neuve.graphe()
+    attendues = {graphe.noms[i]: d for i, d in graphe.distances(graphe.indices["Sd"]).items()}
+    assert fourmiliere.construire_index() == attendues
+    assert list(fourmiliere.graphe().capacites) == list(graphe.capacites)
+    for nom in graphe.noms:
+        assert fourmiliere.prochains_sauts(nom) == neuve.prochains_sauts(nom), nom
+
+
+@pytest.mark.parametrize("graine", range(200))
+def test_modifications_aleatoires(graine):
+    rng = random.Random(graine)
+    fourmiliere, noms = fourmiliere_aleatoire(rng)
+    # index et tables de sauts construits avant les modifications
+    verifier(fourmiliere)
+    for _ in range(15):
+        action = rng.choice(["ajout", "ajout", "retrait", "capacite"])
+        if action == "ajout":
+            a, b = rng.sample(noms, 2)
+            if b in fourmiliere.tunnels.get(a, []):
+                continue
+            fourmiliere.ajouter_tunnel(a, b)
+        elif action == "retrait":
+            tunnels = [(a, b) for a, voisins in fourmiliere.tunnels.items() for b in voisins]
+            if not tunnels:
+                continue
+            fourmiliere.retirer_tunnel(*rng.choice(tunnels))
+        else:
+            fourmiliere.changer_capacite(rng.choice(noms[2:]), rng.choice([0, 1, 2, 5]))
+        verifier(fourmiliere)
+
+
+def test_retirer_tunnel_inconnu():
+    fourmiliere = Fourmiliere(1)
+    fourmiliere.ajouter_salle("S1")
+    fourmiliere.ajouter_tunnel("Sv", "S1")
+    with pytest.raises(ValueError):
+        fourmiliere.retirer_tunnel("S1", "Sd")
@@ -0,0 +1,75 @@
+# test_moteur_numpy.py
+"""
+Le noyau NumPy (moteur "numpy") doit produire exactement les étapes du moteur
+compact, y compris quand des fourmis restent bloquées dans Sv ou derrière des
+salles de capacité nulle.
+"""
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import generateurs
+from blocages import Blocage
+from enregistrement import formater_etapes
+from fourmi import Fourmiliere
+from parseur import parser_fichier
+
+
+def etapes(fourmiliere, moteur):
+    try:
+        return list(formater_etapes(fourmiliere.iter_etapes(moteur)))
+    except RuntimeError as e:
+        # Blocage ou deadlock : même erreur attendue des deux moteurs
+        return (type(e).__name__, str(e), getattr(e, "salles", None))
+
+
+def comparer(fabrique):
+    assert etapes(fabrique(), "numpy") == etapes(fabrique(), "compact")
+
+
+@pytest.mark.parametrize("graine", range(60))
+def test_fourmilieres_generees(graine, tmp_path):
+    rng = random.Random(graine)
+    generateur, parametres = rng.choice([
+        (generateurs.aleatoire, dict(nb_salles=rng.randint(5, 80), nb_fourmis=rng.randint(1, 300),
+                                     capacites=(1, 2, 3))),
+        # goulots étroits : la plupart des fourmis attendent dans Sv
+        (generateurs.goulots, dict(nb_chemins=rng.randint(1, 5), longueur=rng.randint(2, 8),
+                                   nb_fourmis=rng.randint(1, 300), capacites=(1, 3),
+                                   capacite_goulot=rng.randint(1, 3))),
+        (generateurs.grille, dict(largeur=rng.randint(2, 6), hauteur=rng.randint(2, 6),
+                                  nb_fourmis=rng.randint(1, 200), capacites=(1, 2, 3))),
+    ])
+    path = generateurs.ecrire(str(tmp_path / "fourmiliere.txt"), generateur(**parametres, graine=graine))
+    comparer(lambda: Fourmiliere.depuis_graphe(parser_fichier(path)))
+
+
+@pytest.mark.parametrize("graine", range(150))
+def test_salles_de_capacite_nulle(graine):
+    def fabrique():
+        rng = random.Random(graine)
+        fourmiliere = Fourmiliere(rng.randint(1, 40))
+        nb = rng.randint(3, 14)
+        for i in range(nb):
+            fourmiliere.ajouter_salle(f"S{i}", rng.choice([0, 0, 1, 1, 2, 3]))
+        noms = ["Sv", "Sd"] + [f"S{i}" for i in range(nb)]
+        for _ in range(rng.randint(nb, 3 * nb)):
+            a, b = rng.sample(noms, 2)
+            if {a, b} != {"Sv", "Sd"} and b not in fourmiliere.tunnels.get(a, []):
+                fourmiliere.ajouter_tunnel(a, b)
+        return fourmiliere
+    comparer(fabrique)
+
+
+def test_blocage_dans_sv():
+    def fabrique():
+        fourmiliere = Fourmiliere(5)
+        fourmiliere.ajouter_salle("S1", 0)
+        fourmiliere.ajouter_tunnel("Sv", "S1")
+        fourmiliere.ajouter_tunnel("S1", "Sd")
+        return fourmiliere
+    with pytest.raises(Blocage):
+        list(fabrique().iter_etapes("numpy"))
+    comparer(fabrique)
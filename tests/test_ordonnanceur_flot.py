@@ -0,0 +1,130 @@
+# test_ordonnanceur_flot.py
+"""
+Le plan de l'ordonnanceur par flot (moteur "flot") doit être valide — chaque
+mouvement suit un tunnel, aucune salle ne dépasse sa capacité, toutes les
+fourmis finissent dans Sd — et jamais plus long que celui des moteurs gloutons.
+"""
+import random
+
+import pytest
+
+import generateurs
+from fourmi import Fourmiliere
+from ordonnanceur_flot import INFINI, OrdonnanceurFlot, borne_etapes, coupe_minimale
+from parseur import parser_fichier
+
+
+def fabrique(graine, tmp_path):
+    rng = random.Random(graine)
+    generateur, parametres = rng.choice([
+        (generateurs.chaine, dict(longueur=rng.randint(1, 8), nb_fourmis=rng.randint(1, 60),
+                                  capacites=(1, 2, 3))),
+        (generateurs.aleatoire, dict(nb_salles=rng.randint(5, 40), nb_fourmis=rng.randint(1, 120),
+                                     capacites=(1, 2, 3))),
+        (generateurs.goulots, dict(nb_chemins=rng.randint(1, 4), longueur=rng.randint(2, 6),
+                                   nb_fourmis=rng.randint(1, 120), capacites=(1, 3),
+                                   capacite_goulot=rng.randint(1, 3))),
+        (generateurs.grille, dict(largeur=rng.randint(2, 5), hauteur=rng.randint(2, 5),
+                                  nb_fourmis=rng.randint(1, 100), capacites=(1, 2, 3))),
+    ])
+    path = generateurs.ecrire(str(tmp_path / "fourmiliere.txt"), generateur(**parametres, graine=graine))
+    return lambda: Fourmiliere.depuis_graphe(parser_fichier(path))
+
+
+def verifier_plan(fourmiliere, etapes):
+    """
+    Rejoue les étapes : tunnels, capacités à la fin de chaque étape, arrivée dans Sd.
+    """
+    position = {fid: "Sv" for fid in range(1, fourmiliere.nb_fourmis + 1)}
+    occupation = {nom: 0 for nom in fourmiliere.salles}
+    occupation["Sv"] = fourmiliere.nb_fourmis
+    for numero, etape in enumerate(etapes, 1):
+        assert etape.numero == numero
+        fids = list(etape.fourmis)
+        assert len(set(fids)) == len(fids), f"E{numero} : une fourmi bouge deux fois"
+        for fid, depart, arrivee in etape.mouvements():
+            assert position[fid] == depart
+            assert arrivee in fourmiliere.tunnels[depart], f"E{numero} : pas de tunnel {depart} - {arrivee}"
+            position[fid] = arrivee
+            occupation[depart] -= 1
+            occupation[arrivee] += 1
+        for nom, n in occupation.items():
+            if nom not in ("Sv", "Sd"):
+                assert n <= fourmiliere.salles[nom].capacite, f"E{numero} : {nom} déborde"
+    assert all(salle == "Sd" for salle in position.values())
+
+
+@pytest.mark.parametrize("graine", range(40))
+def test_plan_valide_et_optimal(graine, tmp_path):
+    nouvelle = fabrique(graine, tmp_path)
+    fourmiliere = nouvelle()
+    ordonnanceur = OrdonnanceurFlot(fourmiliere)
+    horizon = ordonnanceur.calculer()
+    etapes = list(ordonnanceur.iter_etapes())
+    assert len(etapes) == horizon
+    verifier_plan(fourmiliere, etapes)
+
+    gloutonnes = list(nouvelle().iter_etapes("objets"))
+    assert horizon <= len(gloutonnes)
+    # les gloutons ne suivent que les plus courts chemins : bornés par leur coupe
+    longueur, coupe, _ = coupe_minimale(fourmiliere)
+    assert borne_etapes(longueur, fourmiliere.nb_fourmis, coupe) <= len(gloutonnes)
+
+
+def test_meme_plan_par_iter_etapes(tmp_path):
+    nouvelle = fabrique(3, tmp_path)
+    directes = [list(e.mouvements()) for e in OrdonnanceurFlot(nouvelle()).iter_etapes()]
+    assert [list(e.mouvements()) for e in nouvelle().iter_etapes("flot")] == directes
+
+
+def test_chaine_de_capacite_un():
+    # une fourmi par étape sur le chemin : D + n - 1 étapes
+    fourmiliere = Fourmiliere(5)
+    precedente = "Sv"
+    for i in range(1, 4):
+        fourmiliere.ajouter_salle(f"S{i}", 1)
+        fourmiliere.ajouter_tunnel(precedente, f"S{i}")
+        precedente = f"S{i}"
+    fourmiliere.ajouter_tunnel(precedente, "Sd")
+    assert coupe_minimale(fourmiliere) == (4, 1, 1)
+    assert OrdonnanceurFlot(fourmiliere).calculer() == 4 + 5 - 1
+
+
+def test_tunnel_direct():
+    fourmiliere = Fourmiliere(7)
+    fourmiliere.ajouter_tunnel("Sv", "Sd")
+    assert coupe_minimale(fourmiliere) == (1, INFINI, INFINI)
+    ordonnanceur = OrdonnanceurFlot(fourmiliere)
+    assert ordonnanceur.calculer() == 1
+    verifier_plan(fourmiliere, list(ordonnanceur.iter_etapes()))
+
+
+def test_aucun_chemin():
+    fourmiliere = Fourmiliere(3)
+    fourmiliere.ajouter_salle("S1", 1)
+    fourmiliere.ajouter_tunnel("Sv", "S1")
+    assert coupe_minimale(fourmiliere) == (None, 0, 0)
+    with pytest.raises(RuntimeError, match="Aucun chemin"):
+        OrdonnanceurFlot(fourmiliere).calculer()
+
+
+def test_salle_de_capacite_nulle_contournee():
+    # le seul plus court chemin est fermé : le flot passe par le détour
+    fourmiliere = Fourmiliere(4)
+    for nom, capacite in (("A", 0), ("B", 1), ("C", 1)):
+        fourmiliere.ajouter_salle(nom, capacite)
+    for a, b in (("Sv", "A"), ("A", "Sd"), ("Sv", "B"), ("B", "C"), ("C", "Sd")):
+        fourmiliere.ajouter_tunnel(a, b)
+    longueur, coupe, _ = coupe_minimale(fourmiliere)
+    assert (longueur, coupe) == (2, 0)
+    ordonnanceur = OrdonnanceurFlot(fourmiliere)
+    assert ordonnanceur.calculer() == 3 + 4 - 1
+    verifier_plan(fourmiliere, list(ordonnanceur.iter_etapes()))
+
+
+def test_aucune_fourmi():
+    fourmiliere = Fourmiliere(0)
+    fourmiliere.ajouter_tunnel("Sv", "Sd")
+    ordonnanceur = OrdonnanceurFlot(fourmiliere)
+    assert ordonnanceur.calculer() == 0
+    assert list(ordonnanceur.iter_etapes()) == []
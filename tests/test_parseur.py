@@ -0,0 +1,94 @@
+# test_parseur.py
+"""
+Lecture des fourmilières texte (parser_fichier) et cache binaire voisin
+(lire_fichier avec cache=True) : réutilisé tant que la source n'a pas changé,
+reconstruit sinon.
+"""
+import os
+
+import pytest
+
+import generateurs
+import parseur
+from parseur import chemin_cache, lire_fichier, parser_fichier
+
+
+def contenu(graphe):
+    return graphe.nb_fourmis, list(graphe.noms), list(graphe.capacites), list(graphe.tunnels)
+
+
+def ecrire(path, texte):
+    with open(path, "w") as f:
+        f.write(texte)
+    return str(path)
+
+
+@pytest.fixture
+def source(tmp_path):
+    return generateurs.ecrire(str(tmp_path / "fourmiliere.txt"),
+                              generateurs.aleatoire(30, 50, capacites=(1, 2, 3), graine=4))
+
+
+def test_cache_reutilise(source, monkeypatch):
+    graphe = lire_fichier(source, cache=True)
+    assert os.path.exists(chemin_cache(source))
+    assert contenu(graphe) == contenu(parser_fichier(source))
+
+    def interdit(path):
+        raise AssertionError("source reparsée malgré un cache à jour")
+    monkeypatch.setattr(parseur, "parser_fichier", interdit)
+    assert contenu(lire_fichier(source, cache=True)) == contenu(graphe)
+
+
+def test_cache_invalide_apres_modification(source):
+    lire_fichier(source, cache=True)
+    with open(source, "a") as f:
+        f.write("Sv - Sd\n")
+    graphe = lire_fichier(source, cache=True)
+    assert contenu(graphe) == contenu(parser_fichier(source))
+    # le cache réécrit correspond à la nouvelle source
+    assert contenu(parseur.lire_cache(source)) == contenu(graphe)
+
+
+def test_cache_invalide_meme_date_et_taille(source):
+    lire_fichier(source, cache=True)
+    st = os.stat(source)
+    with open(source) as f:
+        texte = f.read()
+    # même taille, même date : seule l'empreinte du contenu change
+    ecrire(source, texte.replace("f=50", "f=51", 1))
+    os.utime(source, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert parseur.lire_cache(source) is None
+    assert lire_fichier(source, cache=True).nb_fourmis == 51
+
+
+def test_cache_corrompu_ignore(source):
+    ecrire(chemin_cache(source), "pas un cache")
+    assert parseur.lire_cache(source) is None
+    assert contenu(lire_fichier(source, cache=True)) == contenu(parser_fichier(source))
+
+
+def test_tunnel_vers_salle_non_declaree(tmp_path):
+    path = ecrire(tmp_path / "f.txt", "f=2\nS1\nSv - S1\n\nS1 - S2\nS2 - Sd\n")
+    with pytest.raises(ValueError, match=r"f\.txt:5: tunnel vers une salle non déclarée : 'S2'"):
+        parser_fichier(path)
+    # pas de cache écrit pour une source invalide
+    with pytest.raises(ValueError):
+        lire_fichier(path, cache=True)
+    assert not os.path.exists(chemin_cache(path))
+
+
+def test_tunnel_mal_forme(tmp_path):
+    path = ecrire(tmp_path / "f.txt", "f=1\nA\nB\nSv - A - B\n")
+    with pytest.raises(ValueError, match=r"f\.txt:4: tunnel mal formé"):
+        parser_fichier(path)
+
+
+def test_separateur_espace_prioritaire(tmp_path):
+    # " - " l'emporte sur "-" : la salle "a-b" est une extrémité du tunnel
+    path = ecrire(tmp_path / "f.txt", "f=1\na-b { 2 }\nc\nSv - a-b\na-b - c\nc-Sd\n")
+    graphe = parser_fichier(path)
+    noms = graphe.noms
+    tunnels = [(noms[graphe.tunnels[k]], noms[graphe.tunnels[k + 1]]) for k in range(0, len(graphe.tunnels), 2)]
+    assert tunnels == [("Sv", "a-b"), ("a-b", "c"), ("c", "Sd")]
+    assert graphe.capacites[graphe.indices["a-b"]] == 2
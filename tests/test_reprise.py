@@ -0,0 +1,89 @@
+# test_reprise.py
+"""
+Reprise d'une simulation à un point de reprise : les étapes produites ensuite
+sont celles de la simulation ininterrompue, quel que soit le moteur glouton qui
+a écrit le point et celui qui reprend.
+"""
+import importlib.util
+
+import pytest
+
+import generateurs
+from enregistrement import formater_etapes
+from fourmi import Fourmiliere
+from parseur import parser_fichier
+from reprise import Points, lire_point
+
+PERIODE = 7
+NUMPY = pytest.mark.skipif(importlib.util.find_spec("numpy") is None, reason="NumPy absent")
+
+
+@pytest.fixture(params=[
+    dict(generateur=generateurs.goulots, nb_chemins=3, longueur=5, nb_fourmis=80,
+         capacites=(1, 3), capacite_goulot=2),
+    dict(generateur=generateurs.grille, largeur=4, hauteur=3, nb_fourmis=60, capacites=(1, 2)),
+    dict(generateur=generateurs.aleatoire, nb_salles=25, nb_fourmis=90, capacites=(1, 2, 3)),
+], ids=["goulots", "grille", "aleatoire"])
+def source(request, tmp_path):
+    parametres = dict(request.param)
+    generateur = parametres.pop("generateur")
+    return generateurs.ecrire(str(tmp_path / "fourmiliere.txt"), generateur(**parametres, graine=5))
+
+
+def charger(path):
+    return Fourmiliere.depuis_graphe(parser_fichier(path))
+
+
+@pytest.mark.parametrize("ecrit, reprend", [
+    ("objets", "objets"),
+    ("compact", "compact"),
+    ("objets", "compact"),
+    ("compact", "objets"),
+    pytest.param("compact", "numpy", marks=NUMPY),
+    pytest.param("numpy", "objets", marks=NUMPY),
+])
+def test_reprise_identique(source, tmp_path, ecrit, reprend):
+    points = Points(str(tmp_path / "points"), PERIODE)
+    complete = list(formater_etapes(charger(source).iter_etapes(ecrit, points=points)))
+    assert len(complete) > 2 * PERIODE
+
+    fourmiliere = charger(source)
+    disponibles = points.disponibles(fourmiliere)
+    assert [etape for etape, _ in disponibles] == list(range(PERIODE, len(complete) + 1, PERIODE))
+    for etape, path in disponibles:
+        point = lire_point(path)
+        assert point.etape == etape
+        suite = list(formater_etapes(charger(source).iter_etapes(reprend, reprise=point)))
+        assert suite == complete[etape:]
+
+
+def test_dernier_point(source, tmp_path):
+    points = Points(str(tmp_path / "points"), PERIODE)
+    for _ in charger(source).iter_etapes("compact", points=points):
+        pass
+    fourmiliere = charger(source)
+    assert points.dernier(fourmiliere, PERIODE - 1) is None
+    assert points.dernier(fourmiliere, 2 * PERIODE + 3).etape == 2 * PERIODE
+    assert points.dernier(fourmiliere).etape == points.disponibles(fourmiliere)[-1][0]
+
+
+@pytest.mark.parametrize("moteur", ["objets", "compact", pytest.param("numpy", marks=NUMPY)])
+def test_fourmiliere_modifiee_refusee(source, tmp_path, moteur):
+    points = Points(str(tmp_path / "points"), PERIODE)
+    for _ in charger(source).iter_etapes("compact", points=points):
+        pass
+    point = points.dernier(charger(source))
+
+    with open(source, "a") as f:
+        f.write("Sv - Sd\n")
+    modifiee = charger(source)
+    # les points de l'ancienne fourmilière ne sont pas proposés pour la nouvelle
+    assert points.dernier(modifiee) is None
+    with pytest.raises(ValueError, match="autre fourmilière"):
+        next(modifiee.iter_etapes(moteur, reprise=point))
+
+
+def test_flot_sans_reprise(source, tmp_path):
+    points = Points(str(tmp_path / "points"), PERIODE)
+    with pytest.raises(ValueError):
+        next(charger(source).iter_etapes("flot", points=points))
@@ -0,0 +1,120 @@
+# test_traces.py
+"""
+Une trace relue (LectureTrace) doit redonner exactement les étapes de
+simuler() : mouvements par étape, positions, trajets et trafic, quel que soit
+le découpage en blocs, et aussi après une reprise qui prolonge la trace.
+"""
+from collections import Counter
+
+import pytest
+
+import generateurs
+from fourmi import Fourmiliere
+from parseur import parser_fichier
+from reprise import Points
+from traces import EcritureTrace, LectureTrace
+
+
+@pytest.fixture
+def source(tmp_path):
+    return generateurs.ecrire(str(tmp_path / "fourmiliere.txt"),
+                              generateurs.goulots(3, 5, 70, capacites=(1, 3), capacite_goulot=2, graine=2))
+
+
+def charger(path):
+    return Fourmiliere.depuis_graphe(parser_fichier(path))
+
+
+def tracer(source, path, **options):
+    fourmiliere = charger(source)
+    with EcritureTrace(path, fourmiliere, **options) as trace:
+        for _ in fourmiliere.iter_etapes("compact", trace=trace):
+            pass
+
+
+def verifier(path, etapes, nb_fourmis):
+    with LectureTrace(path) as trace:
+        assert trace.derniere_etape == len(etapes)
+        assert len(trace) == sum(len(e) for e in etapes)
+        for etape in etapes:
+            assert list(trace.etape(etape.numero).mouvements()) == list(etape.mouvements())
+
+        position = {fid: "Sv" for fid in range(1, nb_fourmis + 1)}
+        trajets = {fid: [] for fid in position}
+        passages = Counter()
+        for etape in etapes:
+            for fid, depart, arrivee in etape.mouvements():
+                position[fid] = arrivee
+                trajets[fid].append((etape.numero, depart, arrivee))
+                passages[tuple(sorted((depart, arrivee), key=etape.noms.index))] += 1
+            if etape.numero % 5 == 0:
+                for fid in range(1, nb_fourmis + 1, 7):
+                    assert trace.position(fid, etape.numero) == position[fid]
+        for fid, trajet in trajets.items():
+            assert trace.trajet(fid) == trajet
+        assert trace.trafic() == dict(passages)
+
+
+@pytest.mark.parametrize("taille_lot", [1, 37, 1 << 16])
+def test_aller_retour(source, tmp_path, taille_lot):
+    path = str(tmp_path / "f.trc")
+    tracer(source, path, taille_lot=taille_lot)
+    etapes = charger(source).simuler("objets")
+    verifier(path, etapes, charger(source).nb_fourmis)
+
+
+def test_au_dela_de_la_derniere_etape(source, tmp_path):
+    path = str(tmp_path / "f.trc")
+    tracer(source, path, taille_lot=37)
+    with LectureTrace(path) as trace:
+        fin = trace.derniere_etape
+        assert trace.position(1, 0) == "Sv"
+        for fid in (1, trace.nb_fourmis):
+            assert trace.position(fid, fin) == "Sd"
+            assert trace.position(fid, fin + 100) == "Sd"
+        assert len(trace.etape(fin + 1)) == 0
+        with pytest.raises(ValueError):
+            trace.position(trace.nb_fourmis + 1, fin)
+
+
+def test_ajout_apres_reprise(source, tmp_path):
+    path = str(tmp_path / "f.trc")
+    points = Points(str(tmp_path / "points"), 6)
+    etapes = charger(source).simuler("objets")
+
+    # simulation interrompue après E15, avec un bloc à moitié écrit en fin de fichier
+    fourmiliere = charger(source)
+    with EcritureTrace(path, fourmiliere, taille_lot=10) as trace:
+        for etape in fourmiliere.iter_etapes("compact", points=points, trace=trace):
+            if etape.numero == 15:
+                break
+    with open(path, "ab") as f:
+        f.write(b"\x40\0\0\0\x10\0\0\0")
+    with LectureTrace(path) as trace:
+        assert trace.derniere_etape == 15
+
+    # reprise au point E12 : les étapes 13 à 15, déjà tracées, ne sont pas doublées
+    fourmiliere = charger(source)
+    point = points.dernier(fourmiliere, 15)
+    assert point.etape == 12
+    with EcritureTrace(path, fourmiliere, ajout=True, taille_lot=10) as trace:
+        for _ in fourmiliere.iter_etapes("objets", reprise=point, trace=trace):
+            pass
+    verifier(path, etapes, fourmiliere.nb_fourmis)
+
+
+def test_ajout_autre_fourmiliere(source, tmp_path):
+    path = str(tmp_path / "f.trc")
+    tracer(source, path)
+    autre = charger(source)
+    autre.ajouter_tunnel("Sv", "Sd")
+    with pytest.raises(ValueError, match="autre fourmilière"):
+        EcritureTrace(path, autre, ajout=True)
+
+
+def test_pas_une_trace(tmp_path):
+    for contenu in (b"", b"FOURMIPR" + b"\0" * 60):
+        path = tmp_path / "x.trc"
+        path.write_bytes(contenu)
+        with pytest.raises(ValueError, match="Pas une trace"):
+            LectureTrace(str(path))
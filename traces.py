@@ -0,0 +1,293 @@
+# traces.py
+"""
+Trace des déplacements d'une simulation, sur disque et en colonnes d'entiers :
+(étape, fourmi, salle de départ, salle d'arrivée). Elle est ajoutée par lots
+pendant la simulation (Fourmiliere.iter_etapes, paramètre trace) et relue par
+projection mémoire : on peut demander après coup où était une fourmi à une
+étape, ou le trafic de chaque tunnel, sans garder la simulation en mémoire
+(Fourmi.historique n'est plus rempli que sur demande).
+
+    python main.py four/fourmiliere_cinq.txt --compact --trace cinq.trc
+    python traces.py cinq.trc --position 42 --etape 300
+    python traces.py cinq.trc --trajet 42
+    python traces.py cinq.trc --trafic
+
+Format (petit-boutiste) : un en-tête (empreinte de la fourmilière, voir
+reprise.empreinte, et noms des salles), puis des blocs écrits les uns à la
+suite des autres. Chaque bloc contient des étapes entières : son nombre de
+mouvements, sa première et sa dernière étape, puis les quatre colonnes en
+int32. Un bloc incomplet en fin de fichier (simulation interrompue pendant une
+écriture) est ignoré à la lecture et écrasé par la reprise suivante.
+"""
+from array import array
+from bisect import bisect_right
+from collections import Counter
+import argparse
+import mmap
+import os
+import struct
+import sys
+
+from enregistrement import Etape, formater_etape
+from reprise import _petit_boutiste, empreinte
+
+MAGIE = b"FOURMITR"
+VERSION = 1
+# magie, version, fourmis, salles, taille des noms (octets, avec le bourrage), empreinte
+ENTETE = struct.Struct("<8sHxxQII32s")
+# mouvements, première et dernière étape du bloc
+BLOC = struct.Struct("<Iii")
+# colonnes d'un bloc, dans l'ordre du fichier
+ETAPES, FOURMIS, DEPARTS, ARRIVEES = range(4)
+# mouvements gardés en mémoire avant d'écrire un bloc
+TAILLE_LOT = 1 << 16
+
+
+class EcritureTrace:
+    """
+    Écriture d'une trace, à passer à Fourmiliere.iter_etapes. Les mouvements
+    sont accumulés en colonnes et écrits par blocs d'au moins `taille_lot`
+    mouvements. Avec ajout=True, une trace existante de la même fourmilière est
+    prolongée (reprise d'une simulation) : les étapes déjà tracées sont ignorées.
+    """
+    def __init__(self, path, fourmiliere, ajout=False, taille_lot=TAILLE_LOT):
+        self.path = path
+        self.taille_lot = taille_lot
+        self.derniere_etape = 0
+        self._colonnes = [array("i") for _ in range(4)]
+        cle = empreinte(fourmiliere)
+
+        if ajout and os.path.exists(path):
+            with LectureTrace(path) as trace:
+                if trace.empreinte != cle:
+                    raise ValueError(f"Trace d'une autre fourmilière : {path}")
+                self.derniere_etape = trace.derniere_etape
+                fin = trace.fin
+            self._f = open(path, "r+b")
+            self._f.truncate(fin)
+            self._f.seek(fin)
+        else:
+            graphe = fourmiliere.graphe()
+            noms = "\n".join(graphe.noms).encode("utf-8")
+            # colonnes alignées sur 4 octets dans le fichier
+            noms += b"\0" * (-len(noms) % 4)
+            self._f = open(path, "wb")
+            self._f.write(ENTETE.pack(MAGIE, VERSION, fourmiliere.nb_fourmis, graphe.nb_salles,
+                                      len(noms), cle))
+            self._f.write(noms)
+
+    def ajouter(self, etape):
+        """
+        Ajoute les mouvements d'une étape (enregistrement.Etape).
+        """
+        if etape.numero <= self.derniere_etape:
+            return
+        etapes, fourmis, departs, arrivees = self._colonnes
+        etapes.extend(array("i", [etape.numero]) * len(etape))
+        fourmis.extend(etape.fourmis)
+        departs.extend(etape.departs)
+        arrivees.extend(etape.arrivees)
+        self.derniere_etape = etape.numero
+        if len(etapes) >= self.taille_lot:
+            self.vider()
+
+    def vider(self):
+        """
+        Écrit les mouvements en attente dans un nouveau bloc.
+        """
+        etapes = self._colonnes[ETAPES]
+        if not etapes:
+            return
+        self._f.write(BLOC.pack(len(etapes), etapes[0], etapes[-1]))
+        self._f.write(b"".join(_petit_boutiste(colonne) for colonne in self._colonnes))
+        self._f.flush()
+        self._colonnes = [array("i") for _ in range(4)]
+
+    def fermer(self):
+        if not self._f.closed:
+            self.vider()
+            self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+
+class LectureTrace:
+    """
+    Lecture d'une trace par projection mémoire : seul l'en-tête de chaque bloc
+    est lu à l'ouverture, les colonnes restent dans le fichier projeté.
+    Lève ValueError si le fichier n'est pas une trace (ou d'une autre version).
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            try:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # fichier vide
+                raise ValueError(f"Pas une trace : {path}") from None
+        mm = self._mm
+        if len(mm) < ENTETE.size:
+            raise ValueError(f"Pas une trace : {path}")
+        magie, version, self.nb_fourmis, nb_salles, taille_noms, self.empreinte = ENTETE.unpack_from(mm)
+        if magie != MAGIE or version != VERSION:
+            raise ValueError(f"Pas une trace (version {VERSION}) : {path}")
+        debut = ENTETE.size
+        self.noms = mm[debut:debut + taille_noms].rstrip(b"\0").decode("utf-8").split("\n")
+        if len(self.noms) != nb_salles:
+            raise ValueError(f"Trace tronquée : {path}")
+
+        # blocs complets : (début des colonnes, mouvements, première et dernière étape)
+        self._blocs = []
+        debut += taille_noms
+        while debut + BLOC.size <= len(mm):
+            n, premiere, derniere = BLOC.unpack_from(mm, debut)
+            if debut + BLOC.size + 16 * n > len(mm):
+                break
+            self._blocs.append((debut + BLOC.size, n, premiere, derniere))
+            debut += BLOC.size + 16 * n
+        self.fin = debut
+        self._premieres = [premiere for _, _, premiere, _ in self._blocs]
+
+    @property
+    def derniere_etape(self):
+        return self._blocs[-1][3] if self._blocs else 0
+
+    def __len__(self):
+        return sum(n for _, n, _, _ in self._blocs)
+
+    def _colonne(self, bloc, colonne):
+        debut, n, _, _ = self._blocs[bloc]
+        debut += 4 * n * colonne
+        vue = memoryview(self._mm)[debut:debut + 4 * n].cast("i")
+        if sys.byteorder == "big":
+            vue = array("i", vue)
+            vue.byteswap()
+        return vue
+
+    def _chercher(self, bloc, valeur, debut, fin, en_arriere=False):
+        """
+        Indice (dans le bloc) de la première (ou dernière) fourmi `valeur` entre
+        les lignes debut et fin, ou None : recherche d'octets dans la projection,
+        sans convertir la colonne en entiers Python.
+        """
+        origine = self._blocs[bloc][0] + 4 * self._blocs[bloc][1] * FOURMIS
+        motif = struct.pack("<i", valeur)
+        debut, fin = origine + 4 * debut, origine + 4 * fin
+        while debut < fin:
+            i = self._mm.rfind(motif, debut, fin) if en_arriere else self._mm.find(motif, debut, fin)
+            if i < 0:
+                return None
+            if (i - origine) % 4 == 0:
+                return (i - origine) // 4
+            # motif à cheval sur deux entiers : on continue au-delà
+            if en_arriere:
+                fin = i + 3
+            else:
+                debut = i + 1
+        return None
+
+    def _verifier_fourmi(self, fourmi):
+        if not 1 <= fourmi <= self.nb_fourmis:
+            raise ValueError(f"Fourmi inconnue : f{fourmi} (fourmis 1 à {self.nb_fourmis})")
+
+    def position(self, fourmi, etape):
+        """
+        Salle (nom) de la fourmi d'id `fourmi` à la fin de l'étape `etape`
+        (0 : avant la première, toutes les fourmis sont dans Sv).
+        """
+        self._verifier_fourmi(fourmi)
+        # blocs commençant au plus tard à `etape`, du plus récent au plus ancien
+        for bloc in reversed(range(bisect_right(self._premieres, etape))):
+            _, n, _, derniere = self._blocs[bloc]
+            fin = n if derniere <= etape else bisect_right(self._colonne(bloc, ETAPES), etape)
+            i = self._chercher(bloc, fourmi, 0, fin, en_arriere=True)
+            if i is not None:
+                return self.noms[self._colonne(bloc, ARRIVEES)[i]]
+        return "Sv"
+
+    def trajet(self, fourmi):
+        """
+        Liste des déplacements (étape, départ, arrivée) de la fourmi d'id `fourmi`,
+        l'équivalent de Fourmi.historique avec les étapes.
+        """
+        self._verifier_fourmi(fourmi)
+        trajet = []
+        for bloc in range(len(self._blocs)):
+            i = self._chercher(bloc, fourmi, 0, self._blocs[bloc][1])
+            while i is not None:
+                trajet.append((self._colonne(bloc, ETAPES)[i], self.noms[self._colonne(bloc, DEPARTS)[i]],
+                               self.noms[self._colonne(bloc, ARRIVEES)[i]]))
+                i = self._chercher(bloc, fourmi, i + 1, self._blocs[bloc][1])
+        return trajet
+
+    def etape(self, numero):
+        """
+        Mouvements de l'étape `numero`, en enregistrement.Etape (vide si aucun).
+        """
+        # une étape n'est jamais coupée entre deux blocs : seul le dernier bloc
+        # commençant au plus tard à `numero` peut la contenir
+        bloc = bisect_right(self._premieres, numero) - 1
+        if bloc >= 0:
+            etapes = self._colonne(bloc, ETAPES)
+            debut, fin = bisect_right(etapes, numero - 1), bisect_right(etapes, numero)
+            if debut < fin:
+                return Etape(numero, self.noms, *(array("i", self._colonne(bloc, c)[debut:fin])
+                                                  for c in (FOURMIS, DEPARTS, ARRIVEES)))
+        return Etape(numero, self.noms)
+
+    def trafic(self):
+        """
+        Nombre de passages (dans les deux sens) par tunnel : {(salle, salle): n},
+        les deux salles dans l'ordre de noms, du plus emprunté au moins emprunté.
+        """
+        passages = Counter()
+        for bloc in range(len(self._blocs)):
+            passages.update(zip(self._colonne(bloc, DEPARTS), self._colonne(bloc, ARRIVEES)))
+        tunnels = Counter()
+        for (a, b), n in passages.items():
+            tunnels[(a, b) if a < b else (b, a)] += n
+        noms = self.noms
+        return {(noms[a], noms[b]): n for (a, b), n in tunnels.most_common()}
+
+    def fermer(self):
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Interroge une trace de simulation (main.py --trace).")
+    parser.add_argument("trace", help="fichier de trace")
+    groupe = parser.add_mutually_exclusive_group(required=True)
+    groupe.add_argument("--position", type=int, metavar="FOURMI",
+                        help="salle de la fourmi à la fin de --etape")
+    groupe.add_argument("--trajet", type=int, metavar="FOURMI", help="déplacements de la fourmi")
+    groupe.add_argument("--trafic", action="store_true", help="passages par tunnel")
+    groupe.add_argument("--afficher", type=int, metavar="ETAPE", help="mouvements d'une étape")
+    parser.add_argument("--etape", type=int, help="étape (avec --position, défaut : la dernière)")
+    args = parser.parse_args()
+
+    try:
+        with LectureTrace(args.trace) as trace:
+            if args.position is not None:
+                etape = trace.derniere_etape if args.etape is None else args.etape
+                print(f"f{args.position} à la fin de E{etape} : {trace.position(args.position, etape)}")
+            elif args.trajet is not None:
+                for etape, depart, arrivee in trace.trajet(args.trajet):
+                    print(f"E{etape} : {depart} - {arrivee}")
+            elif args.trafic:
+                for (a, b), n in trace.trafic().items():
+                    print(f"{a} - {b} : {n}")
+            else:
+                print(formater_etape(trace.etape(args.afficher)))
+    except (OSError, ValueError) as e:
+        print(f"Erreur : {e}", file=sys.stderr)
+        sys.exit(1)
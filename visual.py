@@ -1,10 +1,10 @@
 import pygame
 import sys
-import networkx as nx
 from fourmi import Fourmiliere
 from main import charger_fichier
+from lecteur import LecteurEtapes, Controles, Animation
+from disposition import METHODES, charger_disposition, disposition_ressorts, mettre_a_l_echelle
 import math
-import time
 
 
 # ================
@@ -51,59 +51,53 @@ def draw_fourmiliere(fourmiliere, pos, fourmis_pos):
     pygame.display.flip()
 
 
-def interpolate(p1, p2, t):
-    return (p1[0] + (p2[0] - p1[0]) * t, p1[1] + (p2[1] - p1[1]) * t)
-
-
 # ================
 # Fonction principale
 # ================
-def visualiser(fourmiliere, logs):
-    # layout automatique des salles avec networkx
-    G = fourmiliere.construire_graphe()
-    layout = nx.spring_layout(G, scale=300, center=(WIDTH//2, HEIGHT//2))
+def visualiser(fourmiliere, etapes, disposition=None):
+    # layout des salles (normalisé, voir disposition.py), recalculé si non fourni
+    if disposition is None:
+        disposition = disposition_ressorts(fourmiliere)
 
     # positions des salles dans pygame (int arrondis)
-    pos = {salle: (int(x), int(y)) for salle, (x, y) in layout.items()}
+    pos = mettre_a_l_echelle(disposition, 300, (WIDTH//2, HEIGHT//2))
 
     # positions actuelles des fourmis (au départ dans Sv)
     fourmis_pos = {f.id: pos["Sv"] for f in fourmiliere.fourmis}
 
-    for step in logs:
-        lignes = step.splitlines()[1:]  # ignorer "+++ E1 +++"
-        mouvements = []
-        for l in lignes:
-            # ex: "f1 - S1 - S2"
-            fid, dep, arr = [x.strip() for x in l.split("-")]
-            fid = int(fid[1:])  # "f1" -> 1
-            mouvements.append((fid, dep, arr))
-
-        # animer les déplacements
-        for t in [i/30 for i in range(31)]:  # 30 frames pour la transition
-            for fid, dep, arr in mouvements:
-                start = pos[dep]
-                end = pos[arr]
-                fourmis_pos[fid] = interpolate(start, end, t)
+    # les étapes sont produites dans un thread de fond et animées dès qu'elles arrivent
+    lecteur = LecteurEtapes(etapes)
+    controles = Controles()
+    animation = Animation(lecteur, controles, pos, fourmis_pos)
 
-            draw_fourmiliere(fourmiliere, pos, fourmis_pos)
-            clock.tick(30)
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                lecteur.arreter()
+                return
+            elif event.type == pygame.KEYDOWN:
+                controles.touche(event.key)
 
-    # attendre un peu à la fin
-    time.sleep(3)
+        animation.image_suivante()
+        draw_fourmiliere(fourmiliere, pos, fourmis_pos)
+        pygame.display.set_caption("Simulation graphique - Fourmilière - "
+                                   + controles.etat(animation.numero, animation.terminee))
+        clock.tick(30)
 
 
 # ================
 # Point d'entrée
 # ================
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python visual.py <fichier_fourmiliere.txt>")
+    if len(sys.argv) not in (2, 3) or (len(sys.argv) == 3 and sys.argv[2] not in METHODES):
+        print(f"Usage: python visual.py <fichier_fourmiliere.txt> [{'|'.join(METHODES)}]")
         sys.exit(1)
 
     path = sys.argv[1]
     fourmiliere = charger_fichier(path)
-    logs = fourmiliere.simuler()
+    disposition = charger_disposition(path, fourmiliere, sys.argv[2] if len(sys.argv) == 3 else "auto")
+    etapes = fourmiliere.iter_etapes()
 
-    visualiser(fourmiliere, logs)
+    visualiser(fourmiliere, etapes, disposition)
 
     pygame.quit()